@@ -0,0 +1,216 @@
+import json
+import statistics
+import time
+import zlib
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import factory
+import pytest
+from rest_framework.test import APIClient
+
+from benchmarks.profiling import StageTimer
+from devicemanager.inventory import api_views, qr_code
+from devicemanager.inventory.factories import (
+    BuildingFactory,
+    DeviceFactory,
+    DeviceModelFactory,
+    FacultyFactory,
+    RoomFactory,
+)
+from devicemanager.inventory.models import Building, Device
+from devicemanager.users.factories import UserFactory
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+# the baselines were recorded with SQLite on a single core Intel Xeon VM, times measured on another machine
+# are compared with them scaled by how long the calibration workload takes there, stored under this key
+CALIBRATION_KEY = "calibration"
+CALIBRATION_ROUNDS = 5
+# allowed relative and absolute growth of each metric over its baseline before a benchmark fails,
+# freed memory is reused, so small documents often do not grow the resident set at all
+REGRESSION_TOLERANCE = {
+    "median_seconds": (0.25, 0.005),
+    "peak_rss_mib": (0.25, 8.0),
+    "output_bytes": (0.05, 0),
+}
+# the device counts are seeded once per session, each into a building of its own
+SEEDED_DEVICE_COUNTS = (1, 100, 1_000, 10_000)
+ROOMS_PER_BUILDING = 20
+OWNER_COUNT = 50
+
+baselines_key = pytest.StashKey[dict[str, dict]]()
+results_key = pytest.StashKey[dict[str, "BenchmarkResult"]]()
+figures_key = pytest.StashKey[dict[str, str]]()
+calibration_key = pytest.StashKey[float]()
+
+
+@dataclass
+class BenchmarkResult:
+    median_seconds: float
+    peak_rss_mib: float
+    output_bytes: int
+    stages: dict[str, float] = field(default_factory=dict)
+
+    def get_metrics(self) -> dict[str, float]:
+        return {metric: round(getattr(self, metric), 4) for metric in REGRESSION_TOLERANCE}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-baselines",
+        action="store_true",
+        help=f"Record the measured metrics as new baselines in {BASELINES_PATH.name} instead of comparing them",
+    )
+
+
+def pytest_configure(config):
+    config.stash[baselines_key] = json.loads(BASELINES_PATH.read_text()) if BASELINES_PATH.exists() else {}
+    config.stash[results_key] = {}
+    config.stash[figures_key] = {}
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if config.getoption("update_baselines") and config.stash[results_key]:
+        baselines = config.stash[baselines_key]
+        baselines.update((key, result.get_metrics()) for key, result in config.stash[results_key].items())
+        baselines[CALIBRATION_KEY] = {"median_seconds": round(config.stash[calibration_key], 4)}
+        BASELINES_PATH.write_text(json.dumps(dict(sorted(baselines.items())), indent=2) + "\n")
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if figures := config.stash[figures_key]:
+        terminalreporter.section("label pipeline figures")
+        for name, figure in figures.items():
+            terminalreporter.write_line(f"{name:<40}{figure:>20}")
+
+    results = config.stash[results_key]
+    if not results:
+        return
+    stages = sorted({stage for result in results.values() for stage in result.stages})
+    terminalreporter.section("label pipeline stages (ms per request)")
+    terminalreporter.write_line(
+        f"{'benchmark':<22}" + "".join(f"{stage:>14}" for stage in stages) + f"{'peak RSS MiB':>14}{'bytes':>12}"
+    )
+    for key, result in sorted(results.items()):
+        terminalreporter.write_line(
+            f"{key:<22}"
+            + "".join(f"{result.stages.get(stage, 0) * 1000:>14.1f}" for stage in stages)
+            + f"{result.peak_rss_mib:>14.1f}{result.output_bytes:>12}"
+        )
+
+
+def run_calibration_workload() -> None:
+    """Compress data with zlib and sum squares in pure Python, a CPU bound workload that does not change with the app."""
+    data = bytes(range(256)) * 4096
+    for _ in range(5):
+        data = zlib.compress(data, 9) + data[: 512 * 1024]
+    sum(value * value for value in range(500_000))
+
+
+@pytest.fixture(scope="session")
+def time_scale(pytestconfig) -> float:
+    """Return how much slower this machine is than the one the baselines were recorded on."""
+    timings = []
+    for _ in range(CALIBRATION_ROUNDS):
+        start = time.perf_counter()
+        run_calibration_workload()
+        timings.append(time.perf_counter() - start)
+    calibration = pytestconfig.stash[calibration_key] = statistics.median(timings)
+    baseline = pytestconfig.stash[baselines_key].get(CALIBRATION_KEY)
+    return calibration / baseline["median_seconds"] if baseline else 1.0
+
+
+@pytest.fixture(scope="session")
+def django_db_setup(django_db_setup, django_db_blocker):
+    """Seed a building per device count, the devices of its rooms have varied owners and models."""
+    with django_db_blocker.unblock():
+        faculty = FacultyFactory(full_name="Faculty of Physics and Applied Computer Science", short_name="WFiIS")
+        owners = UserFactory.create_batch(OWNER_COUNT)
+        device_models = DeviceModelFactory.create_batch(5)
+        for count in SEEDED_DEVICE_COUNTS:
+            building = BuildingFactory(name=f"D-{count}", faculty=faculty)
+            rooms = RoomFactory.create_batch(ROOMS_PER_BUILDING, building=building)
+            devices = DeviceFactory.build_batch(
+                count,
+                room=factory.Iterator(rooms),
+                owner=factory.Iterator(owners),
+                device_model=factory.Iterator(device_models),
+            )
+            Device.objects.bulk_create(devices, batch_size=1000)
+
+
+@pytest.fixture
+def seeded_buildings(db) -> dict[int, int]:
+    """Map device counts to the id of the building holding that many devices."""
+    return {count: Building.objects.get(name=f"D-{count}").pk for count in SEEDED_DEVICE_COUNTS}
+
+
+@pytest.fixture
+def label_client(db) -> APIClient:
+    client = APIClient()
+    client.force_authenticate(UserFactory(username="benchmark", is_superuser=True))
+    return client
+
+
+@pytest.fixture(autouse=True)
+def label_settings(settings, tmp_path):
+    # labels are rendered in-process, so the stages can be timed, the process pool is covered by test_render_labels_in_parallel
+    settings.LABEL_RENDER_WORKERS = 1
+    settings.LABEL_ARTIFACT_DIR = tmp_path / "labels"
+    settings.CACHES = {
+        **settings.CACHES,
+        "qr_codes": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "benchmark-qr-codes"},
+    }
+
+
+@pytest.fixture
+def stage_timer(monkeypatch) -> StageTimer:
+    timer = StageTimer(monkeypatch)
+    timer.time(api_views, "get_label_etag", "db_fetch")
+    timer.time_iteration(api_views, "iterate_label_records", "db_fetch")
+    timer.time(qr_code.LabelGenerator, "_make_qr_code", "qr_encode")
+    timer.time(qr_code, "render_qr_code_png", "image_encode")
+    timer.time(qr_code.DeviceQRCodeGenerator, "add_device", "canvas_drawing")
+    timer.time(qr_code.DeviceQRCodeGenerator, "_finish_batch", "pdf_save")
+    timer.time(qr_code.DeviceQRCodeGenerator, "build", "pdf_save")
+    return timer
+
+
+@pytest.fixture
+def record_result(request, time_scale):
+    """
+    Store the result of the benchmark and fail when a metric regressed past its tolerance.
+
+    The baseline time is scaled by ``time_scale`` first, so the suite can run on other machines than the reference one.
+    """
+
+    def record(key: str, result: BenchmarkResult) -> None:
+        config = request.config
+        config.stash[results_key][key] = result
+        request.node.user_properties.append(("label_benchmark", asdict(result)))
+        baseline = config.stash[baselines_key].get(key)
+        if baseline is None or config.getoption("update_baselines"):
+            return
+        regressions = []
+        for metric, value in result.get_metrics().items():
+            relative, absolute = REGRESSION_TOLERANCE[metric]
+            scale = time_scale if metric == "median_seconds" else 1.0
+            limit = baseline.get(metric, value) * scale * (1 + relative) + absolute
+            if value > limit:
+                regressions.append(f"{metric} {value:.4g} exceeds {limit:.4g}")
+        if regressions:
+            pytest.fail(f"{key} regressed, " + "; ".join(regressions))
+
+    return record
+
+
+@pytest.fixture
+def publish_figure(request):
+    """Show a figure in the summary of the session and in the JSON report of the benchmark."""
+
+    def publish(name: str, figure: str) -> None:
+        request.config.stash[figures_key][name] = figure
+        request.node.user_properties.append((name, figure))
+
+    return publish
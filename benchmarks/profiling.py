@@ -0,0 +1,123 @@
+import functools
+import resource
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+import pytest
+
+PROC_STATUS = Path("/proc/self/status")
+PROC_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+
+class StageTimer:
+    """
+    Accumulate the time spent in stages of the label pipeline.
+
+    Stages are measured by wrapping the functions doing their work. Time is exclusive: when a stage
+    calls into another one, e.g. drawing a label encodes its QR code, the nested time is only counted
+    for the inner stage.
+    """
+
+    def __init__(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        self.monkeypatch = monkeypatch
+        self.totals: dict[str, float] = defaultdict(float)
+        self._stack: list[list] = []
+
+    def reset(self) -> None:
+        self.totals.clear()
+
+    def _enter(self, stage: str) -> None:
+        now = time.perf_counter()
+        if self._stack:
+            outer = self._stack[-1]
+            self.totals[outer[0]] += now - outer[1]
+        self._stack.append([stage, now])
+
+    def _exit(self) -> None:
+        now = time.perf_counter()
+        stage, start = self._stack.pop()
+        self.totals[stage] += now - start
+        if self._stack:
+            self._stack[-1][1] = now
+
+    def _timed(self, stage: str, function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            self._enter(stage)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._exit()
+
+        return wrapper
+
+    def _timed_iteration(self, stage: str, function: Callable[..., Iterable]) -> Callable:
+        """Time producing the items of the returned iterable, which is consumed in between other stages."""
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            iterator = iter(self._timed(stage, function)(*args, **kwargs))
+            while True:
+                self._enter(stage)
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self._exit()
+                yield item
+
+        return wrapper
+
+    def time(self, target: object, name: str, stage: str) -> None:
+        self.monkeypatch.setattr(target, name, self._timed(stage, getattr(target, name)))
+
+    def time_iteration(self, target: object, name: str, stage: str) -> None:
+        self.monkeypatch.setattr(target, name, self._timed_iteration(stage, getattr(target, name)))
+
+
+def reset_peak_rss() -> int:
+    """
+    Reset the peak resident set size of the process where the kernel supports it and return the current size.
+
+    Without ``/proc`` the peak can not be reset, the growth of ``ru_maxrss`` is then only meaningful for
+    the first, largest measurement of a session.
+    """
+    try:
+        PROC_CLEAR_REFS.write_text("5")
+    except OSError:
+        return get_peak_rss()
+    return _read_proc_status("VmRSS")
+
+
+def get_peak_rss() -> int:
+    """Return the peak resident set size of the process in bytes."""
+    try:
+        return _read_proc_status("VmHWM")
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in KiB elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _read_proc_status(field: str) -> int:
+    for line in PROC_STATUS.read_text().splitlines():
+        if line.startswith(f"{field}:"):
+            return int(line.split()[1]) * 1024
+    raise OSError(f"{field} is missing in {PROC_STATUS}")
+
+
+def get_retained_size(build: Callable[[], object]) -> int:
+    """Return the number of bytes allocated by ``build`` that are still held once it returns its result."""
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = build()  # noqa: F841, held until the size is read
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return after - before
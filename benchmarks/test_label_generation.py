@@ -0,0 +1,78 @@
+import statistics
+
+import pytest
+from django.core.cache import caches
+from django.urls import reverse
+
+from benchmarks.conftest import SEEDED_DEVICE_COUNTS, BenchmarkResult
+from benchmarks.profiling import get_peak_rss, get_retained_size, reset_peak_rss
+from devicemanager.inventory.label_records import iterate_label_records
+from devicemanager.inventory.models import Device
+from devicemanager.inventory.qr_cache import qr_code_image_cache
+
+DPI_SETTINGS = (72, 300, 600)
+
+
+def get_rounds(device_count: int) -> int:
+    # small documents are rendered a few times to even out noise, large ones take seconds each
+    return max(1, min(5, 1_000 // device_count))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("dpi", DPI_SETTINGS, ids=[f"{dpi}dpi" for dpi in DPI_SETTINGS])
+@pytest.mark.parametrize(
+    "device_count", SEEDED_DEVICE_COUNTS, ids=[f"{count}devices" for count in SEEDED_DEVICE_COUNTS]
+)
+def test_qr_code_generate_view(
+    benchmark, label_client, seeded_buildings, stage_timer, record_result, settings, device_count, dpi
+):
+    """
+    Render the labels of a building with ``QRCodeGenerateView``, from the request to the last byte of the PDF.
+
+    Every round starts cold: rendered documents and QR code images are not reused between rounds.
+    """
+    url = reverse("inventory:qr-generate")
+    params = {"building": seeded_buildings[device_count], "dpi": dpi}
+    peaks = []
+
+    def setup():
+        for artifact in settings.LABEL_ARTIFACT_DIR.glob("*"):
+            artifact.unlink()
+        qr_code_image_cache.clear()
+        caches["qr_codes"].clear()
+        peaks.append(reset_peak_rss())
+
+    def render() -> int:
+        response = label_client.get(url, params)
+        assert response.status_code == 200
+        output_bytes = sum(len(chunk) for chunk in response.streaming_content)
+        peaks[-1] = max(get_peak_rss() - peaks[-1], 0)
+        return output_bytes
+
+    rounds = get_rounds(device_count)
+    output_bytes = benchmark.pedantic(render, setup=setup, rounds=rounds, iterations=1)
+
+    stages = {stage: total / rounds for stage, total in stage_timer.totals.items()}
+    result = BenchmarkResult(
+        median_seconds=benchmark.stats.stats.median,
+        peak_rss_mib=statistics.median(peaks) / 1024 / 1024,
+        output_bytes=output_bytes,
+        stages=stages,
+    )
+    benchmark.extra_info.update(stages=stages, peak_rss_mib=result.peak_rss_mib, output_bytes=output_bytes)
+    record_result(f"dpi={dpi}-devices={device_count}", result)
+
+
+@pytest.mark.django_db
+def test_label_records(benchmark, seeded_buildings, publish_figure):
+    """Fetch the label records of 10k devices and compare their memory with model instances of the same rows."""
+    devices = Device.objects.filter(room__building=seeded_buildings[10_000]).order_by("pk")
+    instances = devices.select_related("room__building", "owner", "device_model__manufacturer")
+
+    records = benchmark(lambda: list(iterate_label_records(devices)))
+
+    record_size = get_retained_size(lambda: list(iterate_label_records(devices))) / len(records)
+    instance_size = get_retained_size(lambda: list(instances)) / len(records)
+    benchmark.extra_info.update(bytes_per_label=record_size, bytes_per_model_instance=instance_size)
+    publish_figure("bytes per label record", f"{record_size:.0f}")
+    publish_figure("bytes per device model instance", f"{instance_size:.0f}")
@@ -0,0 +1,126 @@
+import json
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+from concurrent.futures import Executor, wait
+
+import pytest
+from django.conf import settings
+
+from devicemanager.inventory.factories import build_sample_records
+from devicemanager.inventory.label_rendering import (
+    create_executor,
+    render_labels_in_parallel,
+    render_labels_in_process,
+)
+from devicemanager.inventory.models import QRCodeGenerationConfig, QRCodeRenderer
+from devicemanager.inventory.qr_code import DeviceQRCodeGenerator, render_qr_code_png
+
+PARALLEL_LABEL_COUNT = 1_000
+WORKER_COUNTS = (1, 2, 4)
+QR_IMAGE_COUNT = 100
+QR_IMAGE_DPI_SETTINGS = (150, 300, 600)
+FIRST_LABEL_ROUNDS = 3
+
+# run in a fresh interpreter, so nothing is loaded or cached yet, like in a newly started gunicorn worker
+FIRST_LABEL_SCRIPT = """
+import json
+import time
+
+start = time.perf_counter()
+import django
+
+django.setup()
+setup = time.perf_counter()
+
+from devicemanager.inventory.factories import build_sample_records
+from devicemanager.inventory.label_rendering import render_labels_in_process
+from devicemanager.inventory.models import QRCodeGenerationConfig
+
+config = QRCodeGenerationConfig(qr_renderer={renderer!r})
+first_record, next_record = build_sample_records(2)
+imported = time.perf_counter()
+render_labels_in_process(config, [first_record], use_cache=False).close()
+first_label = time.perf_counter()
+render_labels_in_process(config, [next_record], use_cache=False).close()
+next_label = time.perf_counter()
+
+print(json.dumps({{
+    "setup": setup - start,
+    "first": first_label - imported,
+    "next": next_label - first_label,
+}}))
+"""
+
+
+@pytest.fixture
+def executor(workers) -> Iterator[Executor | None]:
+    """Start a process pool of ``workers`` and wait until all of them are up, so their startup is not measured."""
+    if workers == 1:
+        yield None
+        return
+    executor = create_executor(workers)
+    wait([executor.submit(time.sleep, 0.5) for _ in range(workers)])
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.parametrize("workers", WORKER_COUNTS, ids=[f"{workers}workers" for workers in WORKER_COUNTS])
+def test_render_labels_in_parallel(benchmark, executor, workers):
+    """Render 1k labels on a process pool of ``workers``, a single worker renders them in-process."""
+    config = QRCodeGenerationConfig()
+    records = build_sample_records(PARALLEL_LABEL_COUNT)
+
+    def render() -> int:
+        if executor is None:
+            pdf = render_labels_in_process(config, records, use_cache=False)
+        else:
+            pdf = render_labels_in_parallel(config, records, len(records), executor, workers, use_cache=False)
+        with pdf:
+            return len(pdf.read())
+
+    benchmark.pedantic(render, rounds=1, iterations=1)
+
+
+@pytest.mark.parametrize("dpi", QR_IMAGE_DPI_SETTINGS, ids=[f"{dpi}dpi" for dpi in QR_IMAGE_DPI_SETTINGS])
+def test_render_qr_code_png(benchmark, publish_figure, dpi):
+    """Render the raster QR code images of 100 labels from their already encoded matrices."""
+    generator = DeviceQRCodeGenerator.from_config(QRCodeGenerationConfig(dpi=dpi))
+    records = build_sample_records(QR_IMAGE_COUNT)
+    matrices = [generator._make_qr_code(generator.get_qr_code_data(record)).get_matrix() for record in records]
+
+    def render() -> int:
+        return sum(
+            len(render_qr_code_png(matrix, generator.qr_size, generator.fill_color, generator.background_color))
+            for matrix in matrices
+        )
+
+    png_bytes = benchmark(render)
+
+    benchmark.extra_info.update(qr_size=generator.qr_size, png_bytes_per_image=png_bytes // QR_IMAGE_COUNT)
+    publish_figure(f"PNG bytes per QR code at {dpi} dpi", f"{png_bytes // QR_IMAGE_COUNT}")
+
+
+@pytest.mark.parametrize("renderer", QRCodeRenderer.values)
+def test_first_label(benchmark, publish_figure, renderer):
+    """Start a fresh interpreter, set Django up and render its first and second label, as a new web worker would."""
+    timings = []
+
+    def measure() -> None:
+        result = subprocess.run(
+            [sys.executable, "-c", FIRST_LABEL_SCRIPT.format(renderer=renderer)],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        timings.append(json.loads(result.stdout.splitlines()[-1]))
+
+    benchmark.pedantic(measure, rounds=FIRST_LABEL_ROUNDS, iterations=1)
+
+    medians = {key: statistics.median(timing[key] for timing in timings) for key in ("setup", "first", "next")}
+    benchmark.extra_info.update(medians)
+    for key, label in (("setup", "setup"), ("first", "first label"), ("next", "next label")):
+        publish_figure(f"{renderer} {label} ms", f"{medians[key] * 1000:.1f}")
@@ -0,0 +1,84 @@
+from django.conf import settings
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    LimitOffsetPagination,
+)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination ordered by the primary key, by the ``cursor_ordering`` of the view or by ``?ordering=``.
+
+    Pages are selected with a ``WHERE`` on the ordering columns rather than an ``OFFSET``, so any page
+    costs the same as the first one. The ordering must be unique and indexed to stay stable and cheap.
+    """
+
+    ordering = "pk"
+    page_size_query_param = "page_size"
+
+    @property
+    def max_page_size(self) -> int:
+        return settings.API_MAX_PAGE_SIZE
+
+    def get_ordering(self, request, queryset, view) -> tuple[str, ...]:
+        # the ordering requested from an ordering filter of the view takes precedence
+        self.ordering = getattr(view, "cursor_ordering", KeysetPagination.ordering)
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering[-1].lstrip("-") not in ("pk", "id"):
+            # rows with equal values are paged through in primary key order
+            ordering = (*ordering, "-pk" if ordering[0].startswith("-") else "pk")
+        return ordering
+
+
+class CountedLimitOffsetPagination(LimitOffsetPagination):
+    """Offset pagination with the total count, pages are slower the further they are."""
+
+    @property
+    def max_limit(self) -> int:
+        return settings.API_MAX_PAGE_SIZE
+
+
+class DefaultPagination(BasePagination):
+    """
+    Paginate with a cursor by default, clients needing totals opt into offset pagination with ``limit`` or ``offset``.
+
+    Both use the same ordering, so switching between them does not reorder the results.
+    """
+
+    def __init__(self) -> None:
+        self.cursor_pagination = KeysetPagination()
+        self.offset_pagination = CountedLimitOffsetPagination()
+        self.pagination: BasePagination = self.cursor_pagination
+
+    def uses_offset(self, request) -> bool:
+        offset_params = (self.offset_pagination.limit_query_param, self.offset_pagination.offset_query_param)
+        return any(param in request.query_params for param in offset_params)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.uses_offset(request):
+            self.pagination = self.offset_pagination
+            queryset = queryset.order_by(*self.cursor_pagination.get_ordering(request, queryset, view))
+        return self.pagination.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.pagination.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.cursor_pagination.get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *self.cursor_pagination.get_schema_operation_parameters(view),
+            *self.offset_pagination.get_schema_operation_parameters(view),
+        ]
+
+    def get_results(self, data):
+        return data["results"]
+
+    def to_html(self):
+        return self.pagination.to_html()
+
+    @property
+    def display_page_controls(self) -> bool:
+        return self.pagination.display_page_controls
@@ -1,6 +1,9 @@
+from itertools import batched
 from typing import Any
 
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR
+from django.db import transaction
 from django.db.models import (
     BooleanField,
     Case,
@@ -32,12 +35,16 @@ from devicemanager.inventory.models import (
     Device,
     DeviceModel,
     DeviceRental,
+    DeviceSelection,
     DeviceType,
     Faculty,
+    LabelJob,
     Manufacturer,
     QRCodeGenerationConfig,
     Room,
+    active_configuration,
 )
+from devicemanager.inventory.search import search_devices
 
 
 @admin.register(Faculty)
@@ -102,18 +109,8 @@ class DeviceAdmin(admin.ModelAdmin):
         "is_rented",
     )
     ordering = ("device_model__name",)
-    search_fields = (
-        "id",
-        "serial_number",
-        "inventory_number",
-        "device_model__device_type__short_name",
-        "device_model__device_type__name",
-        "device_model__manufacturer__name",
-        "device_manufacturer_model",
-        "room__room_number",
-        "room__building__name",
-        "owner__username",
-    )
+    # searched through the device search index, see get_search_results()
+    search_fields = ("search_document__text",)
     list_filter = (
         "device_model__device_type",
         "device_model__manufacturer",
@@ -129,12 +126,25 @@ class DeviceAdmin(admin.ModelAdmin):
 
     form = DeviceForm
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        queryset = search_devices(queryset, search_term)
+        # results come by rank unless a column is sorted
+        if ORDER_VAR not in request.GET:
+            queryset = queryset.order_by("-search_rank", "-pk")
+        return queryset, False
+
     @admin.action(description=_("Generate QR Codes"))
     def generate_qr_codes(self, request: HttpRequest, queryset: QuerySet):
-        selected_ids = queryset.values_list("pk", flat=True)
-        return HttpResponseRedirect(
-            reverse("inventory:qr-generate") + f"?ids={','.join(str(id) for id in selected_ids)}"
-        )
+        # a selection is only visible once all its devices are stored
+        with transaction.atomic():
+            selection = DeviceSelection.objects.create(created_by=request.user)
+            through = DeviceSelection.devices.through
+            selected_ids = queryset.order_by().values_list("pk", flat=True).iterator(chunk_size=1000)
+            for ids in batched(selected_ids, 1000):
+                through.objects.bulk_create([through(deviceselection=selection, device_id=pk) for pk in ids])
+        return HttpResponseRedirect(reverse("inventory:qr-generate") + f"?selection={selection.pk}")
 
     @admin.display(description=_("Current Rental"))
     def current_rental(self, obj: Device) -> str:
@@ -183,13 +193,6 @@ class DeviceAdmin(admin.ModelAdmin):
             "room",
             "owner",
         ).prefetch_related(Prefetch("rentals", queryset=DeviceRental.objects.select_related("borrower")))
-        qs = qs.annotate(
-            device_manufacturer_model=Concat(
-                "device_model__manufacturer__name",
-                Value(" "),
-                "device_model__name",
-            )
-        )
         qs = qs.annotate(
             rental_count=Count("rentals", distinct=True),
         )
@@ -216,13 +219,13 @@ class QRCodeGenerationConfigAdmin(admin.ModelAdmin):
         "spacing",
         "font_sizes",
     )
-    list_filter = ("active", "dpi")
+    list_filter = ("active", "dpi", "qr_renderer", "layout")
     search_fields = ("id", "dpi", "fill_color", "background_color")
 
     fieldsets = (
         (
             _("Label Settings"),
-            {"fields": ("label_width_mm", "label_height_mm", "dpi", "active")},
+            {"fields": ("label_width_mm", "label_height_mm", "dpi", "qr_renderer", "active")},
         ),
         (
             _("Spacing & Padding"),
@@ -240,19 +243,38 @@ class QRCodeGenerationConfigAdmin(admin.ModelAdmin):
             {"fields": ("font_size_small", "font_size", "font_size_large")},
         ),
         (_("Colors"), {"fields": ("fill_color", "background_color")}),
+        (
+            _("Sheet Layout"),
+            {
+                "fields": (
+                    "layout",
+                    ("sheet_width_mm", "sheet_height_mm"),
+                    ("sheet_rows", "sheet_columns"),
+                    ("sheet_margin_top_mm", "sheet_margin_left_mm"),
+                    ("sheet_gutter_x_mm", "sheet_gutter_y_mm"),
+                )
+            },
+        ),
         (
             _("Field settings"),
             {
                 "fields": (
+                    "payload_format",
                     "inv_prefix",
                     "sn_prefix",
                 )
             },
         ),
+        (_("Preview"), {"fields": ("label_preview",)}),
     )
 
     form = QRCodeGenerationConfigForm
 
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        # bulk deletes bypass the model hooks
+        transaction.on_commit(active_configuration.invalidate)
+
     @admin.display(description=_("Label Size"))
     def label_size(self, obj: QRCodeGenerationConfig) -> str:
         return f"{obj.label_width_mm} x {obj.label_height_mm} mm"
@@ -310,3 +332,30 @@ class DeviceRentalAdmin(admin.ModelAdmin):
             ),
         ).select_related("device__device_model__manufacturer", "device__device_model", "borrower")
         return qs
+
+
+@admin.register(LabelJob)
+class LabelJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "status", "requested_by", "progress", "created_at", "finished_at")
+    list_filter = ("status",)
+    search_fields = ("id", "requested_by__username")
+    ordering = ("-created_at",)
+    readonly_fields = (
+        "status",
+        "requested_by",
+        "selection",
+        "config",
+        "pages_rendered",
+        "pages_total",
+        "result",
+        "error",
+        "started_at",
+        "finished_at",
+    )
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    @admin.display(description=_("Progress"))
+    def progress(self, obj: LabelJob) -> str:
+        return f"{obj.pages_rendered} / {obj.pages_total}"
@@ -1,10 +1,38 @@
-from django.http import FileResponse
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
 from django.utils.functional import cached_property
-from drf_spectacular.utils import extend_schema
+from django.utils.http import parse_etags, quote_etag
+from django.utils.translation import gettext_lazy as _
+from django_filters.rest_framework import DjangoFilterBackend
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
 from rest_framework.generics import GenericAPIView
 from rest_framework.parsers import FormParser, JSONParser
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 
+from devicemanager.drf_pagination import CountedLimitOffsetPagination
+from devicemanager.inventory.exports import ExportMixin
+from devicemanager.inventory.filtersets import (
+    DeviceFilterSet,
+    DeviceRentalFilterSet,
+    RoomFilterSet,
+)
+from devicemanager.inventory.label_artifacts import get_label_etag, label_artifact_store
+from devicemanager.inventory.label_jobs import create_label_job
+from devicemanager.inventory.label_preview import get_label_preview
+from devicemanager.inventory.label_records import iterate_label_records
+from devicemanager.inventory.label_rendering import (
+    LabelSelection,
+    get_label_devices,
+    render_labels,
+)
 from devicemanager.inventory.models import (
     Building,
     Device,
@@ -12,29 +40,38 @@ from devicemanager.inventory.models import (
     DeviceRental,
     DeviceType,
     Faculty,
+    LabelJob,
     Manufacturer,
     QRCodeGenerationConfig,
     Room,
 )
-from devicemanager.inventory.qr_code import DeviceQRCodeGenerator
+from devicemanager.inventory.qr_payload import (
+    InvalidPayloadError,
+    decode_compact_payload,
+)
+from devicemanager.inventory.renderers import PNGRenderer, ZPLRenderer
+from devicemanager.inventory.search import search_devices, tokenize_query
 from devicemanager.inventory.serializers import (
     BuildingSerializer,
     DeviceModelSerializer,
     DeviceRentalSerializer,
+    DeviceSearchResultSerializer,
     DeviceSerializer,
     DeviceTypeSerializer,
     FacultySerializer,
+    LabelJobSerializer,
     ManufacturerSerializer,
     QRCodeGenerateQuerySerializer,
     RoomSerializer,
 )
+from devicemanager.utils.query_plans import DynamicFieldsViewMixin, QueryPlan
+from devicemanager.utils.viewsets import BulkModelMixin, bulk_schemas
 
 
-class QRCodeGenerateView(GenericAPIView):
-    queryset = Device.objects.all()
-    lookup_field = "ids"
+class LabelConfigMixin:
+    """Active label configuration with the overrides passed in the request applied."""
+
     serializer_class = QRCodeGenerateQuerySerializer
-    parser_classes = (FormParser, JSONParser)
 
     @cached_property
     def request_data(self):
@@ -44,98 +81,246 @@ class QRCodeGenerateView(GenericAPIView):
 
     @cached_property
     def qr_generation_config(self):
-        config = QRCodeGenerationConfig.get_active_configuration()
+        config = QRCodeGenerationConfig.get_cached_active_configuration()
         serializer = self.get_serializer(data=self.request_data, instance=config, partial=True)
         serializer.is_valid(raise_exception=True)
         for key, value in serializer.validated_data.items():
             setattr(config, key, value)
         return config
 
+
+class QRCodeGenerateView(LabelConfigMixin, GenericAPIView):
+    queryset = Device.objects.all()
+    lookup_field = "ids"
+    parser_classes = (FormParser, JSONParser)
+    renderer_classes = (JSONRenderer, BrowsableAPIRenderer, ZPLRenderer)
+
     @cached_property
-    def device_ids(self):
+    def query_serializer(self) -> QRCodeGenerateQuerySerializer:
         serializer = self.get_serializer(data=self.request_data)
         serializer.is_valid(raise_exception=True)
-        return serializer.validated_data["ids"]
+        return serializer
 
     @cached_property
-    def qr_generator(self):
-        return DeviceQRCodeGenerator(
-            pdf_width_mm=self.qr_generation_config.label_width_mm,
-            pdf_height_mm=self.qr_generation_config.label_height_mm,
-            pdf_padding_mm=self.qr_generation_config.label_padding_mm,
-            gap_x_mm=self.qr_generation_config.label_horizontal_spacing_mm,
-            gap_y_mm=self.qr_generation_config.label_vertical_spacing_mm,
-            title_gap_mm=self.qr_generation_config.label_title_gap_mm,
-            dpi=self.qr_generation_config.dpi,
-            inv_prefix=self.qr_generation_config.inv_prefix,
-            sn_prefix=self.qr_generation_config.sn_prefix,
-            font_size_small=self.qr_generation_config.font_size_small,
-            font_size=self.qr_generation_config.font_size,
-            font_size_large=self.qr_generation_config.font_size_large,
-            fill_color=self.qr_generation_config.fill_color,
-            background_color=self.qr_generation_config.background_color,
-        )
+    def query_data(self):
+        return self.query_serializer.validated_data
+
+    @cached_property
+    def label_selection(self) -> LabelSelection:
+        return self.query_serializer.get_label_selection()
+
+    def get_device_queryset(self, selection: LabelSelection):
+        return get_label_devices(selection)
 
-    def get_device_queryset(self, ids: list[int]):
-        return Device.objects.filter(pk__in=ids).select_related("room", "owner", "device_model")
+    @property
+    def output_format(self) -> str:
+        if isinstance(self.request.accepted_renderer, ZPLRenderer):
+            return "zpl"
+        return "pdf"
+
+    @cached_property
+    def label_etag(self) -> str:
+        qs = self.get_device_queryset(self.label_selection)
+        return get_label_etag(self.qr_generation_config, qs, self.output_format)
 
     def get_context_data(self, *args, **kwargs):
-        qs = self.get_device_queryset(self.device_ids)
+        qs = self.get_device_queryset(self.label_selection)
+        return render_labels(
+            self.qr_generation_config,
+            iterate_label_records(qs),
+            count=qs.count(),
+            output_format=self.output_format,
+        )
+
+    def create_label_job(self):
+        job = create_label_job(
+            self.qr_generation_config,
+            self.label_selection,
+            requested_by=self.request.user if self.request.user.is_authenticated else None,
+        )
+        data = LabelJobSerializer(job, context=self.get_serializer_context()).data
+        status_url = reverse("inventory:labeljob-detail", kwargs={"pk": job.pk}, request=self.request)
+        return Response(data, status=status.HTTP_202_ACCEPTED, headers={"Location": status_url})
 
-        for device in qs:
-            self.qr_generator.add_device(device)
+    def render_response(self):
+        if self.query_data.get("mode") == "async":
+            if self.output_format != "pdf":
+                raise ValidationError({"mode": _("Label jobs can only render PDF documents.")})
+            return self.create_label_job()
 
-        pdf = self.qr_generator.build_pdf()
-        return pdf
+        etag = quote_etag(self.label_etag)
+        if etag in parse_etags(self.request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            labels = label_artifact_store.get_or_render(self.label_etag, self.get_context_data)
+            if self.output_format == "zpl":
+                response = FileResponse(labels, filename="device_labels.zpl", content_type=ZPLRenderer.media_type)
+            else:
+                response = FileResponse(labels, filename="device_labels.pdf", content_type="application/pdf")
+        response["ETag"] = etag
+        # browsers keep the document, but ask whether it changed before using it again
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
     @extend_schema(parameters=[QRCodeGenerateQuerySerializer])
     def get(self, *args, **kwargs):
-        pdf = self.get_context_data()
-
-        return FileResponse(pdf, filename="device_labels.pdf", content_type="application/pdf")
+        return self.render_response()
 
     @extend_schema(parameters=[QRCodeGenerateQuerySerializer])
     def post(self, *args, **kwargs):
-        pdf = self.get_context_data()
+        return self.render_response()
+
+
+class QRCodePreviewView(LabelConfigMixin, GenericAPIView):
+    """Label of a single device drawn at screen resolution, with the same configuration overrides as qr-generate."""
 
-        return FileResponse(pdf, filename="device_labels.pdf", content_type="application/pdf")
+    queryset = Device.objects.all()
+    # errors are reported as JSON unless only PNG is acceptable
+    renderer_classes = (JSONRenderer, PNGRenderer)
+
+    @extend_schema(parameters=[QRCodeGenerateQuerySerializer], responses={(200, "image/png"): bytes})
+    def get(self, request, pk: int, *args, **kwargs):
+        preview = get_label_preview(self.qr_generation_config, pk)
+        if preview is None:
+            raise Http404
+        return HttpResponse(preview, content_type=PNGRenderer.media_type)
+
+
+class LabelJobViewSet(DynamicFieldsViewMixin, ReadOnlyModelViewSet):
+    queryset = LabelJob.objects.all()
+    serializer_class = LabelJobSerializer
+    query_plan = QueryPlan.from_serializer(LabelJobSerializer)
+    # newest first
+    cursor_ordering = "-pk"
 
+    def get_queryset(self):
+        # on top of the model permissions, users other than superusers only see their own jobs
+        qs = super().get_queryset()
+        if self.request.user.is_superuser:
+            return qs
+        return qs.filter(requested_by=self.request.user)
 
-class FacultyViewSet(ModelViewSet):
+    @extend_schema(responses={(200, "application/pdf"): bytes})
+    @action(detail=True)
+    def download(self, request, *args, **kwargs):
+        job: LabelJob = self.get_object()
+        if job.status != LabelJob.Status.DONE:
+            return Response({"detail": _("Label job is not finished yet.")}, status=status.HTTP_409_CONFLICT)
+        return FileResponse(job.result.open("rb"), filename="device_labels.pdf", content_type="application/pdf")
+
+
+class FacultyViewSet(DynamicFieldsViewMixin, ModelViewSet):
     queryset = Faculty.objects.all()
     serializer_class = FacultySerializer
+    query_plan = QueryPlan.from_serializer(FacultySerializer)
 
 
-class BuildingViewSet(ModelViewSet):
+class BuildingViewSet(DynamicFieldsViewMixin, ModelViewSet):
     queryset = Building.objects.all()
     serializer_class = BuildingSerializer
+    query_plan = QueryPlan.from_serializer(BuildingSerializer)
 
 
-class RoomViewSet(ModelViewSet):
+class RoomViewSet(DynamicFieldsViewMixin, ModelViewSet):
     queryset = Room.objects.all()
     serializer_class = RoomSerializer
+    query_plan = QueryPlan.from_serializer(RoomSerializer)
+    filter_backends = (DjangoFilterBackend, OrderingFilter)
+    filterset_class = RoomFilterSet
+    ordering_fields = ("id", "room_number")
 
 
-class ManufacturerViewSet(ModelViewSet):
+class ManufacturerViewSet(DynamicFieldsViewMixin, ModelViewSet):
     queryset = Manufacturer.objects.all()
     serializer_class = ManufacturerSerializer
+    query_plan = QueryPlan.from_serializer(ManufacturerSerializer)
 
 
-class DeviceTypeViewSet(ModelViewSet):
+class DeviceTypeViewSet(DynamicFieldsViewMixin, ModelViewSet):
     queryset = DeviceType.objects.all()
     serializer_class = DeviceTypeSerializer
+    query_plan = QueryPlan.from_serializer(DeviceTypeSerializer)
 
 
-class DeviceModelViewSet(ModelViewSet):
+class DeviceModelViewSet(DynamicFieldsViewMixin, ModelViewSet):
     queryset = DeviceModel.objects.all()
     serializer_class = DeviceModelSerializer
+    query_plan = QueryPlan.from_serializer(DeviceModelSerializer)
 
 
-class DeviceViewSet(ModelViewSet):
+@extend_schema_view(**bulk_schemas(DeviceSerializer))
+class DeviceViewSet(BulkModelMixin, ExportMixin, DynamicFieldsViewMixin, ModelViewSet):
     queryset = Device.objects.all()
     serializer_class = DeviceSerializer
+    query_plan = QueryPlan.from_serializer(DeviceSerializer)
+    filter_backends = (DjangoFilterBackend, OrderingFilter)
+    filterset_class = DeviceFilterSet
+    ordering_fields = ("id", "updated_at")
+    export_columns = {
+        "id": "id",
+        "inventory_number": "inventory_number",
+        "serial_number": "serial_number",
+        "device_type": "device_model__device_type__name",
+        "manufacturer": "device_model__manufacturer__name",
+        "model": "device_model__name",
+        "building": "room__building__name",
+        "room": "room__room_number",
+        "owner": "owner__username",
+        "updated_at": "updated_at",
+    }
+    export_filename = "devices"
+
+    @extend_schema(parameters=[OpenApiParameter("code", str, required=True, description="Scanned compact QR payload")])
+    @action(detail=False)
+    def resolve(self, request, *args, **kwargs):
+        try:
+            device_id = decode_compact_payload(request.query_params.get("code", ""))
+        except InvalidPayloadError as error:
+            raise ValidationError({"code": [str(error)]}) from error
+        device = get_object_or_404(self.get_queryset(), pk=device_id)
+        return Response(self.get_serializer(device).data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "q",
+                str,
+                required=True,
+                description="Beginnings of words of the serial or inventory number, model, location or owner",
+            )
+        ],
+        responses=DeviceSearchResultSerializer(many=True),
+    )
+    @action(detail=False, serializer_class=DeviceSearchResultSerializer, pagination_class=CountedLimitOffsetPagination)
+    def search(self, request, *args, **kwargs):
+        """Devices matching all words of the query, the best matches first."""
+        query = request.query_params.get("q", "")
+        if not tokenize_query(query):
+            raise ValidationError({"q": [_("Enter words to search for.")]})
+        devices = search_devices(self.filter_queryset(self.get_queryset()), query).order_by("-search_rank", "pk")
+        page = self.paginate_queryset(devices)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
 
 
-class DeviceRentalViewSet(ModelViewSet):
+@extend_schema_view(**bulk_schemas(DeviceRentalSerializer))
+class DeviceRentalViewSet(BulkModelMixin, ExportMixin, DynamicFieldsViewMixin, ModelViewSet):
     queryset = DeviceRental.objects.all()
     serializer_class = DeviceRentalSerializer
+    query_plan = QueryPlan.from_serializer(DeviceRentalSerializer)
+    filter_backends = (DjangoFilterBackend, OrderingFilter)
+    filterset_class = DeviceRentalFilterSet
+    ordering_fields = ("id", "rental_date")
+    export_columns = {
+        "id": "id",
+        "device": "device_id",
+        "inventory_number": "device__inventory_number",
+        "serial_number": "device__serial_number",
+        "borrower": "borrower__username",
+        "rental_date": "rental_date",
+        "return_date": "return_date",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+    }
+    export_filename = "device_rentals"
+    # the rental history only grows, recent rentals come first
+    cursor_ordering = "-pk"
@@ -5,3 +5,12 @@ class InventoryConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "devicemanager.inventory"
     label = "inventory"
+
+    def ready(self):
+        from devicemanager.inventory import search
+        from devicemanager.inventory.qr_code import load_fonts
+
+        search.connect_signals()
+
+        # fonts are parsed before gunicorn --preload forks the workers, not in the first label request
+        load_fonts()
@@ -0,0 +1,57 @@
+from collections.abc import Iterator
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.utils.http import content_disposition_header
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from rest_framework.decorators import action
+
+from devicemanager.inventory.renderers import CSVRenderer, NDJSONRenderer
+
+
+def iterate_export_batches(queryset: QuerySet, lookups: list[str], chunk_size: int) -> Iterator[list[tuple]]:
+    """
+    Read the values of ``lookups`` for the rows of ``queryset`` in batches of ``chunk_size``, by primary key.
+
+    Each batch continues after the last primary key of the previous one, so every query costs the same and
+    no result set is held by the database driver. Batches are read in one transaction and see the same
+    snapshot of the tables.
+    """
+    rows = queryset.order_by("pk").values_list("pk", *lookups)
+    with transaction.atomic():
+        batch = list(rows[:chunk_size])
+        while batch:
+            yield [row[1:] for row in batch]
+            if len(batch) < chunk_size:
+                return
+            batch = list(rows.filter(pk__gt=batch[-1][0])[:chunk_size])
+
+
+class ExportMixin:
+    """
+    Stream the rows of the list, with the filters of the list, as NDJSON or CSV at ``<list url>/export/``.
+
+    ``export_columns`` maps column names to the lookups of their values. Rows are read in batches of
+    ``API_EXPORT_CHUNK_SIZE`` and encoded while the response is sent, memory does not grow with the table.
+    """
+
+    export_columns: dict[str, str] = {}
+    export_filename = "export"
+
+    @extend_schema(
+        responses={(200, NDJSONRenderer.media_type): OpenApiTypes.STR, (200, CSVRenderer.media_type): OpenApiTypes.STR}
+    )
+    @action(detail=False, renderer_classes=(NDJSONRenderer, CSVRenderer), pagination_class=None)
+    def export(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).select_related(None).prefetch_related(None)
+        batches = iterate_export_batches(queryset, list(self.export_columns.values()), settings.API_EXPORT_CHUNK_SIZE)
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.encode_batches(list(self.export_columns), batches),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response["Content-Disposition"] = content_disposition_header(True, f"{self.export_filename}.{renderer.format}")
+        return response
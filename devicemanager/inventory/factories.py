@@ -0,0 +1,91 @@
+import factory
+
+from devicemanager.inventory.label_records import LabelRecord
+from devicemanager.inventory.models import (
+    Building,
+    Device,
+    DeviceModel,
+    DeviceType,
+    Faculty,
+    Manufacturer,
+    Room,
+)
+from devicemanager.users.factories import UserFactory
+
+
+class FacultyFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Faculty
+        django_get_or_create = ("short_name",)
+
+    full_name = factory.Sequence(lambda n: f"Faculty {n}")
+    short_name = factory.Sequence(lambda n: f"F{n}")
+
+
+class BuildingFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Building
+
+    name = factory.Sequence(lambda n: f"B-{n}")
+    faculty = factory.SubFactory(FacultyFactory)
+
+
+class RoomFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Room
+
+    room_number = factory.Sequence(lambda n: f"{100 + n}")
+    building = factory.SubFactory(BuildingFactory)
+
+
+class ManufacturerFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Manufacturer
+        django_get_or_create = ("name",)
+
+    name = factory.Sequence(lambda n: f"Manufacturer {n}")
+
+
+class DeviceTypeFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = DeviceType
+
+    name = "Laptop"
+    short_name = "LAP"
+
+
+class DeviceModelFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = DeviceModel
+
+    name = factory.Sequence(lambda n: f"Model {n}")
+    device_type = factory.SubFactory(DeviceTypeFactory)
+    manufacturer = factory.SubFactory(ManufacturerFactory)
+
+
+class DeviceFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Device
+
+    device_model = factory.SubFactory(DeviceModelFactory)
+    room = factory.SubFactory(RoomFactory)
+    owner = factory.SubFactory(UserFactory)
+    inventory_number = factory.Sequence(lambda n: f"WFiIS/{n:06}/2024")
+    serial_number = factory.Sequence(lambda n: f"SN{n * 7919:010}")
+
+
+def build_sample_records(count: int) -> list[LabelRecord]:
+    """Build label records of synthetic devices spread over 20 rooms of one building, without touching the database."""
+    return [
+        LabelRecord(
+            id=device_id,
+            building="D-10",
+            room_number=f"{101 + device_id % 20}",
+            owner_name="Jan Kowalski",
+            inventory_number=f"WFiIS/{device_id:06}/2024",
+            serial_number=f"SN{device_id * 7919:010}",
+            manufacturer="Dell",
+            model_name="Latitude 5440",
+        )
+        for device_id in range(1, count + 1)
+    ]
@@ -0,0 +1,64 @@
+from django.db.models import Exists, OuterRef
+from django.utils.translation import gettext_lazy as _
+from django_filters import rest_framework as filters
+
+from devicemanager.inventory.models import Device, DeviceRental, Room
+
+
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    """Comma separated ids, like the device filters of ``/inventory/qr-generate/``."""
+
+
+class DeviceFilterSet(filters.FilterSet):
+    room = NumberInFilter(field_name="room", lookup_expr="in")
+    building = NumberInFilter(field_name="room__building", lookup_expr="in")
+    faculty = NumberInFilter(field_name="room__building__faculty", lookup_expr="in")
+    owner = NumberInFilter(field_name="owner", lookup_expr="in")
+    device_type = NumberInFilter(field_name="device_model__device_type", lookup_expr="in")
+    manufacturer = NumberInFilter(field_name="device_model__manufacturer", lookup_expr="in")
+    device_model = NumberInFilter(field_name="device_model", lookup_expr="in")
+    is_rented = filters.BooleanFilter(method="filter_is_rented", label=_("Is rented"))
+    # case insensitive LIKE 'prefix%' on MariaDB, which can range scan the index of the column
+    inventory_number = filters.CharFilter(lookup_expr="istartswith", label=_("Inventory number prefix"))
+    serial_number = filters.CharFilter(lookup_expr="istartswith", label=_("Serial number prefix"))
+
+    class Meta:
+        model = Device
+        fields = [
+            "room",
+            "building",
+            "faculty",
+            "owner",
+            "device_type",
+            "manufacturer",
+            "device_model",
+            "is_rented",
+            "inventory_number",
+            "serial_number",
+        ]
+
+    def filter_is_rented(self, queryset, name, value):
+        open_rentals = DeviceRental.objects.filter(device=OuterRef("pk"), return_date=None)
+        return queryset.filter(Exists(open_rentals) if value else ~Exists(open_rentals))
+
+
+class DeviceRentalFilterSet(filters.FilterSet):
+    device = NumberInFilter(field_name="device", lookup_expr="in")
+    borrower = NumberInFilter(field_name="borrower", lookup_expr="in")
+    rental_date = filters.DateFromToRangeFilter()
+    return_date = filters.DateFromToRangeFilter()
+    is_open = filters.BooleanFilter(field_name="return_date", lookup_expr="isnull", label=_("Is open"))
+
+    class Meta:
+        model = DeviceRental
+        fields = ["device", "borrower", "rental_date", "return_date", "is_open"]
+
+
+class RoomFilterSet(filters.FilterSet):
+    building = NumberInFilter(field_name="building", lookup_expr="in")
+    faculty = NumberInFilter(field_name="building__faculty", lookup_expr="in")
+    occupant = NumberInFilter(field_name="occupants", lookup_expr="in", distinct=True)
+
+    class Meta:
+        model = Room
+        fields = ["building", "faculty", "occupant"]
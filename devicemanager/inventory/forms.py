@@ -43,6 +43,19 @@ class DeviceRentalForm(forms.ModelForm):
         return cleaned_data
 
 
+class LabelPreviewWidget(forms.Widget):
+    template_name = "widgets/label_preview_widget.html"
+
+    def __init__(self, preview_url: str | None = None, *args, **kwargs):
+        self.preview_url = preview_url
+        super().__init__(*args, **kwargs)
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context["widget"]["preview_url"] = self.preview_url
+        return context
+
+
 class QRCodeGenerationConfigForm(forms.ModelForm):
     included_labels = forms.MultipleChoiceField(
         label=_("Included labels"),
@@ -50,7 +63,15 @@ class QRCodeGenerationConfigForm(forms.ModelForm):
         required=False,
         widget=forms.CheckboxSelectMultiple,
     )
+    label_preview = forms.CharField(required=False, label=_("Preview"))
 
     class Meta:
         model = Device
         exclude = ("id",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # the label of the first device is redrawn with the values being edited
+        device_id = Device.objects.order_by("pk").values_list("pk", flat=True).first()
+        preview_url = reverse("inventory:qr-preview", args=(device_id,)) if device_id is not None else None
+        self.fields["label_preview"].widget = LabelPreviewWidget(preview_url=preview_url)
@@ -0,0 +1,140 @@
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import IO
+
+from django.conf import settings
+from django.db.models import QuerySet
+
+from devicemanager.inventory.models import Device, QRCodeGenerationConfig
+
+# identifies the output of the label rendering code, bump it with every change to how labels look
+LABEL_RENDER_VERSION = 1
+
+# change markers of every row whose values are printed on a label
+LABEL_CHANGE_MARKERS = (
+    "pk",
+    "updated_at",
+    "room__updated_at",
+    "room__building__updated_at",
+    "owner__updated_at",
+    "device_model__updated_at",
+    "device_model__manufacturer__updated_at",
+)
+
+
+def get_label_etag(config: QRCodeGenerationConfig, devices: QuerySet[Device], output_format: str) -> str:
+    """
+    Return a digest identifying the labels rendered for ``devices`` with ``config``.
+
+    The digest covers the render version, the output format, the effective generation settings and, in a single query,
+    the ids of the selected devices in print order together with the change markers of the rows
+    shown on their labels. Updates made with ``QuerySet.update()`` do not touch the markers.
+    """
+    digest = hashlib.sha256()
+    generation_settings = json.dumps(config.get_generation_settings(), sort_keys=True, default=str)
+    digest.update(f"{LABEL_RENDER_VERSION}|{output_format}|{generation_settings}|".encode())
+    markers = devices.values_list(*LABEL_CHANGE_MARKERS)
+    for row in markers.iterator(chunk_size=settings.LABEL_DEVICE_CHUNK_SIZE):
+        digest.update(repr(row).encode())
+    return digest.hexdigest()
+
+
+class LabelArtifactStore:
+    """
+    Directory of rendered label documents keyed by their ETag, shared by all workers of a host.
+
+    Rendering a key is serialized with a lock file, so identical concurrent requests render the
+    document once and the others wait for it. Once the directory grows past
+    ``LABEL_ARTIFACT_STORE_MAX_SIZE`` bytes, the least recently used documents are deleted.
+    """
+
+    lock_suffix = ".lock"
+    temporary_suffix = ".tmp"
+
+    @property
+    def directory(self) -> Path:
+        return Path(settings.LABEL_ARTIFACT_DIR)
+
+    def get_or_render(self, key: str, render: Callable[[], IO[bytes]]) -> IO[bytes]:
+        """Return the stored document of ``key`` opened for reading, rendering and storing it first if missing."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / key
+        with self._lock(path) as lock:
+            try:
+                artifact = open(path, "rb")
+            except FileNotFoundError:
+                self._store(path, render)
+                artifact = open(path, "rb")
+            else:
+                # the modification time orders documents for eviction
+                os.utime(path)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        self.evict()
+        return artifact
+
+    def _lock(self, path: Path) -> IO:
+        """Open and lock the lock file of ``path``, again when eviction deleted the file while waiting for it."""
+        lock_path = path.with_suffix(self.lock_suffix)
+        while True:
+            lock = open(lock_path, "a")
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if self._holds_current_lock(lock, lock_path):
+                return lock
+            lock.close()
+
+    @staticmethod
+    def _holds_current_lock(lock: IO, lock_path: Path) -> bool:
+        try:
+            return os.stat(lock_path).st_ino == os.fstat(lock.fileno()).st_ino
+        except FileNotFoundError:
+            return False
+
+    def _store(self, path: Path, render: Callable[[], IO[bytes]]) -> None:
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix=self.temporary_suffix, delete=False) as output:
+            try:
+                with render() as rendered:
+                    shutil.copyfileobj(rendered, output)
+            except BaseException:
+                os.unlink(output.name)
+                raise
+        os.replace(output.name, path)
+
+    def evict(self) -> int:
+        """Delete the least recently used documents until the store fits its size limit, return their number."""
+        artifacts = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith((self.lock_suffix, self.temporary_suffix)):
+                stat = entry.stat()
+                artifacts.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+
+        size = sum(artifact_size for _, artifact_size, _ in artifacts)
+        evicted = 0
+        for _, artifact_size, path in sorted(artifacts):
+            if size <= settings.LABEL_ARTIFACT_STORE_MAX_SIZE:
+                break
+            lock_path = path.with_suffix(self.lock_suffix)
+            with open(lock_path, "a") as lock:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    # a request is using the document right now
+                    continue
+                if not self._holds_current_lock(lock, lock_path):
+                    continue
+                # responses still reading a deleted document keep their open file, requests waiting for
+                # the lock notice that it was deleted and lock the file created by the next request
+                path.unlink(missing_ok=True)
+                lock_path.unlink()
+            size -= artifact_size
+            evicted += 1
+        return evicted
+
+
+label_artifact_store = LabelArtifactStore()
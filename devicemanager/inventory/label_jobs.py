@@ -0,0 +1,119 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+from devicemanager.inventory.label_records import iterate_label_records
+from devicemanager.inventory.label_rendering import (
+    LabelSelection,
+    get_label_devices,
+    render_labels,
+)
+from devicemanager.inventory.models import (
+    DeviceSelection,
+    LabelJob,
+    QRCodeGenerationConfig,
+)
+from devicemanager.users.models import User
+
+logger = logging.getLogger(__name__)
+
+
+def create_label_job(config: QRCodeGenerationConfig, selection: LabelSelection, requested_by: User | None) -> LabelJob:
+    return LabelJob.objects.create(
+        requested_by=requested_by,
+        selection=selection,
+        config=config.get_generation_settings(),
+    )
+
+
+def claim_next_job() -> LabelJob | None:
+    """
+    Take the oldest pending job off the queue.
+
+    The job is claimed with a conditional update, so several workers can poll the same queue
+    without processing a job twice.
+    """
+    pending = LabelJob.objects.filter(status=LabelJob.Status.PENDING)
+    for job in pending.order_by("created_at")[:10]:
+        now = timezone.now()
+        claimed = pending.filter(pk=job.pk).update(status=LabelJob.Status.RUNNING, started_at=now, updated_at=now)
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def requeue_stale_jobs() -> int:
+    """
+    Put running jobs without progress for ``LABEL_JOB_CLAIM_TIMEOUT`` back on the queue.
+
+    Running jobs record their progress regularly, so a job which stopped updating was claimed by
+    a worker that exited before finishing it. It is picked up again by the next worker polling the queue.
+    """
+    now = timezone.now()
+    stale = LabelJob.objects.filter(
+        status=LabelJob.Status.RUNNING,
+        updated_at__lt=now - settings.LABEL_JOB_CLAIM_TIMEOUT,
+    )
+    return stale.update(status=LabelJob.Status.PENDING, started_at=None, pages_rendered=0, updated_at=now)
+
+
+def run_label_job(job: LabelJob) -> None:
+    config = QRCodeGenerationConfig(**job.config)
+    devices = get_label_devices(job.selection)
+    pages_total = devices.count()
+    LabelJob.objects.filter(pk=job.pk).update(pages_total=pages_total)
+
+    last_update = time.monotonic()
+
+    def report_progress(rendered: int) -> None:
+        nonlocal last_update
+        now = time.monotonic()
+        if now - last_update >= settings.LABEL_JOB_PROGRESS_INTERVAL or rendered == pages_total:
+            # also refreshes updated_at, which tells requeue_stale_jobs() that the job is still being worked on
+            LabelJob.objects.filter(pk=job.pk).update(pages_rendered=rendered, updated_at=timezone.now())
+            last_update = now
+
+    try:
+        with render_labels(config, iterate_label_records(devices), count=pages_total, progress=report_progress) as pdf:
+            job.result.save(f"labels-{job.pk}.pdf", File(pdf), save=False)
+    except Exception as error:
+        logger.exception("Label job %s failed", job.pk)
+        job.status = LabelJob.Status.FAILED
+        job.error = str(error)
+    else:
+        job.status = LabelJob.Status.DONE
+        job.pages_rendered = pages_total
+    job.pages_total = pages_total
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "error", "result", "pages_rendered", "pages_total", "finished_at", "updated_at"])
+
+
+def delete_expired_jobs() -> int:
+    """Delete jobs finished longer than ``LABEL_JOB_RETENTION`` ago with their PDFs, queued and running jobs are kept."""
+    expired = LabelJob.objects.filter(
+        status__in=(LabelJob.Status.DONE, LabelJob.Status.FAILED),
+        finished_at__lt=timezone.now() - settings.LABEL_JOB_RETENTION,
+    )
+    count = 0
+    for job in expired.iterator():
+        if job.result:
+            job.result.delete(save=False)
+        job.delete()
+        count += 1
+    return count
+
+
+def delete_expired_selections() -> int:
+    """Delete expired device selections, except the ones still to be rendered by queued or running jobs."""
+    queued_jobs = LabelJob.objects.filter(
+        status__in=(LabelJob.Status.PENDING, LabelJob.Status.RUNNING),
+        selection__has_key="selection",
+    )
+    expired = DeviceSelection.objects.filter(
+        created_at__lt=timezone.now() - settings.DEVICE_SELECTION_RETENTION,
+    ).exclude(pk__in=list(queued_jobs.values_list("selection__selection", flat=True)))
+    return expired.delete()[1].get(DeviceSelection._meta.label, 0)
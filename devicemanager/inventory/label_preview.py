@@ -0,0 +1,121 @@
+import hashlib
+import io
+import json
+from functools import lru_cache
+from typing import IO
+
+from django.conf import settings
+from django.core.cache import caches
+from PIL import Image, ImageDraw, ImageFont
+
+from devicemanager.inventory.label_artifacts import (
+    LABEL_CHANGE_MARKERS,
+    LABEL_RENDER_VERSION,
+)
+from devicemanager.inventory.label_records import LabelRecord, iterate_label_records
+from devicemanager.inventory.models import Device, QRCodeGenerationConfig
+from devicemanager.inventory.qr_code import (
+    FONT_FILES,
+    LabelGenerator,
+    get_font_metrics,
+    render_qr_code_png,
+)
+
+
+@lru_cache(maxsize=64)
+def get_preview_font(font_name: str, font_size: float) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(settings.BASE_DIR / FONT_FILES[font_name], font_size)
+
+
+class DeviceLabelPreviewGenerator(LabelGenerator):
+    """
+    Draw a label as a PNG image for previews on screen.
+
+    The label is laid out with the template of the configured DPI, exactly like PDF labels, and the
+    drawing is then scaled to ``preview_dpi``, so positions and font sizes keep their proportions.
+    Only one label is drawn, adding another one replaces it.
+    """
+
+    def __init__(self, preview_dpi: int = 96, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.scale = preview_dpi / self.dpi
+        self._image: Image.Image | None = None
+
+    def _point(self, x: float, y: float) -> tuple[int, int]:
+        """Convert a position measured from the bottom left corner of the label to image pixels."""
+        return round(x * self.scale), round((self.pdf_height - y) * self.scale)
+
+    def add_device(self, record: LabelRecord) -> None:
+        template = self.template
+        image = Image.new("RGB", self._point(self.pdf_width, 0), self.background_color)
+        draw = ImageDraw.Draw(image)
+
+        qr_size = round(self.qr_size * self.scale)
+        matrix = self._make_qr_code(self.get_qr_code_data(record)).get_matrix()
+        qr_code = Image.open(io.BytesIO(render_qr_code_png(matrix, qr_size, self.fill_color, self.background_color)))
+        image.paste(qr_code, self._point(template.qr_x, template.qr_y + self.qr_size))
+
+        model_x = template.text_x + get_font_metrics(self.bold_font).string_width(record.manufacturer, self.font_size)
+        runs = (
+            (
+                template.text_x,
+                template.title_y,
+                f"{record.building} - {record.room_number}",
+                True,
+                self.font_size_large,
+            ),
+            (template.text_x, template.owner_y, record.owner_name, False, self.font_size),
+            (template.text_x, template.inventory_y, f"{self.inv_prefix} ", False, self.font_size_small),
+            (template.inventory_x, template.inventory_y, f"{record.inventory_number}", False, self.font_size),
+            (template.text_x, template.model_y, record.manufacturer, True, self.font_size),
+            (model_x, template.model_y, f" - {record.model_name}", False, self.font_size),
+            (template.text_x, template.serial_y, f"{self.sn_prefix} ", False, self.font_size_small),
+            (template.serial_x, template.serial_y, f"{record.serial_number}", False, self.font_size),
+        )
+        for x, y, text, bold, font_size in runs:
+            font = get_preview_font(self.bold_font if bold else self.standard_font, font_size * self.scale)
+            # positions are text baselines, like in the PDF
+            draw.text(self._point(x, y), text, font=font, fill=self.fill_color, anchor="ls")
+        self._image = image
+
+    def build(self) -> IO[bytes]:
+        buffer = io.BytesIO()
+        self._image.save(buffer, format="PNG")
+        buffer.seek(0)
+        return buffer
+
+
+def get_label_preview_key(config: QRCodeGenerationConfig, device_id: int, preview_dpi: int) -> str | None:
+    """
+    Return the cache key of a device label preview, or ``None`` when the device does not exist.
+
+    The key covers the render version, the effective generation settings and the change markers of the rows shown on
+    the label, which are read in one query, so previews never have to be invalidated.
+    """
+    markers = Device.objects.filter(pk=device_id).values_list(*LABEL_CHANGE_MARKERS).first()
+    if markers is None:
+        return None
+    digest = hashlib.sha256()
+    generation_settings = json.dumps(config.get_generation_settings(), sort_keys=True, default=str)
+    digest.update(f"{preview_dpi}|{generation_settings}|{markers!r}".encode())
+    return f"label-preview:v{LABEL_RENDER_VERSION}:" + digest.hexdigest()
+
+
+def get_label_preview(config: QRCodeGenerationConfig, device_id: int) -> bytes | None:
+    """Return a PNG preview of the label of a device, drawn at ``LABEL_PREVIEW_DPI`` and cached."""
+    preview_dpi = settings.LABEL_PREVIEW_DPI
+    key = get_label_preview_key(config, device_id, preview_dpi)
+    if key is None:
+        return None
+    cache = caches["label_previews"]
+    preview = cache.get(key)
+    if preview is None:
+        record = next(iterate_label_records(Device.objects.filter(pk=device_id)), None)
+        if record is None:
+            return None
+        generator = DeviceLabelPreviewGenerator.from_config(config, preview_dpi=preview_dpi)
+        generator.add_device(record)
+        with generator.build() as png:
+            preview = png.read()
+        cache.set(key, preview)
+    return preview
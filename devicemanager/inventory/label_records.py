@@ -0,0 +1,67 @@
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Self
+
+from django.conf import settings
+from django.db.models import QuerySet
+
+from devicemanager.inventory.models import Device
+
+# columns printed on a label, fetched with a single joined query in this order
+LABEL_RECORD_FIELDS = (
+    "pk",
+    "room__building__name",
+    "room__room_number",
+    "owner__first_name",
+    "owner__last_name",
+    "inventory_number",
+    "serial_number",
+    "device_model__manufacturer__name",
+    "device_model__name",
+)
+
+
+@dataclass(slots=True)
+class LabelRecord:
+    """
+    Values of a device printed on its label.
+
+    The label pipeline streams these instead of model instances, they hold only the printed columns
+    and are cheap to create and to pickle for worker processes.
+    """
+
+    id: int
+    building: str | None
+    room_number: str | None
+    owner_name: str
+    inventory_number: str | None
+    serial_number: str | None
+    manufacturer: str
+    model_name: str
+
+    @classmethod
+    def from_row(cls, row: tuple) -> Self:
+        pk, building, room_number, first_name, last_name, inventory_number, serial_number, manufacturer, model = row
+        # same as User.get_full_name(), devices without an owner print no name
+        owner_name = f"{first_name} {last_name}".strip() if first_name is not None else ""
+        return cls(pk, building, room_number, owner_name, inventory_number, serial_number, manufacturer, model)
+
+    @classmethod
+    def from_device(cls, device: Device) -> Self:
+        room = device.room
+        return cls(
+            id=device.pk,
+            building=room.building.name if room else None,
+            room_number=room.room_number if room else None,
+            owner_name=device.owner.get_full_name() if device.owner else "",
+            inventory_number=device.inventory_number,
+            serial_number=device.serial_number,
+            manufacturer=device.device_model.manufacturer.name,
+            model_name=device.device_model.name,
+        )
+
+
+def iterate_label_records(devices: QuerySet[Device]) -> Iterator[LabelRecord]:
+    """Stream the label records of ``devices`` from one query, fetched in chunks of ``LABEL_DEVICE_CHUNK_SIZE`` rows."""
+    rows = devices.values_list(*LABEL_RECORD_FIELDS).iterator(chunk_size=settings.LABEL_DEVICE_CHUNK_SIZE)
+    return map(LabelRecord.from_row, rows)
@@ -0,0 +1,204 @@
+import atexit
+import io
+import math
+import multiprocessing
+import os
+import tempfile
+from collections import deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from itertools import batched, islice
+from typing import IO, TypedDict
+
+import django
+from django.conf import settings
+from django.db.models import Exists, OuterRef, QuerySet
+
+from devicemanager.inventory.label_records import LabelRecord
+from devicemanager.inventory.models import Device, DeviceRental, QRCodeGenerationConfig
+from devicemanager.inventory.pdf_stream import PdfConcatenator
+from devicemanager.inventory.qr_cache import QRCodeImageCache
+from devicemanager.inventory.qr_code import DeviceQRCodeGenerator, LabelGenerator
+from devicemanager.inventory.zpl import DeviceZPLGenerator
+
+_executor: ProcessPoolExecutor | None = None
+
+ProgressCallback = Callable[[int], None]
+
+LABEL_GENERATORS: dict[str, type[LabelGenerator]] = {
+    "pdf": DeviceQRCodeGenerator,
+    "zpl": DeviceZPLGenerator,
+}
+
+
+def get_worker_count() -> int:
+    return settings.LABEL_RENDER_WORKERS or os.cpu_count() or 1
+
+
+def create_executor(workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        # referenced directly, so unpickling the initializer does not import any models
+        initializer=django.setup,
+    )
+
+
+def get_executor() -> Executor:
+    """
+    Return the process pool shared by all label requests of this process.
+
+    Workers are spawned rather than forked, so they never inherit database connections
+    or other sockets of the web worker.
+    """
+    global _executor
+    if _executor is None:
+        _executor = create_executor(get_worker_count())
+        atexit.register(_executor.shutdown, cancel_futures=True)
+    return _executor
+
+
+class LabelSelection(TypedDict, total=False):
+    ids: list[int]
+    selection: str
+    building: list[int]
+    room: list[int]
+    owner: list[int]
+    device_type: list[int]
+    device_model: list[int]
+    is_rented: bool
+
+
+LABEL_SELECTION_FILTERS = {
+    "ids": "pk__in",
+    "selection": "selections",
+    "building": "room__building__in",
+    "room": "room__in",
+    "owner": "owner__in",
+    "device_type": "device_model__device_type__in",
+    "device_model": "device_model__in",
+}
+LABEL_SELECTION_FIELDS = (*LABEL_SELECTION_FILTERS, "is_rented")
+
+
+def get_label_devices(selection: LabelSelection) -> QuerySet[Device]:
+    """
+    Return devices matching all criteria of the selection, in a stable order.
+
+    Labels are rendered from ``iterate_label_records``, which fetches the printed columns of the related
+    rows in the same query, so nothing is selected or prefetched here.
+    """
+    qs = Device.objects.all()
+    for field, lookup in LABEL_SELECTION_FILTERS.items():
+        if field in selection:
+            qs = qs.filter(**{lookup: selection[field]})
+    if "is_rented" in selection:
+        open_rentals = DeviceRental.objects.filter(device=OuterRef("pk"), return_date=None)
+        qs = qs.filter(Exists(open_rentals) if selection["is_rented"] else ~Exists(open_rentals))
+    return qs.order_by("pk")
+
+
+def render_labels_in_process(
+    config: QRCodeGenerationConfig,
+    records: Iterable[LabelRecord],
+    use_cache: bool = True,
+    progress: ProgressCallback | None = None,
+    output_format: str = "pdf",
+) -> IO[bytes]:
+    generator_class = LABEL_GENERATORS[output_format]
+    kwargs = {}
+    if not use_cache and issubclass(generator_class, DeviceQRCodeGenerator):
+        kwargs["qr_code_cache"] = QRCodeImageCache(max_entries=0, disk_cache_alias=None)
+    generator = generator_class.from_config(config, **kwargs)
+    for rendered, record in enumerate(records, start=1):
+        generator.add_device(record)
+        if progress is not None:
+            progress(rendered)
+    return generator.build()
+
+
+def render_chunk(config: QRCodeGenerationConfig, records: Iterable[LabelRecord], use_cache: bool = True) -> bytes:
+    with render_labels_in_process(config, records, use_cache) as pdf:
+        return pdf.read()
+
+
+def merge_pdfs(chunks: Iterable[bytes]) -> IO[bytes]:
+    """Write chunks to a spooled file as they arrive, so only the chunk being appended is held in memory."""
+    output = tempfile.SpooledTemporaryFile(max_size=settings.LABEL_PDF_SPOOL_MAX_SIZE)
+    concatenator = PdfConcatenator(output)
+    for chunk in chunks:
+        concatenator.append(io.BytesIO(chunk))
+    concatenator.finish()
+    output.seek(0)
+    return output
+
+
+def get_chunk_size(config: QRCodeGenerationConfig, count: int, workers: int) -> int:
+    # chunks end on a page boundary, so merging them leaves no partially filled sheets in the middle
+    pages = math.ceil(count / config.labels_per_page)
+    chunk_pages = min(
+        math.ceil(pages / workers),
+        math.ceil(settings.LABEL_PARALLEL_CHUNK_SIZE / config.labels_per_page),
+    )
+    return max(chunk_pages, 1) * config.labels_per_page
+
+
+def render_labels_in_parallel(
+    config: QRCodeGenerationConfig,
+    records: Iterable[LabelRecord],
+    count: int,
+    executor: Executor,
+    workers: int,
+    use_cache: bool = True,
+    progress: ProgressCallback | None = None,
+) -> IO[bytes]:
+    """
+    Render labels in chunks of at most ``LABEL_PARALLEL_CHUNK_SIZE`` devices on ``executor``.
+
+    Chunks are submitted as earlier ones are merged, with at most two per worker in flight, so only
+    the records and rendered documents of those chunks are held by this process at any time.
+    """
+    chunks = batched(records, get_chunk_size(config, count, workers))
+    in_flight: deque[tuple[Future[bytes], int]] = deque()
+
+    def submit(chunk_count: int) -> None:
+        for chunk in islice(chunks, chunk_count):
+            in_flight.append((executor.submit(render_chunk, config, chunk, use_cache), len(chunk)))
+
+    def results():
+        rendered = 0
+        submit(workers * 2)
+        try:
+            while in_flight:
+                future, chunk_length = in_flight.popleft()
+                chunk = future.result()
+                submit(1)
+                rendered += chunk_length
+                if progress is not None:
+                    progress(rendered)
+                yield chunk
+        finally:
+            for future, _ in in_flight:
+                future.cancel()
+
+    return merge_pdfs(results())
+
+
+def render_labels(
+    config: QRCodeGenerationConfig,
+    records: Iterable[LabelRecord],
+    count: int,
+    progress: ProgressCallback | None = None,
+    output_format: str = "pdf",
+) -> IO[bytes]:
+    """
+    Render the labels of ``records`` into a single document of ``output_format``, keeping their order.
+
+    PDF jobs of at least ``LABEL_PARALLEL_THRESHOLD`` labels are split into chunks rendered by worker
+    processes, the partial documents are then merged page by page. Smaller jobs and printer command formats,
+    which only emit text, are rendered in-process.
+    """
+    workers = get_worker_count()
+    if output_format != "pdf" or count < settings.LABEL_PARALLEL_THRESHOLD or workers < 2:
+        return render_labels_in_process(config, records, progress=progress, output_format=output_format)
+    return render_labels_in_parallel(config, records, count, get_executor(), workers, progress=progress)
@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from devicemanager.inventory.label_jobs import (
+    claim_next_job,
+    delete_expired_jobs,
+    delete_expired_selections,
+    requeue_stale_jobs,
+    run_label_job,
+)
+
+
+class Command(BaseCommand):
+    help = "Process queued label print jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Process all pending jobs and exit")
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to wait before polling an empty queue again",
+        )
+        parser.add_argument(
+            "--cleanup-interval",
+            type=float,
+            default=3600.0,
+            help="Seconds between removals of expired jobs and their results",
+        )
+
+    def handle(self, *args, once: bool, poll_interval: float, cleanup_interval: float, **options):
+        next_cleanup = time.monotonic()
+        while True:
+            close_old_connections()
+
+            if time.monotonic() >= next_cleanup:
+                deleted_jobs = delete_expired_jobs()
+                deleted_selections = delete_expired_selections()
+                if deleted_jobs or deleted_selections:
+                    self.stdout.write(
+                        f"Deleted {deleted_jobs} expired label jobs and {deleted_selections} device selections"
+                    )
+                next_cleanup = time.monotonic() + cleanup_interval
+
+            requeued_jobs = requeue_stale_jobs()
+            if requeued_jobs:
+                self.stdout.write(f"Requeued {requeued_jobs} label jobs abandoned by stopped workers")
+
+            job = claim_next_job()
+            if job is None:
+                if once:
+                    return
+                time.sleep(poll_interval)
+                continue
+
+            self.stdout.write(f"Processing label job {job.pk} ({job.pages_total} labels)")
+            run_label_job(job)
+            self.stdout.write(f"Label job {job.pk} finished with status {job.status}")
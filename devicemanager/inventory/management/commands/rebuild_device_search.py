@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from devicemanager.inventory.models import Device
+from devicemanager.inventory.search import update_documents
+
+
+class Command(BaseCommand):
+    help = "Rebuild the search documents of all devices, e.g. after loading fixtures"
+
+    def handle(self, *args, **options):
+        update_documents(Device.objects.all())
+        self.stdout.write(f"Rebuilt the search documents of {Device.objects.count()} devices")
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventory", "0017_rename_guardian_device_owner"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="qrcodegenerationconfig",
+            name="qr_renderer",
+            field=models.CharField(
+                choices=[("raster", "Raster (PNG image)"), ("vector", "Vector (drawn on the PDF canvas)")],
+                default="raster",
+                max_length=16,
+                verbose_name="QR Code Renderer",
+            ),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventory", "0018_qrcodegenerationconfig_qr_renderer"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LabelJob",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Created At")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="Updated At")),
+                ("id", models.AutoField(primary_key=True, serialize=False, verbose_name="Label Job ID")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=16,
+                        verbose_name="Status",
+                    ),
+                ),
+                ("device_ids", models.JSONField(default=list, verbose_name="Device IDs")),
+                ("config", models.JSONField(default=dict, verbose_name="QR Code Generation Config")),
+                ("pages_rendered", models.PositiveIntegerField(default=0, verbose_name="Pages rendered")),
+                ("pages_total", models.PositiveIntegerField(default=0, verbose_name="Pages total")),
+                ("result", models.FileField(blank=True, null=True, upload_to="label_jobs/", verbose_name="Result")),
+                ("error", models.TextField(blank=True, verbose_name="Error")),
+                ("started_at", models.DateTimeField(blank=True, null=True, verbose_name="Started At")),
+                ("finished_at", models.DateTimeField(blank=True, null=True, verbose_name="Finished At")),
+                (
+                    "requested_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="label_jobs",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Requested by",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Label Job",
+                "verbose_name_plural": "Label Jobs",
+                "indexes": [models.Index(models.F("status"), models.F("created_at"), name="label_job_queue_idx")],
+            },
+        ),
+    ]
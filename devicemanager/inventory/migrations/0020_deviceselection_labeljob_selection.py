@@ -0,0 +1,74 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:26
+
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def wrap_device_ids(apps, schema_editor):
+    LabelJob = apps.get_model("inventory", "LabelJob")
+    for job in LabelJob.objects.all():
+        job.selection = {"ids": job.selection}
+        job.save(update_fields=["selection"])
+
+
+def unwrap_device_ids(apps, schema_editor):
+    LabelJob = apps.get_model("inventory", "LabelJob")
+    for job in LabelJob.objects.all():
+        job.selection = job.selection.get("ids", [])
+        job.save(update_fields=["selection"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventory", "0019_labeljob"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name="labeljob",
+            old_name="device_ids",
+            new_name="selection",
+        ),
+        migrations.RunPython(wrap_device_ids, unwrap_device_ids),
+        migrations.AlterField(
+            model_name="labeljob",
+            name="selection",
+            field=models.JSONField(default=dict, verbose_name="Device selection"),
+        ),
+        migrations.CreateModel(
+            name="DeviceSelection",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Created At")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="Updated At")),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False, verbose_name="Token"
+                    ),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="device_selections",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Created by",
+                    ),
+                ),
+                (
+                    "devices",
+                    models.ManyToManyField(related_name="selections", to="inventory.device", verbose_name="Devices"),
+                ),
+            ],
+            options={
+                "verbose_name": "Device Selection",
+                "verbose_name_plural": "Device Selections",
+            },
+        ),
+    ]
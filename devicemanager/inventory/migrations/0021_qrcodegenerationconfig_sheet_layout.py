@@ -0,0 +1,73 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:29
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventory", "0020_deviceselection_labeljob_selection"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="qrcodegenerationconfig",
+            name="layout",
+            field=models.CharField(
+                choices=[("roll", "One label per page (label printer)"), ("sheet", "Grid of labels per sheet")],
+                default="roll",
+                max_length=16,
+                verbose_name="Layout",
+            ),
+        ),
+        migrations.AddField(
+            model_name="qrcodegenerationconfig",
+            name="sheet_columns",
+            field=models.PositiveIntegerField(
+                default=4,
+                validators=[django.core.validators.MinValueValidator(1)],
+                verbose_name="Label columns per sheet",
+            ),
+        ),
+        migrations.AddField(
+            model_name="qrcodegenerationconfig",
+            name="sheet_gutter_x_mm",
+            field=models.PositiveIntegerField(default=0, verbose_name="Gap between label columns in mm"),
+        ),
+        migrations.AddField(
+            model_name="qrcodegenerationconfig",
+            name="sheet_gutter_y_mm",
+            field=models.PositiveIntegerField(default=0, verbose_name="Gap between label rows in mm"),
+        ),
+        migrations.AddField(
+            model_name="qrcodegenerationconfig",
+            name="sheet_height_mm",
+            field=models.PositiveIntegerField(
+                default=297, validators=[django.core.validators.MinValueValidator(1)], verbose_name="Sheet Height in mm"
+            ),
+        ),
+        migrations.AddField(
+            model_name="qrcodegenerationconfig",
+            name="sheet_margin_left_mm",
+            field=models.PositiveIntegerField(default=5, verbose_name="Sheet Left Margin in mm"),
+        ),
+        migrations.AddField(
+            model_name="qrcodegenerationconfig",
+            name="sheet_margin_top_mm",
+            field=models.PositiveIntegerField(default=13, verbose_name="Sheet Top Margin in mm"),
+        ),
+        migrations.AddField(
+            model_name="qrcodegenerationconfig",
+            name="sheet_rows",
+            field=models.PositiveIntegerField(
+                default=9, validators=[django.core.validators.MinValueValidator(1)], verbose_name="Label rows per sheet"
+            ),
+        ),
+        migrations.AddField(
+            model_name="qrcodegenerationconfig",
+            name="sheet_width_mm",
+            field=models.PositiveIntegerField(
+                default=210, validators=[django.core.validators.MinValueValidator(1)], verbose_name="Sheet Width in mm"
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventory", "0021_qrcodegenerationconfig_sheet_layout"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="qrcodegenerationconfig",
+            name="payload_format",
+            field=models.CharField(
+                choices=[
+                    ("json", "JSON with device details"),
+                    ("compact", "Compact device code (resolved through the API)"),
+                ],
+                default="json",
+                max_length=16,
+                verbose_name="QR Code Payload",
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventory", "0022_qrcodegenerationconfig_payload_format"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="building",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="Updated At"),
+        ),
+        migrations.AddField(
+            model_name="device",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="Updated At"),
+        ),
+        migrations.AddField(
+            model_name="devicemodel",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="Updated At"),
+        ),
+        migrations.AddField(
+            model_name="manufacturer",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="Updated At"),
+        ),
+        migrations.AddField(
+            model_name="room",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="Updated At"),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.14 on 2026-10-18 20:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventory", "0023_label_change_markers"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="device",
+            index=models.Index(fields=["updated_at"], name="device_updated_at_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="devicerental",
+            index=models.Index(fields=["device", "return_date"], name="rental_device_open_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="devicerental",
+            index=models.Index(fields=["borrower", "rental_date"], name="rental_borrower_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="devicerental",
+            index=models.Index(fields=["rental_date"], name="rental_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="devicerental",
+            index=models.Index(fields=["return_date"], name="rental_return_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="room",
+            index=models.Index(fields=["building", "room_number"], name="room_building_number_idx"),
+        ),
+    ]
@@ -0,0 +1,147 @@
+# Generated by Django 5.0.14 on 2026-10-18 20:42
+
+import re
+import unicodedata
+from itertools import batched
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# a copy of the search document code as of this migration, later changes are applied by rebuild_device_search
+DOCUMENT_FIELDS = {
+    "id": 1,
+    "serial_number": 4,
+    "inventory_number": 4,
+    "device_model__name": 3,
+    "device_model__manufacturer__name": 2,
+    "device_model__device_type__name": 2,
+    "device_model__device_type__short_name": 2,
+    "room__room_number": 2,
+    "room__building__name": 2,
+    "owner__username": 1,
+    "owner__first_name": 1,
+    "owner__last_name": 1,
+}
+DOCUMENT_BATCH_SIZE = 500
+PREFIX_LENGTH = 16
+SEPARATORS = re.compile(r"[\W_]+")
+
+
+def tokenize(value):
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    tokens = []
+    for word in "".join(char for char in decomposed if not unicodedata.combining(char)).split():
+        parts = [part for part in SEPARATORS.split(word) if part]
+        if parts:
+            tokens.append("".join(parts))
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+def get_document_tokens(values):
+    tokens = {}
+    for value, weight in zip(values, DOCUMENT_FIELDS.values()):
+        for token in tokenize(str(value)) if value is not None else ():
+            tokens[token] = max(weight, tokens.get(token, 0))
+    return tokens
+
+
+def get_prefix_weights(tokens):
+    prefixes = {}
+    for token, weight in tokens.items():
+        for length in range(1, min(len(token), PREFIX_LENGTH) + 1):
+            prefix = token[:length]
+            prefixes[prefix] = max(weight * 2 if length == len(token) else weight, prefixes.get(prefix, 0))
+    return prefixes
+
+
+def create_documents(apps, schema_editor):
+    using = schema_editor.connection.alias
+    Device = apps.get_model("inventory", "Device")
+    DeviceSearchDocument = apps.get_model("inventory", "DeviceSearchDocument")
+    DeviceSearchToken = apps.get_model("inventory", "DeviceSearchToken")
+    rows = Device.objects.using(using).order_by().values_list("pk", *DOCUMENT_FIELDS)
+    for batch in batched(rows.iterator(chunk_size=DOCUMENT_BATCH_SIZE), DOCUMENT_BATCH_SIZE):
+        documents = {pk: get_document_tokens(values) for pk, *values in batch}
+        DeviceSearchDocument.objects.using(using).bulk_create(
+            DeviceSearchDocument(
+                device_id=pk,
+                text=" ".join(token for token, weight in tokens.items() for _ in range(weight)),
+            )
+            for pk, tokens in documents.items()
+        )
+        # MariaDB searches the FULLTEXT index of the text instead of prefixes
+        if schema_editor.connection.vendor != "mysql":
+            DeviceSearchToken.objects.using(using).bulk_create(
+                DeviceSearchToken(document_id=pk, prefix=prefix, weight=weight)
+                for pk, tokens in documents.items()
+                for prefix, weight in get_prefix_weights(tokens).items()
+            )
+
+
+def create_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "mysql":
+        schema_editor.execute("CREATE FULLTEXT INDEX device_search_text_idx ON inventory_devicesearchdocument (text)")
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "mysql":
+        schema_editor.execute("DROP INDEX device_search_text_idx ON inventory_devicesearchdocument")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventory", "0024_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeviceSearchDocument",
+            fields=[
+                (
+                    "device",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search_document",
+                        serialize=False,
+                        to="inventory.device",
+                        verbose_name="Device",
+                    ),
+                ),
+                ("text", models.TextField(verbose_name="Search Text")),
+            ],
+            options={
+                "verbose_name": "Device Search Document",
+                "verbose_name_plural": "Device Search Documents",
+            },
+        ),
+        migrations.CreateModel(
+            name="DeviceSearchToken",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("prefix", models.CharField(max_length=16, verbose_name="Prefix")),
+                ("weight", models.PositiveSmallIntegerField(verbose_name="Weight")),
+                (
+                    "document",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tokens",
+                        to="inventory.devicesearchdocument",
+                        verbose_name="Document",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Device Search Token",
+                "verbose_name_plural": "Device Search Tokens",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="devicesearchtoken",
+            constraint=models.UniqueConstraint(fields=("prefix", "document"), name="search_token_prefix_uniq"),
+        ),
+        migrations.RunPython(create_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
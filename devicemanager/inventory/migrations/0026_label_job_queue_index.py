@@ -0,0 +1,22 @@
+# Generated by Django 5.0.14 on 2026-10-18 20:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventory", "0025_device_search"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="labeljob",
+            name="label_job_queue_idx",
+        ),
+        migrations.AddIndex(
+            model_name="labeljob",
+            index=models.Index(fields=["status", "created_at"], name="label_job_queue_idx"),
+        ),
+    ]
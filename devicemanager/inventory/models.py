@@ -1,12 +1,17 @@
+import copy
+import uuid
 from datetime import datetime
 
 from colorfield.fields import ColorField
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Index
 from django.db.models.functions import Lower
 from django.utils.translation import gettext_lazy as _
 from django_lifecycle import (
+    AFTER_DELETE,
+    AFTER_SAVE,
     BEFORE_CREATE,
     BEFORE_SAVE,
     BEFORE_UPDATE,
@@ -16,6 +21,7 @@ from django_lifecycle import (
 from django_lifecycle.conditions import WhenFieldValueChangesTo, WhenFieldValueIs
 
 from devicemanager.users.models import User
+from devicemanager.utils.cache import SharedVersionedValue
 from devicemanager.utils.models import TimeTrackable
 
 
@@ -37,6 +43,7 @@ class Building(models.Model):
     id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=60, verbose_name=_("Building Name"))
     faculty = models.ForeignKey(Faculty, on_delete=models.CASCADE, related_name="buildings")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated At"))
 
     class Meta:
         verbose_name = _("Building")
@@ -58,11 +65,16 @@ class Room(models.Model):
     )
     description = models.TextField(blank=True)
     occupants = models.ManyToManyField(User, related_name="rooms", blank=True, verbose_name=_("Occupants"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated At"))
 
     class Meta:
         verbose_name = _("Room")
         verbose_name_plural = _("Rooms")
-        indexes = [Index(Lower("room_number"), name="room_number_lower_idx")]
+        indexes = [
+            Index(Lower("room_number"), name="room_number_lower_idx"),
+            # rooms of a building, ordered by number
+            Index(fields=["building", "room_number"], name="room_building_number_idx"),
+        ]
 
     def __str__(self):
         return f"{self.building.name} - {self.room_number}"
@@ -72,6 +84,7 @@ class Manufacturer(models.Model):
     id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=256, unique=True, verbose_name=_("Manufacturer Name"))
     description = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated At"))
 
     class Meta:
         verbose_name = _("Manufacturer")
@@ -112,6 +125,7 @@ class DeviceModel(models.Model):
     )
     name = models.CharField(max_length=256, verbose_name=_("Model Name"))
     description = models.TextField(blank=True, verbose_name=_("Device Description"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated At"))
 
     class Meta:
         verbose_name = _("Device Model")
@@ -160,10 +174,13 @@ class Device(models.Model):
         null=True,
         blank=True,
     )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated At"))
 
     class Meta:
         verbose_name = _("Device")
         verbose_name_plural = _("Devices")
+        # devices changed since a client last synchronized
+        indexes = [Index(fields=["updated_at"], name="device_updated_at_idx")]
 
     def __str__(self):
         return f"{self.device_model} {self.inventory_number or ''}"
@@ -181,6 +198,67 @@ class Device(models.Model):
         return list(choice[0] for choice in Device.LABELS_CHOICES)
 
 
+class DeviceSearchDocument(models.Model):
+    """
+    Normalised tokens of a device, its model, location and owner, kept up to date by ``inventory.search``.
+
+    On MariaDB ``text`` has a FULLTEXT index, other databases search the prefixes of the tokens in ``DeviceSearchToken``.
+    """
+
+    device = models.OneToOneField(
+        Device,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="search_document",
+        verbose_name=_("Device"),
+    )
+    text = models.TextField(verbose_name=_("Search Text"))
+
+    class Meta:
+        verbose_name = _("Device Search Document")
+        verbose_name_plural = _("Device Search Documents")
+
+    def __str__(self):
+        return self.text
+
+
+class DeviceSearchToken(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    document = models.ForeignKey(
+        DeviceSearchDocument,
+        on_delete=models.CASCADE,
+        related_name="tokens",
+        verbose_name=_("Document"),
+    )
+    prefix = models.CharField(max_length=16, verbose_name=_("Prefix"))
+    weight = models.PositiveSmallIntegerField(verbose_name=_("Weight"))
+
+    class Meta:
+        verbose_name = _("Device Search Token")
+        verbose_name_plural = _("Device Search Tokens")
+        constraints = [
+            models.UniqueConstraint(fields=["prefix", "document"], name="search_token_prefix_uniq"),
+        ]
+
+    def __str__(self):
+        return self.prefix
+
+
+class QRCodeRenderer(models.TextChoices):
+    RASTER = "raster", _("Raster (PNG image)")
+    VECTOR = "vector", _("Vector (drawn on the PDF canvas)")
+
+
+class QRPayloadFormat(models.TextChoices):
+    JSON = "json", _("JSON with device details")
+    COMPACT = "compact", _("Compact device code (resolved through the API)")
+
+
+class LabelLayout(models.TextChoices):
+    ROLL = "roll", _("One label per page (label printer)")
+    SHEET = "sheet", _("Grid of labels per sheet")
+
+
 class QRCodeGenerationConfig(LifecycleModel):
     id = models.AutoField(primary_key=True, verbose_name=_("QR Code Generation Config ID"))
     label_width_mm = models.PositiveIntegerField(
@@ -218,7 +296,49 @@ class QRCodeGenerationConfig(LifecycleModel):
     font_size_large = models.PositiveIntegerField(verbose_name=_("Large Font Size [pt]"), default=28)
     fill_color = ColorField(default="#000000", verbose_name=_("Fill Color"))
     background_color = ColorField(default="#FFFFFF", verbose_name=_("Background Color"))
+    qr_renderer = models.CharField(
+        max_length=16,
+        choices=QRCodeRenderer.choices,
+        default=QRCodeRenderer.RASTER,
+        verbose_name=_("QR Code Renderer"),
+    )
+    payload_format = models.CharField(
+        max_length=16,
+        choices=QRPayloadFormat.choices,
+        default=QRPayloadFormat.JSON,
+        verbose_name=_("QR Code Payload"),
+    )
     active = models.BooleanField(verbose_name=_("Configuration in use"), default=False)
+    layout = models.CharField(
+        max_length=16,
+        choices=LabelLayout.choices,
+        default=LabelLayout.ROLL,
+        verbose_name=_("Layout"),
+    )
+    sheet_width_mm = models.PositiveIntegerField(
+        verbose_name=_("Sheet Width in mm"),
+        default=210,
+        validators=[MinValueValidator(1)],
+    )
+    sheet_height_mm = models.PositiveIntegerField(
+        verbose_name=_("Sheet Height in mm"),
+        default=297,
+        validators=[MinValueValidator(1)],
+    )
+    sheet_rows = models.PositiveIntegerField(
+        verbose_name=_("Label rows per sheet"),
+        default=9,
+        validators=[MinValueValidator(1)],
+    )
+    sheet_columns = models.PositiveIntegerField(
+        verbose_name=_("Label columns per sheet"),
+        default=4,
+        validators=[MinValueValidator(1)],
+    )
+    sheet_margin_top_mm = models.PositiveIntegerField(verbose_name=_("Sheet Top Margin in mm"), default=13)
+    sheet_margin_left_mm = models.PositiveIntegerField(verbose_name=_("Sheet Left Margin in mm"), default=5)
+    sheet_gutter_x_mm = models.PositiveIntegerField(verbose_name=_("Gap between label columns in mm"), default=0)
+    sheet_gutter_y_mm = models.PositiveIntegerField(verbose_name=_("Gap between label rows in mm"), default=0)
     inv_prefix = models.CharField(
         max_length=15,
         default="inv:",
@@ -234,6 +354,21 @@ class QRCodeGenerationConfig(LifecycleModel):
         blank=True,
     )
 
+    # fields checked by clean()
+    SHEET_LAYOUT_FIELDS = (
+        "layout",
+        "label_width_mm",
+        "label_height_mm",
+        "sheet_width_mm",
+        "sheet_height_mm",
+        "sheet_rows",
+        "sheet_columns",
+        "sheet_margin_top_mm",
+        "sheet_margin_left_mm",
+        "sheet_gutter_x_mm",
+        "sheet_gutter_y_mm",
+    )
+
     class Meta:
         verbose_name = _("QR Code Generation Config")
         verbose_name_plural = _("QR Code Generation Configs")
@@ -256,14 +391,64 @@ class QRCodeGenerationConfig(LifecycleModel):
         elif self.active:
             QRCodeGenerationConfig.objects.filter(active=True).update(active=False)
 
+    @hook(AFTER_SAVE)
+    @hook(AFTER_DELETE)
+    def _invalidate_cached_active_configuration(self):
+        # a worker reading the new stamp before commit would cache the old row under it
+        transaction.on_commit(active_configuration.invalidate)
+
+    def clean(self):
+        super().clean()
+        if self.layout != LabelLayout.SHEET:
+            return
+        grid_width = (
+            self.sheet_margin_left_mm
+            + self.sheet_columns * self.label_width_mm
+            + (self.sheet_columns - 1) * self.sheet_gutter_x_mm
+        )
+        grid_height = (
+            self.sheet_margin_top_mm
+            + self.sheet_rows * self.label_height_mm
+            + (self.sheet_rows - 1) * self.sheet_gutter_y_mm
+        )
+        if grid_width > self.sheet_width_mm:
+            raise ValidationError({"sheet_columns": _("Label columns do not fit the sheet width.")})
+        if grid_height > self.sheet_height_mm:
+            raise ValidationError({"sheet_rows": _("Label rows do not fit the sheet height.")})
+
+    @property
+    def labels_per_page(self) -> int:
+        if self.layout == LabelLayout.SHEET:
+            return self.sheet_rows * self.sheet_columns
+        return 1
+
     @staticmethod
     def get_active_configuration():
         return QRCodeGenerationConfig.objects.get_or_create(active=True)[0]
 
+    @staticmethod
+    def get_cached_active_configuration() -> "QRCodeGenerationConfig":
+        """Return a copy of the active configuration cached in this process, safe to modify."""
+        return copy.copy(active_configuration.get())
+
+    def get_generation_settings(self) -> dict:
+        """Return values of all fields affecting generated labels."""
+        return {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.attname not in ("id", "active")
+        }
+
     def __str__(self):
         return f"QR Code Generation Config {self.id}"
 
 
+active_configuration = SharedVersionedValue(
+    "inventory:active-qr-code-generation-config",
+    QRCodeGenerationConfig.get_active_configuration,
+)
+
+
 class DeviceRental(TimeTrackable, LifecycleModel):
     id = models.AutoField(primary_key=True)
     device = models.ForeignKey(
@@ -284,6 +469,13 @@ class DeviceRental(TimeTrackable, LifecycleModel):
     class Meta:
         verbose_name = _("Device Rental")
         verbose_name_plural = _("Device Rentals")
+        indexes = [
+            # the open rental of a device, see _ensure_device_is_rented_once and the is_rented filters
+            Index(fields=["device", "return_date"], name="rental_device_open_idx"),
+            Index(fields=["borrower", "rental_date"], name="rental_borrower_date_idx"),
+            Index(fields=["rental_date"], name="rental_date_idx"),
+            Index(fields=["return_date"], name="rental_return_date_idx"),
+        ]
 
     @hook(BEFORE_SAVE, condition=WhenFieldValueIs("return_date", None))
     def _ensure_device_is_rented_once(self):
@@ -293,3 +485,65 @@ class DeviceRental(TimeTrackable, LifecycleModel):
 
     def __str__(self):
         return f"{self.device} - {self.borrower}"
+
+
+class LabelJob(TimeTrackable):
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        RUNNING = "running", _("Running")
+        DONE = "done", _("Done")
+        FAILED = "failed", _("Failed")
+
+    id = models.AutoField(primary_key=True, verbose_name=_("Label Job ID"))
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name=_("Status"),
+    )
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="label_jobs",
+        verbose_name=_("Requested by"),
+        null=True,
+        blank=True,
+    )
+    selection = models.JSONField(default=dict, verbose_name=_("Device selection"))
+    config = models.JSONField(default=dict, verbose_name=_("QR Code Generation Config"))
+    pages_rendered = models.PositiveIntegerField(default=0, verbose_name=_("Pages rendered"))
+    pages_total = models.PositiveIntegerField(default=0, verbose_name=_("Pages total"))
+    result = models.FileField(upload_to="label_jobs/", null=True, blank=True, verbose_name=_("Result"))
+    error = models.TextField(blank=True, verbose_name=_("Error"))
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Started At"))
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Finished At"))
+
+    class Meta:
+        verbose_name = _("Label Job")
+        verbose_name_plural = _("Label Jobs")
+        indexes = [Index(fields=["status", "created_at"], name="label_job_queue_idx")]
+
+    def __str__(self):
+        return f"Label Job {self.id} ({self.status})"
+
+
+class DeviceSelection(TimeTrackable):
+    """Set of devices stored server side, so it can be referenced by a short token in URLs."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, verbose_name=_("Token"))
+    devices = models.ManyToManyField(Device, related_name="selections", verbose_name=_("Devices"))
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="device_selections",
+        verbose_name=_("Created by"),
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = _("Device Selection")
+        verbose_name_plural = _("Device Selections")
+
+    def __str__(self):
+        return f"Device Selection {self.id}"
@@ -0,0 +1,112 @@
+from typing import IO
+
+from pypdf import PdfReader
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    NumberObject,
+    PdfObject,
+    StreamObject,
+)
+
+
+class PdfConcatenator:
+    """
+    Concatenate PDF documents into one output file while they are produced.
+
+    Objects of each appended document are renumbered and written out immediately, so only the offsets
+    of written objects and the ids of pages are kept in memory, whatever the size of the output.
+    Documents are expected to be flat, like the ones produced by reportlab: only their pages and
+    the resources those pages use are copied, outlines and forms are dropped.
+    """
+
+    def __init__(self, output: IO[bytes]) -> None:
+        self.output = output
+        self._offsets: list[int] = []
+        self._page_ids: list[int] = []
+        self._pages_id = self._reserve_id()
+        self.output.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_ids)
+
+    def _reserve_id(self) -> int:
+        self._offsets.append(0)
+        return len(self._offsets)
+
+    def _write_object(self, object_id: int, obj: PdfObject) -> None:
+        self._offsets[object_id - 1] = self.output.tell()
+        self.output.write(f"{object_id} 0 obj\n".encode())
+        obj.write_to_stream(self.output)
+        self.output.write(b"\nendobj\n")
+
+    def append(self, document: IO[bytes]) -> None:
+        reader = PdfReader(document)
+        new_ids: dict[int, int] = {}
+        pending: list[tuple[int, IndirectObject]] = []
+
+        def reference(indirect: IndirectObject) -> IndirectObject:
+            if indirect.idnum not in new_ids:
+                new_ids[indirect.idnum] = self._reserve_id()
+                pending.append((new_ids[indirect.idnum], indirect))
+            return IndirectObject(new_ids[indirect.idnum], 0, None)
+
+        page_ids = set()
+        for page in reader.pages:
+            page_ids.add(page.indirect_reference.idnum)
+            self._page_ids.append(reference(page.indirect_reference).idnum)
+
+        while pending:
+            object_id, indirect = pending.pop()
+            obj = indirect.get_object()
+            if indirect.idnum in page_ids:
+                # the page tree of the source document is replaced by the one written in finish()
+                obj = DictionaryObject({key: value for key, value in obj.items() if key != "/Parent"})
+                obj[NameObject("/Parent")] = IndirectObject(self._pages_id, 0, None)
+            self._write_object(object_id, self._copy(obj, reference))
+
+    def _copy(self, obj: PdfObject, reference) -> PdfObject:
+        if isinstance(obj, IndirectObject):
+            return reference(obj)
+        if isinstance(obj, StreamObject):
+            copied = type(obj)()
+            # the stream data is written as it was read, without decoding and encoding it again
+            copied._data = obj._data
+            copied.update({key: self._copy(value, reference) for key, value in obj.items()})
+            return copied
+        if isinstance(obj, DictionaryObject):
+            return DictionaryObject({key: self._copy(value, reference) for key, value in obj.items()})
+        if isinstance(obj, ArrayObject):
+            return ArrayObject(self._copy(value, reference) for value in obj)
+        return obj
+
+    def finish(self) -> None:
+        """Write the page tree, cross-reference table and trailer."""
+        pages = DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Pages"),
+                NameObject("/Kids"): ArrayObject(IndirectObject(page_id, 0, None) for page_id in self._page_ids),
+                NameObject("/Count"): NumberObject(len(self._page_ids)),
+            }
+        )
+        self._write_object(self._pages_id, pages)
+        catalog_id = self._reserve_id()
+        catalog = DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Catalog"),
+                NameObject("/Pages"): IndirectObject(self._pages_id, 0, None),
+            }
+        )
+        self._write_object(catalog_id, catalog)
+
+        xref_offset = self.output.tell()
+        self.output.write(f"xref\n0 {len(self._offsets) + 1}\n0000000000 65535 f \n".encode())
+        for offset in self._offsets:
+            self.output.write(f"{offset:010} 00000 n \n".encode())
+        self.output.write(
+            f"trailer\n<< /Size {len(self._offsets) + 1} /Root {catalog_id} 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n".encode()
+        )
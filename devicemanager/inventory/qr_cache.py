@@ -0,0 +1,116 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+
+
+@dataclass
+class QRCodeCacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class QRCodeImageCache:
+    """
+    Two tier cache of rendered QR code images.
+
+    The first tier is an in-process LRU holding at most ``max_entries`` images,
+    the second one is a Django cache (file based by default, see ``CACHES["qr_codes"]``)
+    shared by all workers. Entries are content addressed, so they never have to be invalidated.
+    """
+
+    # bumped when the rendering of images changes, v2 scales modules by whole pixels and centres the code
+    key_prefix = "qr:v2:"
+
+    def __init__(self, max_entries: int = 1024, disk_cache_alias: str | None = "qr_codes") -> None:
+        self.max_entries = max_entries
+        self.disk_cache_alias = disk_cache_alias
+        self.stats = QRCodeCacheStats()
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def make_key(
+        cls,
+        data: bytes,
+        size: int,
+        fill_color: str,
+        background_color: str,
+        error_correction: int,
+    ) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{size}|{fill_color.lower()}|{background_color.lower()}|{error_correction}|".encode())
+        digest.update(data)
+        return cls.key_prefix + digest.hexdigest()
+
+    @property
+    def disk_cache(self):
+        if self.disk_cache_alias is None:
+            return None
+        try:
+            return caches[self.disk_cache_alias]
+        except InvalidCacheBackendError:
+            return None
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                return value
+
+        disk_cache = self.disk_cache
+        value = disk_cache.get(key) if disk_cache is not None else None
+        with self._lock:
+            if value is None:
+                self.stats.misses += 1
+                return None
+            self.stats.disk_hits += 1
+            self._remember(key, value)
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._remember(key, value)
+        disk_cache = self.disk_cache
+        if disk_cache is not None:
+            disk_cache.set(key, value, timeout=None)
+
+    def get_or_render(self, key: str, render: Callable[[], bytes]) -> bytes:
+        value = self.get(key)
+        if value is None:
+            value = render()
+            self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self.stats = QRCodeCacheStats()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def _remember(self, key: str, value: bytes) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+qr_code_image_cache = QRCodeImageCache(max_entries=getattr(settings, "QR_CODE_MEMORY_CACHE_SIZE", 1024))
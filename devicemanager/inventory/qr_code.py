@@ -1,26 +1,220 @@
+import abc
 import io
 import json
-from functools import cache
+import tempfile
+from collections.abc import Mapping
+from dataclasses import dataclass
+from functools import cache, lru_cache
+from types import MappingProxyType
+from typing import IO, Self
 
-import PIL
 import qrcode
 from django.conf import settings
-from PIL.Image import Image
+from PIL import Image, ImageColor
 from reportlab.lib.utils import ImageReader
-from reportlab.pdfbase.pdfmetrics import (
-    getFont,
-    getRegisteredFontNames,
-    registerFont,
-    stringWidth,
-)
+from reportlab.pdfbase.pdfmetrics import getFont, getRegisteredFontNames, registerFont
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfgen import canvas
 
-from devicemanager.inventory.models import Device
+from devicemanager.inventory.label_records import LabelRecord
+from devicemanager.inventory.models import (
+    LabelLayout,
+    QRCodeGenerationConfig,
+    QRCodeRenderer,
+    QRPayloadFormat,
+)
+from devicemanager.inventory.pdf_stream import PdfConcatenator
+from devicemanager.inventory.qr_cache import QRCodeImageCache, qr_code_image_cache
+from devicemanager.inventory.qr_payload import encode_compact_payload
 from devicemanager.utils.units import UnitConverter
 
+STANDARD_FONT = "Roboto"
+BOLD_FONT = "Roboto-Bold"
+FONT_FILES = {
+    STANDARD_FONT: "devicemanager/fonts/Roboto.ttf",
+    BOLD_FONT: "devicemanager/fonts/Roboto-Bold.ttf",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class FontMetrics:
+    """Read-only glyph metrics of a font, in thousandths of the font size like reportlab's."""
+
+    ascent: float
+    descent: float
+    default_width: float
+    widths: Mapping[int, float]
+
+    @classmethod
+    def from_font(cls, font_name: str) -> Self:
+        face = getFont(font_name).face
+        return cls(
+            ascent=face.ascent,
+            descent=face.descent,
+            default_width=face.defaultWidth,
+            widths=MappingProxyType(dict(face.charWidths)),
+        )
+
+    def string_width(self, text: str, font_size: float) -> float:
+        """Return the same width as reportlab's ``stringWidth`` without looking the font up by name."""
+        widths, default_width = self.widths, self.default_width
+        return sum(widths.get(ord(char), default_width) for char in text) * 0.001 * font_size
+
+    def line_height(self, font_size: int) -> int:
+        return int((self.ascent - self.descent) / 1000 * font_size * 0.9)
+
+
+@cache
+def load_fonts() -> Mapping[str, FontMetrics]:
+    """
+    Register the label fonts with reportlab and return their metrics by font name.
+
+    Called from ``InventoryConfig.ready()``, so the fonts are parsed at startup rather than in
+    the first label request. With gunicorn ``--preload`` that happens once in the master process
+    and the forked workers share the loaded fonts and metric tables.
+    """
+    registered = getRegisteredFontNames()
+    for font_name, path in FONT_FILES.items():
+        if font_name not in registered:
+            registerFont(TTFont(font_name, settings.BASE_DIR / path))
+    return MappingProxyType({font_name: FontMetrics.from_font(font_name) for font_name in FONT_FILES})
+
+
+def get_font_metrics(font_name: str) -> FontMetrics:
+    return load_fonts()[font_name]
+
+
+def get_font_line_height(font_name: str, font_size: int) -> int:
+    return get_font_metrics(font_name).line_height(font_size)
+
+
+def render_qr_code_png(matrix: list[list[bool]], size: int, fill_color: str, background_color: str) -> bytes:
+    """
+    Render a QR code module matrix as a two colour PNG of ``size`` by ``size`` pixels.
+
+    Every module is scaled by the same whole number of pixels and the code is centred on the
+    background, so no module is a pixel wider than the others. Only an image with one pixel per
+    module and the final image are allocated, and the PNG is stored with a 1-bit palette.
+    """
+    modules = len(matrix)
+    module_size = max(size // modules, 1)
+    scaled_size = modules * module_size
+    offset = (size - scaled_size) // 2
+
+    code = Image.frombytes("P", (modules, modules), bytes(is_dark for row in matrix for is_dark in row))
+    image = Image.new("P", (size, size), 0)
+    image.putpalette([*ImageColor.getrgb(background_color), *ImageColor.getrgb(fill_color)])
+    image.paste(code.resize((scaled_size, scaled_size), Image.Resampling.NEAREST), (offset, offset))
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@dataclass(frozen=True, slots=True)
+class LabelTemplate:
+    """Positions of label elements relative to the bottom left corner of a label."""
+
+    qr_x: int
+    qr_y: int
+    text_x: int
+    title_y: int
+    owner_y: int
+    inventory_y: int
+    model_y: int
+    serial_y: int
+    inventory_x: float
+    serial_x: float
+
+
+@dataclass(frozen=True, slots=True)
+class LabelGeometry:
+    """Label dimensions converted to pixels at the configured DPI, together with the label template."""
+
+    pdf_width: int
+    pdf_height: int
+    pdf_padding: int
+    gap_x: int
+    gap_y: int
+    title_gap: int
+    qr_size: int
+    template: LabelTemplate
+
+
+@lru_cache(maxsize=32)
+def get_label_geometry(
+    dpi: int,
+    pdf_width_mm: int,
+    pdf_height_mm: int,
+    pdf_padding_mm: int,
+    gap_x_mm: int,
+    gap_y_mm: int,
+    title_gap_mm: int,
+    font_size: int,
+    font_size_large: int,
+    font_size_small: int,
+    inv_prefix: str,
+    sn_prefix: str,
+) -> LabelGeometry:
+    """
+    Compute the label geometry for a set of label settings.
+
+    Results are cached, so generators of the same configuration version share one geometry
+    and the font metrics are only looked up when the configuration changes.
+    """
+    standard_font = get_font_metrics(STANDARD_FONT)
+    unit_converter = UnitConverter(dpi)
+    pdf_width = unit_converter.mm_to_px(pdf_width_mm)
+    pdf_height = unit_converter.mm_to_px(pdf_height_mm)
+    pdf_padding = unit_converter.mm_to_px(pdf_padding_mm)
+    gap_x = unit_converter.mm_to_px(gap_x_mm)
+    gap_y = unit_converter.mm_to_px(gap_y_mm)
+    title_gap = unit_converter.mm_to_px(title_gap_mm)
+    qr_size = pdf_height - pdf_padding * 2
+
+    title_height = get_font_line_height(BOLD_FONT, font_size_large)
+    line_height = standard_font.line_height(font_size) + gap_y
+    text_x = pdf_padding + qr_size + gap_x
+    title_y = pdf_height - title_height - pdf_padding
+    owner_y = title_y - title_height - title_gap
+    inventory_y = owner_y - line_height
+    model_y = inventory_y - line_height
+    serial_y = model_y - line_height
+    template = LabelTemplate(
+        qr_x=pdf_padding,
+        qr_y=pdf_height - qr_size - pdf_padding,
+        text_x=text_x,
+        title_y=title_y,
+        owner_y=owner_y,
+        inventory_y=inventory_y,
+        model_y=model_y,
+        serial_y=serial_y,
+        inventory_x=text_x + standard_font.string_width(f"{inv_prefix} ", font_size_small),
+        serial_x=text_x + standard_font.string_width(f"{sn_prefix} ", font_size_small),
+    )
+    return LabelGeometry(
+        pdf_width=pdf_width,
+        pdf_height=pdf_height,
+        pdf_padding=pdf_padding,
+        gap_x=gap_x,
+        gap_y=gap_y,
+        title_gap=title_gap,
+        qr_size=qr_size,
+        template=template,
+    )
+
+
+class LabelGenerator(abc.ABC):
+    """
+    Lays out device labels from the label settings of a ``QRCodeGenerationConfig``.
+
+    Subclasses render the layout to a concrete output format.
+    """
+
+    error_correction = qrcode.constants.ERROR_CORRECT_L
+    standard_font = STANDARD_FONT
+    bold_font = BOLD_FONT
 
-class DeviceQRCodeGenerator:
     def __init__(
         self,
         pdf_width_mm: int,
@@ -37,9 +231,9 @@ class DeviceQRCodeGenerator:
         font_size_small: int = 10,
         fill_color: str = "#000000",
         background_color: str = "#FFFFFF",
+        payload_format: str = QRPayloadFormat.JSON,
     ) -> None:
-        self._buffer = io.BytesIO()
-
+        self.payload_format = payload_format
         self.unit_converter = UnitConverter(dpi)
         self.dpi = dpi
         self.font_size = font_size
@@ -50,136 +244,344 @@ class DeviceQRCodeGenerator:
         self.inv_prefix = inv_prefix
         self.sn_prefix = sn_prefix
 
-        self.pdf_width = self.unit_converter.mm_to_px(pdf_width_mm)
-        self.pdf_height = self.unit_converter.mm_to_px(pdf_height_mm)
-        self.pdf_padding = self.unit_converter.mm_to_px(pdf_padding_mm)
-        self.gap_x = self.unit_converter.mm_to_px(gap_x_mm)
-        self.gap_y = self.unit_converter.mm_to_px(gap_y_mm)
-        self.title_gap = self.unit_converter.mm_to_px(title_gap_mm)
+        geometry = get_label_geometry(
+            dpi=dpi,
+            pdf_width_mm=pdf_width_mm,
+            pdf_height_mm=pdf_height_mm,
+            pdf_padding_mm=pdf_padding_mm,
+            gap_x_mm=gap_x_mm,
+            gap_y_mm=gap_y_mm,
+            title_gap_mm=title_gap_mm,
+            font_size=font_size,
+            font_size_large=font_size_large,
+            font_size_small=font_size_small,
+            inv_prefix=inv_prefix,
+            sn_prefix=sn_prefix,
+        )
+        self.pdf_width = geometry.pdf_width
+        self.pdf_height = geometry.pdf_height
+        self.pdf_padding = geometry.pdf_padding
+        self.gap_x = geometry.gap_x
+        self.gap_y = geometry.gap_y
+        self.title_gap = geometry.title_gap
+        self.qr_size = geometry.qr_size
+        self.template = geometry.template
 
-        self._canvas = canvas.Canvas(self._buffer, pagesize=(self.pdf_width, self.pdf_height))
-        self._canvas.setFillColor(self.fill_color)
-        self._canvas.setStrokeColor(self.fill_color)
+    @classmethod
+    def get_config_kwargs(cls, config: QRCodeGenerationConfig) -> dict:
+        return {
+            "pdf_width_mm": config.label_width_mm,
+            "pdf_height_mm": config.label_height_mm,
+            "pdf_padding_mm": config.label_padding_mm,
+            "gap_x_mm": config.label_horizontal_spacing_mm,
+            "gap_y_mm": config.label_vertical_spacing_mm,
+            "title_gap_mm": config.label_title_gap_mm,
+            "dpi": config.dpi,
+            "inv_prefix": config.inv_prefix,
+            "sn_prefix": config.sn_prefix,
+            "font_size_small": config.font_size_small,
+            "font_size": config.font_size,
+            "font_size_large": config.font_size_large,
+            "fill_color": config.fill_color,
+            "background_color": config.background_color,
+            "payload_format": config.payload_format,
+        }
 
-        self.standard_font = "Roboto"
-        if "Roboto" not in getRegisteredFontNames():
-            registerFont(TTFont("Roboto", settings.BASE_DIR / "devicemanager/fonts/Roboto.ttf"))
-
-        self.bold_font = "Roboto-Bold"
-        if "Roboto-Bold" not in getRegisteredFontNames():
-            registerFont(
-                TTFont(
-                    "Roboto-Bold",
-                    settings.BASE_DIR / "devicemanager/fonts/Roboto-Bold.ttf",
-                )
-            )
+    @classmethod
+    def from_config(cls, config: QRCodeGenerationConfig, **kwargs) -> Self:
+        return cls(**cls.get_config_kwargs(config) | kwargs)
 
-    def _generate_qr_code(self, data: bytes) -> tuple[io.BytesIO, tuple[int, int]]:
-        qr_size = self.pdf_height - self.pdf_padding * 2
+    def get_line_height(self, font_size: int | None = None, font_name=None) -> int:
+        return get_font_line_height(font_name or self.standard_font, font_size or self.font_size)
+
+    def get_qr_code_data(self, record: LabelRecord) -> bytes:
+        if self.payload_format == QRPayloadFormat.COMPACT:
+            return encode_compact_payload(record.id).encode("ascii")
+        return json.dumps(
+            {
+                "id": f"{record.id:04}",
+                "room": f"{record.building}-{record.room_number}",
+                "own": record.owner_name,
+                "inv": record.inventory_number,
+                "s/n": record.serial_number,
+            }
+        ).encode("utf-8")
+
+    def _make_qr_code(self, data: bytes) -> qrcode.QRCode:
         qr = qrcode.QRCode(
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=qr_size,
+            error_correction=self.error_correction,
+            box_size=self.qr_size,
             border=0,
         )
         qr.add_data(data)
         qr.make(fit=True)
+        return qr
 
-        img: Image = qr.make_image(fill_color=self.fill_color, back_color=self.background_color)
-        img = img.resize((qr_size, qr_size), PIL.Image.Resampling.NEAREST)
+    @abc.abstractmethod
+    def add_device(self, record: LabelRecord) -> None: ...
 
-        buffer = io.BytesIO()
-        img.save(buffer, format="PNG")
-        buffer.seek(0)
-        return buffer, img.size
+    @abc.abstractmethod
+    def build(self) -> IO[bytes]:
+        """Finish the output and return it as a file positioned at its start."""
 
-    def _draw_text_line(self, text: str, x: int, y: int, font_size: int | None = None, font_name=None) -> None:
-        font_name = font_name or self.standard_font
-        font_size = font_size or self.font_size
 
-        self._canvas.saveState()
+class DeviceQRCodeGenerator(LabelGenerator):
+    template_form_name = "label"
 
-        self._canvas.setFont(font_name, font_size)
-        width = stringWidth(text, fontName=font_name, fontSize=font_size)
-        self._canvas.drawString(x, y, text)
+    def __init__(
+        self,
+        qr_renderer: str = QRCodeRenderer.RASTER,
+        layout: str = LabelLayout.ROLL,
+        sheet_width_mm: int = 210,
+        sheet_height_mm: int = 297,
+        sheet_rows: int = 1,
+        sheet_columns: int = 1,
+        sheet_margin_top_mm: int = 0,
+        sheet_margin_left_mm: int = 0,
+        sheet_gutter_x_mm: int = 0,
+        sheet_gutter_y_mm: int = 0,
+        qr_code_cache: QRCodeImageCache = qr_code_image_cache,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.qr_renderer = qr_renderer
+        self.qr_code_cache = qr_code_cache
 
-        self._canvas.restoreState()
-        return width
+        if layout == LabelLayout.SHEET:
+            page_size = (
+                self.unit_converter.mm_to_px(sheet_width_mm),
+                self.unit_converter.mm_to_px(sheet_height_mm),
+            )
+            self.cell_origins = self._get_cell_origins(
+                page_height=page_size[1],
+                rows=sheet_rows,
+                columns=sheet_columns,
+                margin_top=self.unit_converter.mm_to_px(sheet_margin_top_mm),
+                margin_left=self.unit_converter.mm_to_px(sheet_margin_left_mm),
+                gutter_x=self.unit_converter.mm_to_px(sheet_gutter_x_mm),
+                gutter_y=self.unit_converter.mm_to_px(sheet_gutter_y_mm),
+            )
+        else:
+            page_size = (self.pdf_width, self.pdf_height)
+            self.cell_origins = [(0, 0)]
+        self._next_cell = 0
 
-    @cache
-    def get_line_height(self, font_size: int | None = None, font_name=None) -> int:
-        font_size = font_size or self.font_size
-        font_name = font_name or self.standard_font
-        face = getFont(font_name).face
-        string_height = (face.ascent - face.descent) / 1000 * font_size * 0.9
-        return int(string_height)
+        self.page_size = page_size
+        self._first_batch: IO[bytes] | None = None
+        self._concatenator: PdfConcatenator | None = None
+        self._start_batch()
 
-    def add_device(
+    @classmethod
+    def get_config_kwargs(cls, config: QRCodeGenerationConfig) -> dict:
+        return super().get_config_kwargs(config) | {
+            "qr_renderer": config.qr_renderer,
+            "layout": config.layout,
+            "sheet_width_mm": config.sheet_width_mm,
+            "sheet_height_mm": config.sheet_height_mm,
+            "sheet_rows": config.sheet_rows,
+            "sheet_columns": config.sheet_columns,
+            "sheet_margin_top_mm": config.sheet_margin_top_mm,
+            "sheet_margin_left_mm": config.sheet_margin_left_mm,
+            "sheet_gutter_x_mm": config.sheet_gutter_x_mm,
+            "sheet_gutter_y_mm": config.sheet_gutter_y_mm,
+        }
+
+    def _get_cell_origins(
         self,
-        device: Device,
-    ) -> None:
-        device_id = device.id
-        building = device.room.building
-        room = device.room.room_number
-        owner = device.owner.get_full_name()
-        inventory_number = device.inventory_number
-        serial_number = device.serial_number
-        manufacturer = device.device_model.manufacturer
-        model = device.device_model.name
-
-        qrcode_data = json.dumps(
-            {
-                "id": f"{device_id:04}",
-                "room": f"{building}-{room}",
-                "own": owner,
-                "inv": inventory_number,
-                "s/n": serial_number,
-            }
-        ).encode("utf-8")
-        qr_img, (qr_img_width, qr_img_height) = self._generate_qr_code(qrcode_data)
+        page_height: int,
+        rows: int,
+        columns: int,
+        margin_top: int,
+        margin_left: int,
+        gutter_x: int,
+        gutter_y: int,
+    ) -> list[tuple[int, int]]:
+        """Return bottom left corners of label cells on a sheet, row by row starting from the top."""
+        return [
+            (
+                margin_left + column * (self.pdf_width + gutter_x),
+                page_height - margin_top - (row + 1) * self.pdf_height - row * gutter_y,
+            )
+            for row in range(rows)
+            for column in range(columns)
+        ]
+
+    @staticmethod
+    def _spooled_file() -> IO[bytes]:
+        return tempfile.SpooledTemporaryFile(max_size=settings.LABEL_PDF_SPOOL_MAX_SIZE)
+
+    def _start_batch(self) -> None:
+        self._batch_pages = 0
+        self._batch_buffer = self._spooled_file()
+        self._canvas = canvas.Canvas(self._batch_buffer, pagesize=self.page_size)
+        self._canvas.setFillColor(self.fill_color)
+        self._canvas.setStrokeColor(self.fill_color)
+        self._draw_template_form()
+
+    def _finish_batch(self) -> None:
+        """
+        Save the pages drawn on the current canvas and release them.
+
+        reportlab keeps every page of a canvas in memory until it is saved, so long documents are drawn
+        in batches of ``LABEL_PDF_BATCH_PAGES`` pages. The first batch is kept as it is, which avoids
+        any copying for short documents; once a second batch exists, batches are appended to the output
+        by a ``PdfConcatenator``.
+        """
+        self._canvas.save()
+        self._batch_buffer.seek(0)
+        if self._first_batch is None and self._concatenator is None:
+            self._first_batch = self._batch_buffer
+            return
+
+        if self._concatenator is None:
+            self._concatenator = PdfConcatenator(self._spooled_file())
+            with self._first_batch:
+                self._concatenator.append(self._first_batch)
+            self._first_batch = None
+        with self._batch_buffer:
+            self._concatenator.append(self._batch_buffer)
 
+    def _show_page(self) -> None:
+        self._canvas.showPage()
+        self._next_cell = 0
+        self._batch_pages += 1
+        if self._batch_pages == settings.LABEL_PDF_BATCH_PAGES:
+            self._finish_batch()
+            self._start_batch()
+
+    def _draw_template_form(self) -> None:
+        """
+        Draw the parts shared by all labels into a form XObject.
+
+        The form is stored once in the document and every label references it with ``doForm``,
+        so the prefixes are not repeated in each page stream.
+        """
+        self._canvas.beginForm(self.template_form_name, upperx=self.pdf_width, uppery=self.pdf_height)
+        text = self._canvas.beginText()
+        text.setFont(self.standard_font, self.font_size_small)
+        text.setTextOrigin(self.template.text_x, self.template.inventory_y)
+        text.textOut(f"{self.inv_prefix} ")
+        text.setTextOrigin(self.template.text_x, self.template.serial_y)
+        text.textOut(f"{self.sn_prefix} ")
+        self._canvas.drawText(text)
+        self._canvas.endForm()
+
+    def _generate_qr_code(self, data: bytes) -> tuple[io.BytesIO, tuple[int, int]]:
+        qr_size = self.qr_size
+        cache_key = self.qr_code_cache.make_key(
+            data,
+            size=qr_size,
+            fill_color=self.fill_color,
+            background_color=self.background_color,
+            error_correction=self.error_correction,
+        )
+        png = self.qr_code_cache.get_or_render(cache_key, lambda: self._render_qr_code_png(data, qr_size))
+        return io.BytesIO(png), (qr_size, qr_size)
+
+    def _render_qr_code_png(self, data: bytes, qr_size: int) -> bytes:
+        matrix = self._make_qr_code(data).get_matrix()
+        return render_qr_code_png(matrix, qr_size, self.fill_color, self.background_color)
+
+    def _draw_qr_code_image(self, data: bytes, x: int, y: int) -> None:
+        qr_img, (qr_img_width, qr_img_height) = self._generate_qr_code(data)
         self._canvas.drawImage(
             image=ImageReader(qr_img),
-            x=self.pdf_padding,
-            y=self.pdf_height - qr_img_height - self.pdf_padding,
+            x=x,
+            y=y,
             width=qr_img_width,
             height=qr_img_height,
         )
 
-        label_x = self.pdf_padding + qr_img_width + self.gap_x
-        label_y = (
-            self.pdf_height - self.get_line_height(self.font_size_large, font_name=self.bold_font) - self.pdf_padding
-        )
+    def _draw_qr_code_vector(self, data: bytes, x: int, y: int) -> None:
+        """
+        Draw the QR code modules directly on the canvas.
 
-        self._draw_text_line(
-            f"{building} - {room}",
-            label_x,
-            label_y,
-            font_size=self.font_size_large,
-            font_name=self.bold_font,
-        )
-        label_y -= self.get_line_height(self.font_size_large, font_name=self.bold_font) + self.title_gap
+        Dark modules in every row are merged into horizontal runs and emitted as rectangles
+        of a single path, so the result is resolution independent and needs no image XObject.
+        """
+        matrix = self._make_qr_code(data).get_matrix()
+        module_size = self.qr_size / len(matrix)
+        top = y + self.qr_size
 
-        self._draw_text_line(owner, label_x, label_y, self.font_size)
-        label_y -= self.get_line_height(self.font_size) + self.gap_y
+        self._canvas.saveState()
+        self._canvas.setFillColor(self.background_color)
+        self._canvas.rect(x, y, self.qr_size, self.qr_size, stroke=0, fill=1)
+        self._canvas.setFillColor(self.fill_color)
 
-        w = self._draw_text_line(f"{self.inv_prefix} ", label_x, label_y, font_size=self.font_size_small)
-        self._draw_text_line(f"{inventory_number}", label_x + w, label_y, self.font_size)
-        label_y -= self.get_line_height(self.font_size) + self.gap_y
+        path = self._canvas.beginPath()
+        for row_index, row in enumerate(matrix):
+            row_y = top - (row_index + 1) * module_size
+            run_start = None
+            for column_index, is_dark in enumerate([*row, False]):
+                if is_dark and run_start is None:
+                    run_start = column_index
+                elif not is_dark and run_start is not None:
+                    path.rect(
+                        x + run_start * module_size,
+                        row_y,
+                        (column_index - run_start) * module_size,
+                        module_size,
+                    )
+                    run_start = None
+        self._canvas.drawPath(path, stroke=0, fill=1)
+        self._canvas.restoreState()
 
-        w = self._draw_text_line(
-            f"{manufacturer}",
-            label_x,
-            label_y,
-            font_size=self.font_size,
-            font_name=self.bold_font,
-        )
-        self._draw_text_line(f" - {model}", label_x + w, label_y)
-        label_y -= self.get_line_height(self.font_size) + self.gap_y
+    def add_device(self, record: LabelRecord) -> None:
+        qrcode_data = self.get_qr_code_data(record)
+        template = self.template
+        cell_x, cell_y = self.cell_origins[self._next_cell]
+        self._canvas.saveState()
+        self._canvas.translate(cell_x, cell_y)
+        self._canvas.doForm(self.template_form_name)
 
-        w = self._draw_text_line(f"{self.sn_prefix} ", label_x, label_y, font_size=self.font_size_small)
-        self._draw_text_line(f"{serial_number}", label_x + w, label_y, self.font_size)
-        self._canvas.showPage()
+        if self.qr_renderer == QRCodeRenderer.VECTOR:
+            self._draw_qr_code_vector(qrcode_data, template.qr_x, template.qr_y)
+        else:
+            self._draw_qr_code_image(qrcode_data, template.qr_x, template.qr_y)
 
-    def build_pdf(self) -> io.BytesIO:
-        self._canvas.save()
-        return io.BytesIO(self._buffer.getvalue())
+        # a single text object keeps the font switches inside one BT/ET block without saving the state
+        text = self._canvas.beginText()
+        text.setFont(self.bold_font, self.font_size_large)
+        text.setTextOrigin(template.text_x, template.title_y)
+        text.textOut(f"{record.building} - {record.room_number}")
+
+        text.setFont(self.standard_font, self.font_size)
+        text.setTextOrigin(template.text_x, template.owner_y)
+        text.textOut(record.owner_name)
+        text.setTextOrigin(template.inventory_x, template.inventory_y)
+        text.textOut(f"{record.inventory_number}")
+        text.setTextOrigin(template.serial_x, template.serial_y)
+        text.textOut(f"{record.serial_number}")
+
+        text.setFont(self.bold_font, self.font_size)
+        text.setTextOrigin(template.text_x, template.model_y)
+        text.textOut(record.manufacturer)
+        text.setFont(self.standard_font, self.font_size)
+        text.textOut(f" - {record.model_name}")
+        self._canvas.drawText(text)
+
+        self._canvas.restoreState()
+        self._next_cell += 1
+        if self._next_cell == len(self.cell_origins):
+            self._show_page()
+
+    def build(self) -> IO[bytes]:
+        """
+        Finish the document and return it as a file positioned at its start.
+
+        The PDF is written to a spooled temporary file which rolls over to disk once it grows past
+        ``LABEL_PDF_SPOOL_MAX_SIZE``, so it can be streamed to the client without copying it in memory.
+        """
+        if self._next_cell:
+            self._canvas.showPage()
+            self._batch_pages += 1
+        if self._batch_pages or self._first_batch is None and self._concatenator is None:
+            self._finish_batch()
+        else:
+            self._batch_buffer.close()
+
+        if self._concatenator is None:
+            return self._first_batch
+        self._concatenator.finish()
+        self._concatenator.output.seek(0)
+        return self._concatenator.output
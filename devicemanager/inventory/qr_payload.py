@@ -0,0 +1,56 @@
+"""
+Compact QR code payloads identifying a device.
+
+A compact payload looks like ``DM1-2N9-K``: a scheme version, the device id in base 36 and a Luhn
+mod 36 check character. It only uses characters of the QR alphanumeric mode, which stores
+5.5 bits per character instead of 8, so labels get low QR versions with large modules.
+The device details are looked up through the API instead of being stored in the code.
+"""
+
+import string
+
+COMPACT_PAYLOAD_PREFIX = "DM1"
+BASE36_ALPHABET = string.digits + string.ascii_uppercase
+
+
+class InvalidPayloadError(ValueError):
+    pass
+
+
+def to_base36(value: int) -> str:
+    if value < 0:
+        raise ValueError("Only non-negative numbers can be encoded")
+    digits = ""
+    while True:
+        value, remainder = divmod(value, 36)
+        digits = BASE36_ALPHABET[remainder] + digits
+        if not value:
+            return digits
+
+
+def get_check_character(digits: str) -> str:
+    """Return the Luhn mod 36 check character, which detects any single character error and most transpositions."""
+    total = 0
+    for position, char in enumerate(reversed(digits)):
+        addend = BASE36_ALPHABET.index(char) * (2 if position % 2 == 0 else 1)
+        total += addend // 36 + addend % 36
+    return BASE36_ALPHABET[-total % 36]
+
+
+def encode_compact_payload(device_id: int) -> str:
+    digits = to_base36(device_id)
+    return f"{COMPACT_PAYLOAD_PREFIX}-{digits}-{get_check_character(digits)}"
+
+
+def decode_compact_payload(payload: str) -> int:
+    """Return the device id stored in a compact payload, raising ``InvalidPayloadError`` if it is malformed."""
+    prefix, _, rest = payload.strip().upper().partition("-")
+    if prefix != COMPACT_PAYLOAD_PREFIX:
+        raise InvalidPayloadError(f"Unsupported payload scheme: {prefix!r}")
+
+    digits, _, check = rest.partition("-")
+    if not digits or any(char not in BASE36_ALPHABET for char in digits):
+        raise InvalidPayloadError("Device id is not a base 36 number")
+    if check != get_check_character(digits):
+        raise InvalidPayloadError("Check character does not match")
+    return int(digits, 36)
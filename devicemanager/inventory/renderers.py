@@ -0,0 +1,76 @@
+import csv
+import json
+from collections.abc import Iterable, Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+class ZPLRenderer(BaseRenderer):
+    """
+    Selects ZPL label output with ``?format=zpl``.
+
+    Labels are streamed by the view itself, so this renderer only has to render error responses,
+    which are written as JSON.
+    """
+
+    media_type = "application/zpl"
+    format = "zpl"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, bytes):
+            return data
+        return JSONRenderer().render(data, renderer_context=renderer_context)
+
+
+class PNGRenderer(BaseRenderer):
+    """Selects PNG output, like ``ZPLRenderer`` only error responses are rendered, as JSON."""
+
+    media_type = "image/png"
+    format = "png"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, bytes):
+            return data
+        return JSONRenderer().render(data, renderer_context=renderer_context)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Selects newline delimited JSON exports with ``?format=ndjson``, an object per row.
+
+    Rows are streamed by the view through ``encode_batches``, ``render`` only renders error responses, as JSON.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return JSONRenderer().render(data, renderer_context=renderer_context)
+
+    def encode_batches(self, columns: list[str], batches: Iterable[list[tuple]]) -> Iterator[str]:
+        for batch in batches:
+            yield "".join(json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder) + "\n" for row in batch)
+
+
+class _Line:
+    """File-like object handing the line written by ``csv.writer`` back to the caller."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+class CSVRenderer(NDJSONRenderer):
+    """Selects CSV exports with ``?format=csv``, with a header row, like ``NDJSONRenderer`` errors are JSON."""
+
+    media_type = "text/csv"
+    format = "csv"
+
+    def encode_batches(self, columns: list[str], batches: Iterable[list[tuple]]) -> Iterator[str]:
+        writer = csv.writer(_Line())
+        yield writer.writerow(columns)
+        for batch in batches:
+            yield "".join(writer.writerow(row) for row in batch)
@@ -0,0 +1,239 @@
+import re
+import unicodedata
+from functools import cache
+from itertools import batched
+
+from django.db import connections, transaction
+from django.db.models import (
+    Count,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    Lookup,
+    Model,
+    OuterRef,
+    QuerySet,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.signals import post_save, pre_delete
+
+from devicemanager.inventory.models import (
+    Device,
+    DeviceSearchDocument,
+    DeviceSearchToken,
+)
+
+# columns of a device and its relations that are searched, with the weight of a match in the prefix index ranking
+DOCUMENT_FIELDS = {
+    "id": 1,
+    "serial_number": 4,
+    "inventory_number": 4,
+    "device_model__name": 3,
+    "device_model__manufacturer__name": 2,
+    "device_model__device_type__name": 2,
+    "device_model__device_type__short_name": 2,
+    "room__room_number": 2,
+    "room__building__name": 2,
+    "owner__username": 1,
+    "owner__first_name": 1,
+    "owner__last_name": 1,
+}
+DOCUMENT_BATCH_SIZE = 500
+TOKEN_BATCH_SIZE = 5000
+# innodb_ft_min_token_size, shorter tokens are left out of the FULLTEXT index, e.g. ids below 100 and room 12
+FULLTEXT_MIN_TOKEN_SIZE = 3
+
+SEPARATORS = re.compile(r"[\W_]+")
+
+
+class FullTextMatch(Lookup):
+    """Relevance of a column with a FULLTEXT index on MariaDB or MySQL for a boolean mode query."""
+
+    lookup_name = "match"
+    prepare_rhs = False
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"MATCH ({lhs}) AGAINST ({rhs} IN BOOLEAN MODE)", (*lhs_params, *rhs_params)
+
+
+def uses_fulltext(connection) -> bool:
+    return connection.vendor == "mysql"
+
+
+def normalize(value: str) -> str:
+    """Case fold ``value`` and strip its accents."""
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(value: str) -> list[str]:
+    """
+    Split ``value`` into search tokens.
+
+    Each word is a token with its separators removed and, when it has any, its parts are tokens too,
+    so ``WFiIS/0123/2024`` is found by ``wfiis/01`` as well as by ``0123``.
+    """
+    tokens = []
+    for word in normalize(value).split():
+        parts = [part for part in SEPARATORS.split(word) if part]
+        if parts:
+            tokens.append("".join(parts))
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+def tokenize_query(query: str) -> list[str]:
+    """Return the terms of a search query, a matching device has a token starting with each of them."""
+    terms = ("".join(SEPARATORS.split(word)) for word in normalize(query).split())
+    return list(dict.fromkeys(term for term in terms if term))
+
+
+def get_document_tokens(values: tuple) -> dict[str, int]:
+    """Return the tokens of the ``DOCUMENT_FIELDS`` values of a device, weighted by the most important field."""
+    tokens: dict[str, int] = {}
+    for value, weight in zip(values, DOCUMENT_FIELDS.values()):
+        for token in tokenize(str(value)) if value is not None else ():
+            tokens[token] = max(weight, tokens.get(token, 0))
+    return tokens
+
+
+def get_document_text(tokens: dict[str, int]) -> str:
+    # FULLTEXT relevance grows with the occurrences of a term, tokens are repeated by their weight
+    return " ".join(token for token, weight in tokens.items() for _ in range(weight))
+
+
+def get_prefix_weights(tokens: dict[str, int], max_length: int) -> dict[str, int]:
+    """Return the prefixes of ``tokens`` up to ``max_length`` characters, a whole token weighs twice its prefixes."""
+    prefixes: dict[str, int] = {}
+    for token, weight in tokens.items():
+        for length in range(1, min(len(token), max_length) + 1):
+            prefix = token[:length]
+            prefixes[prefix] = max(weight * 2 if length == len(token) else weight, prefixes.get(prefix, 0))
+    return prefixes
+
+
+def update_documents(devices: QuerySet) -> None:
+    """Rebuild the search documents of ``devices``."""
+    using = devices.db
+    index_prefixes = not uses_fulltext(connections[using])
+    prefix_length = DeviceSearchToken._meta.get_field("prefix").max_length
+    rows = devices.order_by().values_list("pk", *DOCUMENT_FIELDS).iterator(chunk_size=DOCUMENT_BATCH_SIZE)
+    for batch in batched(rows, DOCUMENT_BATCH_SIZE):
+        documents = {pk: get_document_tokens(values) for pk, *values in batch}
+        with transaction.atomic(using=using):
+            DeviceSearchToken.objects.using(using).filter(document__in=documents).delete()
+            DeviceSearchDocument.objects.using(using).filter(pk__in=documents).delete()
+            DeviceSearchDocument.objects.using(using).bulk_create(
+                DeviceSearchDocument(device_id=pk, text=get_document_text(tokens)) for pk, tokens in documents.items()
+            )
+            if index_prefixes:
+                DeviceSearchToken.objects.using(using).bulk_create(
+                    (
+                        DeviceSearchToken(document_id=pk, prefix=prefix, weight=weight)
+                        for pk, tokens in documents.items()
+                        for prefix, weight in get_prefix_weights(tokens, prefix_length).items()
+                    ),
+                    batch_size=TOKEN_BATCH_SIZE,
+                )
+
+
+def update_documents_on_commit(devices: QuerySet[Device]) -> None:
+    """Rebuild the search documents of ``devices`` once the current transaction commits, ``devices`` is evaluated then."""
+    transaction.on_commit(lambda: update_documents(devices), using=devices.db)
+
+
+def search_devices(devices: QuerySet[Device], query: str) -> QuerySet[Device]:
+    """
+    Filter ``devices`` to those with a token starting with each term of ``query``, annotated with their ``search_rank``.
+
+    Identifiers rank higher than names and locations. On MariaDB the rank is the relevance of the FULLTEXT match,
+    changes are only found once they are committed. Elsewhere it is the sum of the weights of the matched prefixes,
+    where whole tokens also rank higher.
+    """
+    terms = tokenize_query(query)
+    if not terms:
+        return devices.none()
+    if uses_fulltext(connections[devices.db]):
+        return search_fulltext(devices, terms)
+
+    prefix_length = DeviceSearchToken._meta.get_field("prefix").max_length
+    prefixes = {term[:prefix_length] for term in terms}
+    matches = (
+        DeviceSearchToken.objects.using(devices.db)
+        .filter(prefix__in=prefixes)
+        .values("document")
+        .annotate(matched=Count("prefix"), rank=Sum("weight"))
+        .filter(matched=len(prefixes))
+    )
+    devices = devices.filter(pk__in=matches.values("document"))
+    for term in terms:
+        if len(term) > prefix_length:
+            # only the indexed prefix of a long term is matched so far
+            devices = devices.filter(search_document__text__contains=term)
+    return devices.annotate(search_rank=Subquery(matches.filter(document=OuterRef("pk")).values("rank")))
+
+
+def search_fulltext(devices: QuerySet[Device], terms: list[str]) -> QuerySet[Device]:
+    """
+    Match ``terms`` against the FULLTEXT index of the search documents.
+
+    Terms shorter than ``FULLTEXT_MIN_TOKEN_SIZE`` would never match, as their tokens are not indexed.
+    They are matched against the beginnings of the words of the document text instead, scanning the documents
+    left by the other terms, and add nothing to the rank.
+    """
+    indexed_terms = [term for term in terms if len(term) >= FULLTEXT_MIN_TOKEN_SIZE]
+    for term in terms:
+        if len(term) < FULLTEXT_MIN_TOKEN_SIZE:
+            devices = devices.filter(search_document__text__regex=rf"(^| ){re.escape(term)}")
+    if not indexed_terms:
+        return devices.annotate(search_rank=Value(0.0))
+    boolean_query = " ".join(f"+{term}*" for term in indexed_terms)
+    rank = ExpressionWrapper(FullTextMatch(F("search_document__text"), boolean_query), output_field=FloatField())
+    return devices.filter(FullTextMatch(F("search_document__text"), boolean_query)).annotate(search_rank=rank)
+
+
+@cache
+def get_document_sources() -> dict[type[Model], tuple[str, set[str]]]:
+    """Map the models with fields in ``DOCUMENT_FIELDS`` to the lookup of their devices and the names of those fields."""
+    sources: dict[type[Model], tuple[str, set[str]]] = {}
+    for path in DOCUMENT_FIELDS:
+        model = Device
+        parts = path.split("__")
+        for depth, name in enumerate(parts):
+            field = model._meta.get_field(name)
+            lookup = "__".join(parts[:depth]) or "pk"
+            sources.setdefault(model, (lookup, set()))[1].update((field.name, field.attname))
+            model = field.related_model
+    return sources
+
+
+def get_source_devices(sender: type[Model], instance: Model) -> QuerySet[Device]:
+    lookup, _ = get_document_sources()[sender]
+    return Device.objects.filter(**{lookup: instance.pk})
+
+
+def update_saved_documents(sender, instance, raw=False, update_fields=None, **kwargs):
+    _, names = get_document_sources()[sender]
+    # fixtures are loaded as they are, see the rebuild_device_search command
+    if raw or (update_fields is not None and not names & update_fields):
+        return
+    update_documents_on_commit(get_source_devices(sender, instance))
+
+
+def update_deleted_documents(sender, instance, **kwargs):
+    # devices outliving a deleted room or owner are no longer related to it once the deletion commits
+    device_ids = list(get_source_devices(sender, instance).values_list("pk", flat=True))
+    update_documents_on_commit(Device.objects.filter(pk__in=device_ids))
+
+
+def connect_signals() -> None:
+    """Rebuild the documents of devices when they or the related objects they are searched by change."""
+    for model in get_document_sources():
+        post_save.connect(update_saved_documents, sender=model, dispatch_uid="update_saved_device_documents")
+        if model is not Device:
+            pre_delete.connect(update_deleted_documents, sender=model, dispatch_uid="update_deleted_device_documents")
@@ -1,25 +1,54 @@
+import copy
+from collections import Counter
 from typing import NotRequired, TypedDict
+from uuid import UUID
 
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 from drf_spectacular.utils import OpenApiExample, extend_schema_serializer
 from rest_framework import serializers
 
+from devicemanager.inventory.label_rendering import (
+    LABEL_SELECTION_FIELDS,
+    LabelSelection,
+)
 from devicemanager.inventory.models import (
     Building,
     Device,
     DeviceModel,
     DeviceRental,
+    DeviceSelection,
     DeviceType,
     Faculty,
+    LabelJob,
     Manufacturer,
     QRCodeGenerationConfig,
     Room,
 )
+from devicemanager.inventory.search import update_documents_on_commit
 from devicemanager.users.models import User
-from devicemanager.utils.serializers import CharacterSeperatedField
+from devicemanager.users.serializers import UserSerializer
+from devicemanager.utils.serializers import (
+    BulkListSerializer,
+    BulkPrimaryKeyRelatedField,
+    CharacterSeperatedField,
+    DynamicFieldsMixin,
+)
 
 
 class QRCodeGenerateQueryData(TypedDict):
-    ids: list[int]
+    ids: NotRequired[list[int]]
+    selection: NotRequired[UUID]
+    building: NotRequired[list[int]]
+    room: NotRequired[list[int]]
+    owner: NotRequired[list[int]]
+    device_type: NotRequired[list[int]]
+    device_model: NotRequired[list[int]]
+    is_rented: NotRequired[bool]
+    mode: NotRequired[str]
     qr_code_size_cm: NotRequired[int]
     qr_code_margin_mm: NotRequired[int]
     fill_color: NotRequired[str]
@@ -36,6 +65,8 @@ class QRCodeGenerateQueryData(TypedDict):
             summary="Valid request query parameters",
             value={
                 "ids": "4,5,6",
+                "building": "1",
+                "is_rented": False,
                 "label_width_mm": 50,
                 "label_height_mm": 30,
                 "label_padding_mm": 2,
@@ -48,20 +79,42 @@ class QRCodeGenerateQueryData(TypedDict):
                 "font_size_large": 16,
                 "fill_color": "#FFFFFF",
                 "background_color": "#000000",
+                "qr_renderer": "vector",
                 "inv_prefix": "inv:",
                 "sn_prefix": "s/n:",
+                "mode": "sync",
             },
             request_only=True,
         )
     ]
 )
 class QRCodeGenerateQuerySerializer(serializers.ModelSerializer):
-    ids = CharacterSeperatedField(required=True, separator=",", child=serializers.IntegerField())
+    ids = CharacterSeperatedField(required=False, separator=",", child=serializers.IntegerField())
+    selection = serializers.UUIDField(required=False, help_text="Token of a device selection stored on the server")
+    building = CharacterSeperatedField(required=False, separator=",", child=serializers.IntegerField())
+    room = CharacterSeperatedField(required=False, separator=",", child=serializers.IntegerField())
+    owner = CharacterSeperatedField(required=False, separator=",", child=serializers.IntegerField())
+    device_type = CharacterSeperatedField(required=False, separator=",", child=serializers.IntegerField())
+    device_model = CharacterSeperatedField(required=False, separator=",", child=serializers.IntegerField())
+    is_rented = serializers.BooleanField(required=False, allow_null=True, default=None)
+    mode = serializers.ChoiceField(
+        choices=(("sync", "sync"), ("async", "async")),
+        required=False,
+        help_text="Render labels within the request or queue a label job and return its id",
+    )
 
     class Meta:
         model = QRCodeGenerationConfig
         fields = (
             "ids",
+            "selection",
+            "building",
+            "room",
+            "owner",
+            "device_type",
+            "device_model",
+            "is_rented",
+            "mode",
             "label_width_mm",
             "label_height_mm",
             "label_padding_mm",
@@ -74,6 +127,17 @@ class QRCodeGenerateQuerySerializer(serializers.ModelSerializer):
             "font_size_large",
             "fill_color",
             "background_color",
+            "qr_renderer",
+            "payload_format",
+            "layout",
+            "sheet_width_mm",
+            "sheet_height_mm",
+            "sheet_rows",
+            "sheet_columns",
+            "sheet_margin_top_mm",
+            "sheet_margin_left_mm",
+            "sheet_gutter_x_mm",
+            "sheet_gutter_y_mm",
             "inv_prefix",
             "sn_prefix",
         )
@@ -85,60 +149,114 @@ class QRCodeGenerateQuerySerializer(serializers.ModelSerializer):
         except ValueError:
             raise serializers.ValidationError("Invalid id")
 
+    def validate_selection(self, value: UUID) -> UUID:
+        selections = DeviceSelection.objects.filter(
+            created_at__gte=timezone.now() - settings.DEVICE_SELECTION_RETENTION,
+        )
+        if not selections.filter(pk=value).exists():
+            raise serializers.ValidationError(_("Device selection does not exist or has expired."))
+        return value
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if attrs.get("is_rented") is None:
+            attrs.pop("is_rented", None)
+        if not self.partial and not any(field in attrs for field in LABEL_SELECTION_FIELDS):
+            raise serializers.ValidationError({"ids": _("Provide device ids, a selection token or device filters.")})
+        self.validate_generation_config(attrs)
+        return attrs
+
+    def validate_generation_config(self, attrs) -> None:
+        """Check that the label grid still fits the sheet once the overrides are applied to the active configuration."""
+        overrides = {field: attrs[field] for field in QRCodeGenerationConfig.SHEET_LAYOUT_FIELDS if field in attrs}
+        if not overrides:
+            return
+        config = copy.copy(self.instance or QRCodeGenerationConfig.get_cached_active_configuration())
+        for field, value in overrides.items():
+            setattr(config, field, value)
+        try:
+            config.clean()
+        except DjangoValidationError as error:
+            raise serializers.ValidationError(error.message_dict)
+
+    def get_label_selection(self) -> LabelSelection:
+        selection = {
+            field: self.validated_data[field] for field in LABEL_SELECTION_FIELDS if field in self.validated_data
+        }
+        if "selection" in selection:
+            selection["selection"] = str(selection["selection"])
+        return selection
+
     @property
     def validated_data(self) -> QRCodeGenerateQueryData:
         return super().validated_data
 
 
-class FacultySerializer(serializers.ModelSerializer):
+class FacultySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Faculty
         fields = ["id", "full_name", "short_name"]
 
 
-class BuildingSerializer(serializers.ModelSerializer):
+class BuildingSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     faculty = serializers.PrimaryKeyRelatedField(many=False, queryset=Faculty.objects)
 
     class Meta:
         model = Building
         fields = ["id", "name", "faculty"]
+        expandable_fields = {"faculty": FacultySerializer}
 
 
-class RoomSerializer(serializers.ModelSerializer):
+class RoomSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     building = serializers.PrimaryKeyRelatedField(many=False, queryset=Building.objects)
     occupants = serializers.PrimaryKeyRelatedField(many=True, queryset=User.objects)
 
     class Meta:
         model = Room
         fields = ["id", "room_number", "building", "description", "occupants"]
+        expandable_fields = {"building": BuildingSerializer, "occupants": UserSerializer}
 
 
-class ManufacturerSerializer(serializers.ModelSerializer):
+class ManufacturerSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Manufacturer
         fields = ["id", "name", "description"]
 
 
-class DeviceTypeSerializer(serializers.ModelSerializer):
+class DeviceTypeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = DeviceType
         fields = ["id", "name", "short_name"]
 
 
-class DeviceModelSerializer(serializers.ModelSerializer):
+class DeviceModelSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     device_type = serializers.PrimaryKeyRelatedField(many=False, queryset=DeviceType.objects)
     manufacturer = serializers.PrimaryKeyRelatedField(many=False, queryset=Manufacturer.objects)
 
     class Meta:
         model = DeviceModel
         fields = ["id", "device_type", "manufacturer", "name", "description"]
+        expandable_fields = {"device_type": DeviceTypeSerializer, "manufacturer": ManufacturerSerializer}
+
+
+class DeviceListSerializer(BulkListSerializer):
+    # bulk writes send no signals, the search documents are rebuilt here
+    def create(self, validated_data):
+        devices = super().create(validated_data)
+        update_documents_on_commit(Device.objects.filter(pk__in=[device.pk for device in devices]))
+        return devices
 
+    def update(self, instance, validated_data):
+        devices = super().update(instance, validated_data)
+        update_documents_on_commit(Device.objects.filter(pk__in=[device.pk for device in devices]))
+        return devices
 
-class DeviceSerializer(serializers.ModelSerializer):
-    model = serializers.PrimaryKeyRelatedField(many=False, queryset=DeviceModel.objects)
-    room = serializers.PrimaryKeyRelatedField(many=False, queryset=Room.objects)
-    owner = serializers.PrimaryKeyRelatedField(many=False, queryset=User.objects)
-    device_rentals = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+class DeviceSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    model = BulkPrimaryKeyRelatedField(many=False, queryset=DeviceModel.objects, source="device_model")
+    room = BulkPrimaryKeyRelatedField(many=False, queryset=Room.objects)
+    owner = BulkPrimaryKeyRelatedField(many=False, queryset=User.objects)
+    device_rentals = serializers.PrimaryKeyRelatedField(many=True, read_only=True, source="rentals")
 
     class Meta:
         model = Device
@@ -151,11 +269,57 @@ class DeviceSerializer(serializers.ModelSerializer):
             "owner",
             "device_rentals",
         ]
+        list_serializer_class = DeviceListSerializer
+        expandable_fields = {
+            "model": DeviceModelSerializer,
+            "room": RoomSerializer,
+            "owner": UserSerializer,
+            "device_rentals": "devicemanager.inventory.serializers.DeviceRentalSerializer",
+        }
+
+
+class DeviceSearchResultSerializer(DeviceSerializer):
+    search_rank = serializers.FloatField(read_only=True, help_text="Relevance for the query, higher is better")
 
+    class Meta(DeviceSerializer.Meta):
+        fields = [*DeviceSerializer.Meta.fields, "search_rank"]
 
-class DeviceRentalSerializer(serializers.ModelSerializer):
-    device = serializers.PrimaryKeyRelatedField(many=False, queryset=Device.objects, required=False)
-    borrower = serializers.PrimaryKeyRelatedField(many=False, queryset=User.objects, required=False)
+
+class DeviceRentalListSerializer(BulkListSerializer):
+    # optional on the child, so items updating a rental may leave them out
+    required_on_create = ("device", "borrower")
+
+    def validate_items(self, validated_data):
+        """Check that created rentals have a device and a borrower and that no device is rented twice, here or before."""
+        instances = self.child_instances or [None] * len(validated_data)
+        errors = [{} for _ in validated_data]
+        open_rentals = []
+        for index, (attrs, instance) in enumerate(zip(validated_data, instances)):
+            if instance is None:
+                for name in self.required_on_create:
+                    if attrs.get(name) is None:
+                        errors[index][name] = [self.child.fields[name].error_messages["required"]]
+            device = attrs["device"] if "device" in attrs else getattr(instance, "device", None)
+            return_date = attrs["return_date"] if "return_date" in attrs else getattr(instance, "return_date", None)
+            if device is not None and return_date is None:
+                open_rentals.append((index, device.pk))
+
+        device_counts = Counter(device for _, device in open_rentals)
+        rented_devices = set(
+            DeviceRental.objects.filter(device__in=device_counts, return_date=None)
+            .exclude(pk__in=[instance.pk for instance in instances if instance is not None])
+            .values_list("device", flat=True)
+        )
+        for index, device in open_rentals:
+            if device_counts[device] > 1 or device in rented_devices:
+                errors[index]["device"] = [_("Device is already rented")]
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+
+class DeviceRentalSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    device = BulkPrimaryKeyRelatedField(many=False, queryset=Device.objects, required=False)
+    borrower = BulkPrimaryKeyRelatedField(many=False, queryset=User.objects, required=False)
 
     class Meta:
         model = DeviceRental
@@ -168,3 +332,31 @@ class DeviceRentalSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+        list_serializer_class = DeviceRentalListSerializer
+        expandable_fields = {"device": DeviceSerializer, "borrower": UserSerializer}
+
+
+class LabelJobSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = LabelJob
+        fields = [
+            "id",
+            "status",
+            "pages_rendered",
+            "pages_total",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+            "download_url",
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, obj: LabelJob) -> str | None:
+        if obj.status != LabelJob.Status.DONE:
+            return None
+        url = reverse("inventory:labeljob-download", kwargs={"pk": obj.pk})
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
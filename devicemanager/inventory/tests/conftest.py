@@ -0,0 +1,70 @@
+import pytest
+from rest_framework.test import APIClient
+
+from devicemanager.inventory.models import (
+    Building,
+    Device,
+    DeviceModel,
+    DeviceType,
+    Faculty,
+    Manufacturer,
+    Room,
+)
+from devicemanager.users.models import User
+
+
+@pytest.fixture(autouse=True)
+def label_artifact_dir(settings, tmp_path):
+    settings.LABEL_ARTIFACT_DIR = tmp_path / "labels"
+    return settings.LABEL_ARTIFACT_DIR
+
+
+@pytest.fixture(autouse=True)
+def label_preview_cache(settings):
+    settings.CACHES = {
+        **settings.CACHES,
+        "label_previews": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "label-previews"},
+    }
+
+
+@pytest.fixture
+def api_client():
+    client = APIClient()
+    client.force_authenticate(User.objects.create(username="admin", is_superuser=True))
+    return client
+
+
+@pytest.fixture
+def devices():
+    faculty = Faculty.objects.create(full_name="Faculty of Physics", short_name="WFiIS")
+    building = Building.objects.create(name="D-10", faculty=faculty)
+    room = Room.objects.create(room_number="127", building=building)
+    device_model = DeviceModel.objects.create(
+        name="Latitude",
+        device_type=DeviceType.objects.create(name="Laptop", short_name="LAP"),
+        manufacturer=Manufacturer.objects.create(name="Dell"),
+    )
+    owner = User.objects.create(username="jkowalski", first_name="Jan", last_name="Kowalski")
+    return [
+        Device.objects.create(
+            device_model=device_model,
+            room=room,
+            owner=owner,
+            inventory_number=f"INV/{number}",
+            serial_number=f"SN{number}",
+        )
+        for number in range(3)
+    ]
+
+
+@pytest.fixture
+def assert_query_budget(api_client, django_assert_max_num_queries):
+    """Fetch ``url`` with the API client and fail when it runs more than ``budget`` queries."""
+
+    def assert_budget(url, budget, **params):
+        with django_assert_max_num_queries(budget):
+            response = api_client.get(url, params)
+        assert response.status_code == 200
+        return response
+
+    return assert_budget
@@ -0,0 +1,596 @@
+import csv
+import io
+import json
+import uuid
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from pypdf import PdfReader
+
+from devicemanager.inventory.factories import DeviceFactory
+from devicemanager.inventory.label_jobs import (
+    claim_next_job,
+    delete_expired_jobs,
+    delete_expired_selections,
+    requeue_stale_jobs,
+)
+from devicemanager.inventory.models import (
+    Device,
+    DeviceRental,
+    DeviceSelection,
+    LabelJob,
+    QRCodeGenerationConfig,
+    Room,
+)
+from devicemanager.inventory.qr_payload import encode_compact_payload
+from devicemanager.users.factories import UserFactory
+from devicemanager.users.models import User
+
+
+@pytest.mark.django_db
+class TestQRCodeGenerateView:
+    def test_returns_pdf(self, api_client, devices):
+        ids = ",".join(str(device.pk) for device in devices)
+        response = api_client.get(reverse("inventory:qr-generate"), {"ids": ids, "qr_renderer": "vector"})
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/pdf"
+        content = b"".join(response.streaming_content)
+        assert content.startswith(b"%PDF")
+        assert int(response["Content-Length"]) == len(content)
+        assert content.count(b"/Type /Page\n") == len(devices)
+
+    def test_selects_devices_by_filters(self, api_client, devices):
+        DeviceRental.objects.create(device=devices[0], borrower=devices[0].owner)
+
+        response = api_client.get(
+            reverse("inventory:qr-generate"),
+            {"building": devices[0].room.building_id, "is_rented": "false", "qr_renderer": "vector"},
+        )
+
+        assert response.status_code == 200
+        assert b"".join(response.streaming_content).count(b"/Type /Page\n") == len(devices) - 1
+
+    def test_selects_devices_by_selection_token(self, api_client, devices):
+        selection = DeviceSelection.objects.create()
+        selection.devices.add(devices[0], devices[1])
+
+        response = api_client.get(
+            reverse("inventory:qr-generate"), {"selection": str(selection.pk), "qr_renderer": "vector"}
+        )
+
+        assert response.status_code == 200
+        assert b"".join(response.streaming_content).count(b"/Type /Page\n") == 2
+
+    def test_rejects_unknown_selection_token(self, api_client, devices):
+        response = api_client.get(reverse("inventory:qr-generate"), {"selection": str(uuid.uuid4())})
+
+        assert response.status_code == 400
+        assert "selection" in response.data
+
+    def test_rejects_expired_selection_token(self, api_client, devices, settings):
+        settings.DEVICE_SELECTION_RETENTION = timedelta(hours=1)
+        selection = DeviceSelection.objects.create()
+        selection.devices.add(devices[0])
+        DeviceSelection.objects.filter(pk=selection.pk).update(created_at=timezone.now() - timedelta(hours=2))
+
+        response = api_client.get(reverse("inventory:qr-generate"), {"selection": str(selection.pk)})
+
+        assert response.status_code == 400
+        assert "selection" in response.data
+
+    def test_packs_labels_on_sheets(self, api_client, devices):
+        ids = ",".join(str(device.pk) for device in devices)
+        response = api_client.get(
+            reverse("inventory:qr-generate"),
+            {"ids": ids, "qr_renderer": "vector", "layout": "sheet", "sheet_rows": 1, "sheet_columns": 2},
+        )
+
+        assert response.status_code == 200
+        assert b"".join(response.streaming_content).count(b"/Type /Page\n") == 2
+
+    def test_rejects_sheet_grid_larger_than_sheet(self, api_client, devices):
+        response = api_client.get(
+            reverse("inventory:qr-generate"),
+            {"ids": devices[0].pk, "layout": "sheet", "sheet_rows": 20},
+        )
+
+        assert response.status_code == 400
+        assert "sheet_rows" in response.data
+
+    def test_returns_zpl(self, api_client, devices):
+        ids = ",".join(str(device.pk) for device in devices)
+        response = api_client.get(reverse("inventory:qr-generate"), {"ids": ids, "format": "zpl"})
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/zpl"
+        assert b"".join(response.streaming_content).count(b"^BQN,2,") == len(devices)
+
+    def test_unchanged_labels_are_not_modified(self, api_client, devices):
+        ids = ",".join(str(device.pk) for device in devices)
+        url = reverse("inventory:qr-generate")
+        response = api_client.get(url, {"ids": ids, "qr_renderer": "vector"})
+        assert response.status_code == 200
+        etag = response["ETag"]
+        assert "no-cache" in response["Cache-Control"]
+
+        response = api_client.get(url, {"ids": ids, "qr_renderer": "vector"}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+
+        response = api_client.get(url, {"ids": ids, "qr_renderer": "raster"}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+        devices[0].owner.last_name = "Nowak"
+        devices[0].owner.save()
+        response = api_client.get(url, {"ids": ids, "qr_renderer": "vector"}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        pdf = PdfReader(io.BytesIO(b"".join(response.streaming_content)))
+        assert "Nowak" in pdf.pages[0].extract_text()
+
+    def test_requires_selection_criteria(self, api_client, devices):
+        response = api_client.get(reverse("inventory:qr-generate"), {"qr_renderer": "vector"})
+
+        assert response.status_code == 400
+        assert "ids" in response.data
+
+
+@pytest.mark.django_db
+class TestQRCodePreviewView:
+    def test_returns_png_at_screen_resolution(self, api_client, devices, settings):
+        settings.LABEL_PREVIEW_DPI = 96
+        response = api_client.get(reverse("inventory:qr-preview", args=(devices[0].pk,)), {"dpi": 300})
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "image/png"
+        config = QRCodeGenerationConfig.get_cached_active_configuration()
+        label_mm = (config.label_width_mm, config.label_height_mm)
+        image = Image.open(io.BytesIO(response.content))
+        assert image.size == tuple(pytest.approx(mm / 25.4 * 96, abs=1) for mm in label_mm)
+
+    def test_previews_are_cached_per_device_version(self, api_client, devices, django_assert_num_queries):
+        url = reverse("inventory:qr-preview", args=(devices[0].pk,))
+        preview = api_client.get(url).content
+
+        with django_assert_num_queries(1):
+            assert api_client.get(url).content == preview
+
+        devices[0].owner.last_name = "Nowak"
+        devices[0].owner.save()
+        assert api_client.get(url).content != preview
+        assert api_client.get(url, {"font_size": 12}).content != preview
+
+    def test_unknown_device_is_not_found(self, api_client, devices):
+        response = api_client.get(reverse("inventory:qr-preview", args=(devices[-1].pk + 1,)))
+
+        assert response.status_code == 404
+
+    def test_rejects_invalid_overrides(self, api_client, devices):
+        response = api_client.get(reverse("inventory:qr-preview", args=(devices[0].pk,)), {"dpi": "many"})
+
+        assert response.status_code == 400
+        assert "dpi" in response.json()
+
+
+@pytest.mark.django_db
+class TestPagination:
+    def test_lists_are_paginated_with_a_cursor(self, api_client, devices):
+        response = api_client.get(reverse("inventory:device-list"), {"page_size": 2})
+
+        assert response.status_code == 200
+        assert [device["id"] for device in response.data["results"]] == [devices[0].pk, devices[1].pk]
+        assert "count" not in response.data
+        assert response.data["previous"] is None
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(response.data["next"])
+        assert [device["id"] for device in response.data["results"]] == [devices[2].pk]
+        # the next page continues after the last id instead of counting and skipping rows
+        assert not any("COUNT(" in query["sql"] or "OFFSET" in query["sql"] for query in queries)
+        assert response.data["next"] is None
+
+    def test_page_size_is_limited(self, api_client, devices, settings):
+        settings.API_MAX_PAGE_SIZE = 2
+
+        response = api_client.get(reverse("inventory:device-list"), {"page_size": 1000})
+
+        assert len(response.data["results"]) == 2
+        response = api_client.get(reverse("inventory:device-list"), {"limit": 1000})
+        assert len(response.data["results"]) == 2
+
+    def test_offset_pagination_counts_results(self, api_client, devices):
+        response = api_client.get(reverse("inventory:device-list"), {"limit": 1, "offset": 1})
+
+        assert response.status_code == 200
+        assert response.data["count"] == len(devices)
+        assert [device["id"] for device in response.data["results"]] == [devices[1].pk]
+
+    def test_rentals_are_listed_newest_first(self, api_client, devices):
+        rentals = [DeviceRental.objects.create(device=device, borrower=device.owner) for device in devices]
+
+        response = api_client.get(reverse("inventory:devicerental-list"))
+
+        assert [rental["id"] for rental in response.data["results"]] == [rental.pk for rental in reversed(rentals)]
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+    @staticmethod
+    def seed(count):
+        for device in DeviceFactory.create_batch(count):
+            device.room.occupants.add(*UserFactory.create_batch(2))
+            DeviceRental.objects.create(device=device, borrower=device.owner)
+
+    @pytest.mark.parametrize(
+        ("endpoint", "budget"),
+        [
+            ("inventory:faculty-list", 1),
+            ("inventory:building-list", 1),
+            ("inventory:room-list", 2),
+            ("inventory:manufacturer-list", 1),
+            ("inventory:devicetype-list", 1),
+            ("inventory:devicemodel-list", 1),
+            ("inventory:device-list", 2),
+            ("inventory:devicerental-list", 1),
+            ("inventory:labeljob-list", 1),
+        ],
+    )
+    def test_lists_run_a_constant_number_of_queries(self, assert_query_budget, endpoint, budget):
+        self.seed(2)
+        assert_query_budget(reverse(endpoint), budget)
+
+        self.seed(20)
+        assert_query_budget(reverse(endpoint), budget, page_size=50)
+
+
+@pytest.mark.django_db
+class TestExpand:
+    def test_inlines_expanded_objects(self, api_client, devices):
+        expand = "room.building.faculty,model.manufacturer,owner"
+
+        response = api_client.get(reverse("inventory:device-detail", args=[devices[0].pk]), {"expand": expand})
+
+        assert response.status_code == 200
+        assert response.data["room"]["building"]["faculty"]["short_name"] == "WFiIS"
+        assert response.data["room"]["occupants"] == []
+        assert response.data["model"]["manufacturer"]["name"] == "Dell"
+        assert response.data["model"]["device_type"] == devices[0].device_model.device_type_id
+        assert response.data["owner"]["username"] == "jkowalski"
+
+    def test_expanded_lists_run_a_constant_number_of_queries(self, assert_query_budget):
+        url = reverse("inventory:device-list")
+        expand = "room.building.faculty,room.occupants,model.manufacturer,owner,device_rentals.borrower"
+        # devices with joined relations, occupants, rentals and their borrowers
+        for count in (2, 20):
+            for device in DeviceFactory.create_batch(count):
+                device.room.occupants.add(*UserFactory.create_batch(2))
+                DeviceRental.objects.create(device=device, borrower=device.owner)
+
+            response = assert_query_budget(url, 4, expand=expand, page_size=50)
+
+        assert len(response.data["results"][0]["room"]["occupants"]) == 2
+        assert response.data["results"][0]["device_rentals"][0]["borrower"]["id"]
+
+    def test_rejects_unknown_expansion(self, api_client, devices):
+        response = api_client.get(reverse("inventory:device-list"), {"expand": "room.description"})
+
+        assert response.status_code == 400
+        assert response.data["expand"] == ["Field room.description can not be expanded."]
+
+    def test_writes_accept_primary_keys(self, api_client, devices):
+        url = reverse("inventory:device-detail", args=[devices[0].pk])
+        room = Room.objects.create(room_number="128", building=devices[0].room.building)
+
+        response = api_client.patch(f"{url}?expand=room", {"room": room.pk}, format="json")
+
+        assert response.status_code == 200
+        assert response.data["room"] == room.pk
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+    def test_selects_fields(self, api_client, devices):
+        url = reverse("inventory:device-list")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(url, {"fields": "id,inventory_number,room"})
+
+        assert response.status_code == 200
+        assert response.data["results"][0] == {
+            "id": devices[0].pk,
+            "inventory_number": "INV/0",
+            "room": devices[0].room_id,
+        }
+        # neither unrequested columns nor rentals are loaded
+        (query,) = queries
+        assert "serial_number" not in query["sql"]
+
+    def test_omits_fields(self, api_client, devices):
+        response = api_client.get(reverse("inventory:device-list"), {"omit": "device_rentals,owner,model"})
+
+        assert set(response.data["results"][0]) == {"id", "serial_number", "inventory_number", "room"}
+
+    def test_selects_fields_of_expanded_objects(self, api_client, devices):
+        url = reverse("inventory:device-detail", args=[devices[0].pk])
+
+        response = api_client.get(url, {"fields": "id,room.room_number,room.building", "expand": "room.building"})
+
+        assert response.data == {
+            "id": devices[0].pk,
+            "room": {"room_number": "127", "building": response.data["room"]["building"]},
+        }
+        assert response.data["room"]["building"]["name"] == "D-10"
+
+    @pytest.mark.parametrize(
+        ("params", "error"),
+        [
+            ({"fields": "id,number"}, {"fields": ["Field number does not exist."]}),
+            ({"omit": "room.room_number"}, {"fields": ["Expand room to select its fields."]}),
+            ({"fields": "room.number", "expand": "room"}, {"fields": ["Field room.number does not exist."]}),
+        ],
+    )
+    def test_rejects_invalid_fields(self, api_client, devices, params, error):
+        response = api_client.get(reverse("inventory:device-list"), params)
+
+        assert response.status_code == 400
+        assert response.data == error
+
+
+@pytest.mark.django_db
+class TestBulk:
+    @staticmethod
+    def device_data(device, number):
+        return {
+            "model": device.device_model_id,
+            "room": device.room_id,
+            "owner": device.owner_id,
+            "inventory_number": f"INV/{number}",
+        }
+
+    def test_creates_devices(self, api_client, devices, django_assert_max_num_queries):
+        data = [self.device_data(devices[0], number) for number in range(100, 150)]
+
+        # a lookup per relation, one insert and the response, independent of the number of devices
+        with django_assert_max_num_queries(8):
+            response = api_client.post(reverse("inventory:device-bulk"), data, format="json")
+
+        assert response.status_code == 201
+        assert [device["inventory_number"] for device in response.data] == [item["inventory_number"] for item in data]
+        assert Device.objects.filter(inventory_number__in=[item["inventory_number"] for item in data]).count() == 50
+
+    def test_reports_errors_per_item(self, api_client, devices):
+        data = [self.device_data(devices[0], 100), {**self.device_data(devices[0], 101), "room": 9999}]
+
+        response = api_client.post(reverse("inventory:device-bulk"), data, format="json")
+
+        assert response.status_code == 400
+        assert response.data == [{}, {"room": ['Invalid pk "9999" - object does not exist.']}]
+        assert not Device.objects.filter(inventory_number="INV/100").exists()
+
+    def test_updates_devices(self, api_client, devices):
+        room = Room.objects.create(room_number="128", building=devices[0].room.building)
+        data = [{"id": device.pk, "room": room.pk} for device in devices[:2]]
+
+        response = api_client.patch(reverse("inventory:device-bulk"), data, format="json")
+
+        assert response.status_code == 200
+        assert [device["room"] for device in response.data] == [room.pk, room.pk]
+        for device in devices[:2]:
+            updated = Device.objects.get(pk=device.pk)
+            assert updated.room == room
+            # labels and previews are cached per device version
+            assert updated.updated_at > device.updated_at
+        assert Device.objects.get(pk=devices[2].pk).room == devices[2].room
+
+    def test_rejects_unknown_and_repeated_ids(self, api_client, devices):
+        data = [{"id": devices[0].pk}, {"id": 9999}, {"id": devices[0].pk}]
+
+        response = api_client.patch(reverse("inventory:device-bulk"), data, format="json")
+
+        assert response.status_code == 400
+        assert response.data == [
+            {},
+            {"id": ["Object with this id does not exist."]},
+            {"id": ["Object is updated more than once."]},
+        ]
+
+    def test_deletes_devices(self, api_client, devices):
+        url = reverse("inventory:device-bulk")
+
+        response = api_client.delete(url, {"ids": [devices[0].pk, 9999]}, format="json")
+        assert response.status_code == 400
+        assert Device.objects.count() == len(devices)
+
+        response = api_client.delete(url, {"ids": [devices[0].pk, devices[1].pk]}, format="json")
+        assert response.status_code == 204
+        assert list(Device.objects.values_list("pk", flat=True)) == [devices[2].pk]
+
+    def test_devices_are_rented_once(self, api_client, devices):
+        url = reverse("inventory:devicerental-bulk")
+        rental = DeviceRental.objects.create(device=devices[0], borrower=devices[0].owner)
+        data = [
+            {"device": devices[0].pk, "borrower": devices[0].owner_id},
+            {"device": devices[1].pk, "borrower": devices[0].owner_id},
+            {"device": devices[1].pk, "borrower": devices[0].owner_id},
+            {"device": devices[2].pk, "borrower": devices[0].owner_id, "return_date": "2024-05-01"},
+        ]
+
+        response = api_client.post(url, data, format="json")
+
+        assert response.status_code == 400
+        already_rented = {"device": ["Device is already rented"]}
+        assert response.data == [already_rented, already_rented, already_rented, {}]
+
+        response = api_client.patch(url, [{"id": rental.pk, "return_date": "2024-05-01"}], format="json")
+        assert response.status_code == 200
+        response = api_client.post(url, data[1:2], format="json")
+        assert response.status_code == 201
+
+    def test_created_rentals_need_device_and_borrower(self, api_client, devices):
+        data = [{"borrower": devices[0].owner_id}, {"device": devices[1].pk}]
+
+        response = api_client.post(reverse("inventory:devicerental-bulk"), data, format="json")
+
+        assert response.status_code == 400
+        assert response.data == [{"device": ["This field is required."]}, {"borrower": ["This field is required."]}]
+        assert not DeviceRental.objects.exists()
+
+
+@pytest.mark.django_db
+class TestExport:
+    def test_streams_ndjson(self, api_client, devices):
+        response = api_client.get(reverse("inventory:device-export"), {"format": "ndjson"})
+
+        assert response.status_code == 200
+        assert response.streaming
+        assert response["Content-Type"] == "application/x-ndjson; charset=utf-8"
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        assert [row["inventory_number"] for row in rows] == ["INV/0", "INV/1", "INV/2"]
+        assert rows[0]["building"] == "D-10"
+        assert rows[0]["owner"] == "jkowalski"
+
+    def test_streams_csv(self, api_client, devices):
+        rental = DeviceRental.objects.create(device=devices[0], borrower=devices[0].owner)
+        rental.refresh_from_db()
+
+        response = api_client.get(reverse("inventory:devicerental-export"), {"format": "csv"})
+
+        assert response["Content-Disposition"] == 'attachment; filename="device_rentals.csv"'
+        header, row = csv.reader(io.StringIO(b"".join(response.streaming_content).decode()))
+        assert header[:7] == [
+            "id",
+            "device",
+            "inventory_number",
+            "serial_number",
+            "borrower",
+            "rental_date",
+            "return_date",
+        ]
+        assert row[:7] == [str(rental.pk), str(devices[0].pk), "INV/0", "SN0", "jkowalski", str(rental.rental_date), ""]
+
+    def test_reads_rows_in_batches(self, api_client, devices, settings):
+        settings.API_EXPORT_CHUNK_SIZE = 2
+        response = api_client.get(reverse("inventory:device-export"), {"format": "csv"})
+
+        with CaptureQueriesContext(connection) as queries:
+            lines = b"".join(response.streaming_content).splitlines()
+
+        assert len(lines) == len(devices) + 1
+        batches = [query["sql"] for query in queries if "inventory_device" in query["sql"]]
+        # the second batch continues after the last id of the first one
+        assert len(batches) == 2
+        assert not any("OFFSET" in sql for sql in batches)
+
+
+@pytest.mark.django_db
+class TestDeviceResolve:
+    def test_resolves_compact_payload(self, api_client, devices):
+        response = api_client.get(reverse("inventory:device-resolve"), {"code": encode_compact_payload(devices[1].pk)})
+
+        assert response.status_code == 200
+        assert response.data["id"] == devices[1].pk
+
+    def test_rejects_invalid_payload(self, api_client, devices):
+        response = api_client.get(reverse("inventory:device-resolve"), {"code": "DM1-1-0"})
+
+        assert response.status_code == 400
+        assert "code" in response.data
+
+
+@pytest.mark.django_db
+class TestLabelJobs:
+    @pytest.fixture(autouse=True)
+    def media_root(self, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+
+    def test_async_job_lifecycle(self, api_client, devices):
+        ids = ",".join(str(device.pk) for device in devices)
+        response = api_client.get(reverse("inventory:qr-generate"), {"ids": ids, "mode": "async"})
+
+        assert response.status_code == 202
+        job_id = response.data["id"]
+        assert response.data["status"] == LabelJob.Status.PENDING
+        assert response.data["download_url"] is None
+
+        download_url = reverse("inventory:labeljob-download", kwargs={"pk": job_id})
+        assert api_client.get(download_url).status_code == 409
+
+        call_command("label_worker", "--once", stdout=io.StringIO())
+
+        response = api_client.get(response["Location"])
+        assert response.data["status"] == LabelJob.Status.DONE
+        assert response.data["pages_rendered"] == response.data["pages_total"] == len(devices)
+
+        response = api_client.get(download_url)
+        assert response.status_code == 200
+        assert b"".join(response.streaming_content).startswith(b"%PDF")
+
+    def test_jobs_are_visible_to_their_owner_only(self, api_client, devices):
+        job = LabelJob.objects.create(requested_by=User.objects.create(username="other"))
+
+        response = api_client.get(reverse("inventory:labeljob-detail", kwargs={"pk": job.pk}))
+        assert response.status_code == 200
+
+        regular = User.objects.create(username="regular")
+        regular.user_permissions.add(Permission.objects.get(codename="view_labeljob"))
+        api_client.force_authenticate(regular)
+        response = api_client.get(reverse("inventory:labeljob-detail", kwargs={"pk": job.pk}))
+        assert response.status_code == 404
+
+    def test_jobs_require_view_permission(self, api_client):
+        job = LabelJob.objects.create(requested_by=User.objects.create(username="regular"))
+
+        api_client.force_authenticate(job.requested_by)
+        response = api_client.get(reverse("inventory:labeljob-detail", kwargs={"pk": job.pk}))
+        assert response.status_code == 403
+
+    def test_stale_jobs_are_requeued(self, settings):
+        settings.LABEL_JOB_CLAIM_TIMEOUT = timedelta(minutes=10)
+        stale = LabelJob.objects.create()
+        active = LabelJob.objects.create()
+        assert claim_next_job() == stale
+        assert claim_next_job() == active
+        LabelJob.objects.filter(pk=stale.pk).update(updated_at=timezone.now() - timedelta(minutes=11))
+
+        assert requeue_stale_jobs() == 1
+        stale.refresh_from_db()
+        assert stale.status == LabelJob.Status.PENDING
+        assert stale.started_at is None
+        assert claim_next_job() == stale
+
+    def test_expired_jobs_are_deleted(self, settings):
+        settings.LABEL_JOB_RETENTION = timedelta(hours=1)
+        long_ago = timezone.now() - timedelta(hours=2)
+        LabelJob.objects.create(status=LabelJob.Status.DONE, finished_at=long_ago)
+        LabelJob.objects.create(status=LabelJob.Status.FAILED, finished_at=long_ago)
+        recent = LabelJob.objects.create(status=LabelJob.Status.DONE, finished_at=timezone.now())
+
+        assert delete_expired_jobs() == 2
+        assert list(LabelJob.objects.all()) == [recent]
+
+    def test_old_unfinished_jobs_are_kept(self, settings):
+        settings.LABEL_JOB_RETENTION = timedelta(hours=1)
+        running = LabelJob.objects.create(status=LabelJob.Status.RUNNING, started_at=timezone.now())
+        pending = LabelJob.objects.create()
+        LabelJob.objects.update(created_at=timezone.now() - timedelta(hours=2))
+
+        assert delete_expired_jobs() == 0
+        assert set(LabelJob.objects.all()) == {running, pending}
+
+    def test_expired_selections_of_queued_jobs_are_kept(self, settings):
+        settings.DEVICE_SELECTION_RETENTION = timedelta(hours=1)
+        queued, finished, unused = (DeviceSelection.objects.create() for _ in range(3))
+        DeviceSelection.objects.update(created_at=timezone.now() - timedelta(hours=2))
+        LabelJob.objects.create(selection={"selection": str(queued.pk)})
+        LabelJob.objects.create(selection={"selection": str(finished.pk)}, status=LabelJob.Status.DONE)
+
+        assert delete_expired_selections() == 2
+        assert list(DeviceSelection.objects.all()) == [queued]
@@ -0,0 +1,66 @@
+import pytest
+from django.contrib import admin
+
+from devicemanager.inventory.admin import QRCodeGenerationConfigAdmin
+from devicemanager.inventory.models import QRCodeGenerationConfig, active_configuration
+
+
+@pytest.fixture(autouse=True)
+def shared_cache(settings):
+    settings.CACHES = {
+        **settings.CACHES,
+        "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "test-shared"},
+    }
+    # forget values cached by earlier tests, their database rows are gone
+    active_configuration.invalidate()
+
+
+@pytest.mark.django_db
+class TestCachedActiveConfiguration:
+    @staticmethod
+    def cache_config_with_font_size(font_size: int) -> QRCodeGenerationConfig:
+        # the database may reuse the primary key of a deleted row, so configs are told apart by a field
+        QRCodeGenerationConfig.objects.filter(pk=QRCodeGenerationConfig.get_active_configuration().pk).update(
+            font_size=font_size
+        )
+        return QRCodeGenerationConfig.get_cached_active_configuration()
+
+    def test_second_read_makes_no_queries(self, django_assert_num_queries):
+        QRCodeGenerationConfig.get_cached_active_configuration()
+
+        with django_assert_num_queries(0):
+            QRCodeGenerationConfig.get_cached_active_configuration()
+
+    def test_returns_a_copy(self):
+        config = QRCodeGenerationConfig.get_cached_active_configuration()
+        config.font_size = 99
+
+        assert QRCodeGenerationConfig.get_cached_active_configuration().font_size != 99
+
+    def test_save_reloads_after_commit(self, django_capture_on_commit_callbacks):
+        config = QRCodeGenerationConfig.get_active_configuration()
+        QRCodeGenerationConfig.get_cached_active_configuration()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            config.font_size = 21
+            config.save()
+            assert QRCodeGenerationConfig.get_cached_active_configuration().font_size != 21
+
+        assert QRCodeGenerationConfig.get_cached_active_configuration().font_size == 21
+
+    def test_delete_reloads(self, django_capture_on_commit_callbacks):
+        deleted = self.cache_config_with_font_size(33)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            QRCodeGenerationConfig.objects.get(pk=deleted.pk).delete()
+
+        assert QRCodeGenerationConfig.get_cached_active_configuration().font_size != 33
+
+    def test_admin_bulk_delete_reloads(self, django_capture_on_commit_callbacks):
+        deleted = self.cache_config_with_font_size(33)
+        model_admin = QRCodeGenerationConfigAdmin(QRCodeGenerationConfig, admin.site)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            model_admin.delete_queryset(None, QRCodeGenerationConfig.objects.filter(pk=deleted.pk))
+
+        assert QRCodeGenerationConfig.get_cached_active_configuration().font_size != 33
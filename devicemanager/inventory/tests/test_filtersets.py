@@ -0,0 +1,216 @@
+import json
+import re
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from devicemanager.inventory.filtersets import (
+    DeviceFilterSet,
+    DeviceRentalFilterSet,
+    RoomFilterSet,
+)
+from devicemanager.inventory.models import (
+    Building,
+    Device,
+    DeviceModel,
+    DeviceRental,
+    DeviceType,
+    Faculty,
+    Manufacturer,
+    Room,
+)
+from devicemanager.users.models import User
+
+
+def get_full_scans(queryset) -> set[str]:
+    """Return the tables the database reads in full, rather than through an index, to evaluate ``queryset``."""
+    if connection.vendor == "sqlite":
+        # e.g. "SCAN inventory_device" or "SEARCH inventory_device USING INDEX ... (room_id=?)"
+        return set(re.findall(r"\bSCAN (\w+)", queryset.explain()))
+    if connection.vendor == "mysql":
+        return {
+            table["table_name"]
+            for table in _iterate_explained_tables(json.loads(queryset.explain(format="json")))
+            if table.get("access_type") in ("ALL", "index")
+        }
+    pytest.skip(f"EXPLAIN output of {connection.vendor} is not parsed")
+
+
+def _iterate_explained_tables(node):
+    if isinstance(node, dict):
+        if "table_name" in node:
+            yield node
+        for value in node.values():
+            yield from _iterate_explained_tables(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _iterate_explained_tables(value)
+
+
+@pytest.fixture
+def inventory():
+    """Enough rows that the query planner prefers an index over reading a table in full."""
+    faculties = Faculty.objects.bulk_create(Faculty(full_name=f"Faculty {n}", short_name=f"F{n}") for n in range(2))
+    buildings = Building.objects.bulk_create(Building(name=f"B-{n}", faculty=faculties[n % 2]) for n in range(4))
+    rooms = Room.objects.bulk_create(Room(room_number=f"{100 + n}", building=buildings[n % 4]) for n in range(40))
+    device_types = DeviceType.objects.bulk_create(DeviceType(name=f"Type {n}", short_name=f"T{n}") for n in range(3))
+    manufacturers = Manufacturer.objects.bulk_create(Manufacturer(name=f"Manufacturer {n}") for n in range(3))
+    device_models = DeviceModel.objects.bulk_create(
+        DeviceModel(name=f"Model {n}", device_type=device_types[n % 3], manufacturer=manufacturers[n % 3])
+        for n in range(6)
+    )
+    users = User.objects.bulk_create(User(username=f"user{n}") for n in range(20))
+    rooms[0].occupants.set(users[:2])
+    devices = Device.objects.bulk_create(
+        Device(
+            device_model=device_models[n % 6],
+            room=rooms[n % 40],
+            owner=users[n % 20],
+            inventory_number=f"WFiIS/{n:06}/2024",
+            serial_number=f"SN{n:06}",
+        )
+        for n in range(400)
+    )
+    start = date(2024, 1, 1)
+    DeviceRental.objects.bulk_create(
+        DeviceRental(
+            device=device,
+            borrower=users[n % 20],
+            rental_date=start + timedelta(days=n),
+            # only the last rentals are still open
+            return_date=start + timedelta(days=n + 7) if n < 390 else None,
+        )
+        for n, device in enumerate(devices)
+    )
+    if connection.vendor == "mysql":
+        with connection.cursor() as cursor:
+            for model in (Faculty, Building, Room, Device, DeviceModel, DeviceRental, User, Room.occupants.through):
+                cursor.execute(f"ANALYZE TABLE {connection.ops.quote_name(model._meta.db_table)}")
+    return {"room": rooms[0], "user": users[0], "device": devices[0]}
+
+
+@pytest.mark.django_db
+class TestFilters:
+    def test_filters_devices(self, api_client, devices):
+        other_room = Room.objects.create(room_number="128", building=devices[0].room.building)
+        Device.objects.filter(pk=devices[2].pk).update(room=other_room)
+        DeviceRental.objects.create(device=devices[0], borrower=devices[0].owner)
+        url = reverse("inventory:device-list")
+
+        def filtered(**params):
+            return [device["id"] for device in api_client.get(url, params).data["results"]]
+
+        assert filtered(room=f"{devices[0].room_id},{other_room.pk}") == [device.pk for device in devices]
+        assert filtered(room=other_room.pk) == [devices[2].pk]
+        assert filtered(faculty=devices[0].room.building.faculty_id, is_rented=False) == [devices[1].pk, devices[2].pk]
+        assert filtered(is_rented=True) == [devices[0].pk]
+        assert filtered(inventory_number="inv/1") == [devices[1].pk]
+        assert filtered(manufacturer=devices[0].device_model.manufacturer_id, serial_number="SN2") == [devices[2].pk]
+
+    def test_filters_rentals(self, api_client, devices):
+        rentals = [
+            DeviceRental.objects.create(
+                device=device,
+                borrower=device.owner,
+                rental_date=date(2024, 5, day),
+                return_date=date(2024, 6, 1) if day < 3 else None,
+            )
+            for day, device in enumerate(devices, start=1)
+        ]
+        url = reverse("inventory:devicerental-list")
+
+        def filtered(**params):
+            return [rental["id"] for rental in api_client.get(url, params).data["results"]]
+
+        assert filtered(rental_date_after="2024-05-02", rental_date_before="2024-05-03") == [
+            rentals[2].pk,
+            rentals[1].pk,
+        ]
+        assert filtered(is_open=True) == [rentals[2].pk]
+        assert filtered(device=devices[0].pk, borrower=devices[0].owner_id) == [rentals[0].pk]
+        # oldest first, equal dates are ordered by id
+        assert filtered(ordering="rental_date") == [rental.pk for rental in rentals]
+
+    def test_filters_rooms(self, api_client, devices):
+        room = devices[0].room
+        room.occupants.add(devices[0].owner, User.objects.create(username="anowak"))
+        Room.objects.create(room_number="128", building=room.building)
+
+        response = api_client.get(
+            reverse("inventory:room-list"),
+            {"occupant": ",".join(map(str, room.occupants.values_list("pk", flat=True)))},
+        )
+
+        assert [room["id"] for room in response.data["results"]] == [room.pk]
+
+    def test_rejects_unknown_ordering(self, api_client, devices):
+        response = api_client.get(reverse("inventory:device-list"), {"ordering": "serial_number"})
+
+        # unsupported orderings are ignored, they would not be backed by an index
+        assert [device["id"] for device in response.data["results"]] == [device.pk for device in devices]
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize(
+    ("filterset_class", "ordering", "get_params", "table"),
+    [
+        (DeviceFilterSet, "pk", lambda room, **_: {"room": room.pk}, "inventory_device"),
+        (DeviceFilterSet, "pk", lambda room, **_: {"building": room.building_id}, "inventory_device"),
+        (DeviceFilterSet, "pk", lambda room, **_: {"faculty": room.building.faculty_id}, "inventory_device"),
+        (DeviceFilterSet, "pk", lambda user, **_: {"owner": user.pk}, "inventory_device"),
+        (
+            DeviceFilterSet,
+            "pk",
+            lambda device, **_: {"device_type": device.device_model.device_type_id},
+            "inventory_device",
+        ),
+        (
+            DeviceFilterSet,
+            "pk",
+            lambda device, **_: {"manufacturer": device.device_model.manufacturer_id},
+            "inventory_device",
+        ),
+        (DeviceFilterSet, "pk", lambda device, **_: {"device_model": device.device_model_id}, "inventory_device"),
+        # every device is checked, each with an index lookup of its open rental
+        (DeviceFilterSet, "pk", lambda **_: {"is_rented": True}, "inventory_devicerental"),
+        (DeviceFilterSet, "pk", lambda **_: {"inventory_number": "WFiIS/00001"}, "inventory_device"),
+        (DeviceFilterSet, "pk", lambda **_: {"serial_number": "SN00001"}, "inventory_device"),
+        (DeviceRentalFilterSet, "-pk", lambda device, **_: {"device": device.pk}, "inventory_devicerental"),
+        (DeviceRentalFilterSet, "-pk", lambda user, **_: {"borrower": user.pk}, "inventory_devicerental"),
+        (
+            DeviceRentalFilterSet,
+            "-rental_date",
+            lambda user, **_: {"borrower": user.pk, "rental_date_after": "2024-06-01"},
+            "inventory_devicerental",
+        ),
+        (
+            DeviceRentalFilterSet,
+            "-pk",
+            lambda **_: {"rental_date_after": "2024-06-01", "rental_date_before": "2024-06-07"},
+            "inventory_devicerental",
+        ),
+        (
+            DeviceRentalFilterSet,
+            "-pk",
+            lambda **_: {"return_date_after": "2024-06-01", "return_date_before": "2024-06-07"},
+            "inventory_devicerental",
+        ),
+        (DeviceRentalFilterSet, "-pk", lambda **_: {"is_open": True}, "inventory_devicerental"),
+        (RoomFilterSet, "pk", lambda room, **_: {"building": room.building_id}, "inventory_room"),
+        (RoomFilterSet, "pk", lambda room, **_: {"faculty": room.building.faculty_id}, "inventory_room"),
+        (RoomFilterSet, "pk", lambda user, **_: {"occupant": user.pk}, "inventory_room"),
+    ],
+)
+def test_filters_use_indexes(inventory, filterset_class, ordering, get_params, table):
+    params = {name: str(value) for name, value in get_params(**inventory).items()}
+    if connection.vendor == "sqlite" and {"inventory_number", "serial_number"} & params.keys():
+        pytest.skip("SQLite only uses indexes for LIKE on columns with the NOCASE collation")
+    model = filterset_class.Meta.model
+    filterset = filterset_class(params, queryset=model.objects.all())
+    assert filterset.is_valid(), filterset.errors
+
+    queryset = filterset.qs.order_by(ordering)[:100]
+
+    assert table not in get_full_scans(queryset)
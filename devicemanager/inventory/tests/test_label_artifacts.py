@@ -0,0 +1,140 @@
+import io
+import os
+import threading
+import time
+
+import pytest
+
+from devicemanager.inventory import label_artifacts
+from devicemanager.inventory.label_artifacts import LabelArtifactStore, get_label_etag
+from devicemanager.inventory.models import Device, QRCodeGenerationConfig
+
+
+class CountingRenderer:
+    def __init__(self, content: bytes = b"%PDF", delay: float = 0):
+        self.content = content
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return io.BytesIO(self.content)
+
+
+def test_store_renders_each_key_once():
+    store = LabelArtifactStore()
+    render = CountingRenderer()
+
+    for _ in range(2):
+        with store.get_or_render("labels", render) as artifact:
+            assert artifact.read() == b"%PDF"
+    assert render.calls == 1
+
+
+def test_concurrent_requests_share_one_rendering():
+    store = LabelArtifactStore()
+    render = CountingRenderer(delay=0.2)
+    results = []
+
+    def request():
+        with store.get_or_render("labels", render) as artifact:
+            results.append(artifact.read())
+
+    threads = [threading.Thread(target=request) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [b"%PDF"] * 4
+    assert render.calls == 1
+
+
+def test_failed_rendering_stores_nothing(label_artifact_dir):
+    store = LabelArtifactStore()
+
+    def render():
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        store.get_or_render("labels", render)
+    assert sorted(os.listdir(label_artifact_dir)) == ["labels.lock"]
+
+
+def test_least_recently_used_documents_are_evicted(settings, label_artifact_dir):
+    settings.LABEL_ARTIFACT_STORE_MAX_SIZE = 10
+    store = LabelArtifactStore()
+    for key in ("first", "second"):
+        store.get_or_render(key, CountingRenderer(b"12345")).close()
+    os.utime(label_artifact_dir / "first", (0, 0))
+    os.utime(label_artifact_dir / "second", (1, 1))
+    store.get_or_render("first", CountingRenderer()).close()
+
+    store.get_or_render("third", CountingRenderer(b"12345")).close()
+
+    assert not (label_artifact_dir / "second").exists()
+    assert (label_artifact_dir / "first").exists()
+    assert (label_artifact_dir / "third").exists()
+
+
+def test_documents_in_use_are_not_evicted(settings, label_artifact_dir):
+    settings.LABEL_ARTIFACT_STORE_MAX_SIZE = 10
+    store = LabelArtifactStore()
+    store.get_or_render("first", CountingRenderer(b"12345")).close()
+    os.utime(label_artifact_dir / "first", (0, 0))
+
+    with store._lock(label_artifact_dir / "first"):
+        store.get_or_render("second", CountingRenderer(b"123456")).close()
+
+    # the least recently used document was locked, the next one is evicted instead
+    assert sorted(os.listdir(label_artifact_dir)) == ["first", "first.lock"]
+
+
+def test_requests_waiting_for_an_evicted_document_render_it_once(label_artifact_dir):
+    store = LabelArtifactStore()
+    render = CountingRenderer(delay=0.1)
+    results = []
+    label_artifact_dir.mkdir(parents=True)
+
+    def request():
+        with store.get_or_render("labels", render) as artifact:
+            results.append(artifact.read())
+
+    with store._lock(label_artifact_dir / "labels"):
+        waiting = [threading.Thread(target=request) for _ in range(2)]
+        for thread in waiting:
+            thread.start()
+        time.sleep(0.1)
+        # as evict() does while holding the lock
+        (label_artifact_dir / "labels.lock").unlink()
+        arriving = threading.Thread(target=request)
+        arriving.start()
+    for thread in (*waiting, arriving):
+        thread.join()
+
+    assert results == [b"%PDF"] * 3
+    assert render.calls == 1
+
+
+@pytest.mark.django_db
+def test_etag_follows_printed_rows(devices, django_assert_num_queries, monkeypatch):
+    config = QRCodeGenerationConfig(qr_renderer="vector")
+    queryset = Device.objects.order_by("pk")
+    with django_assert_num_queries(1):
+        etag = get_label_etag(config, queryset, "pdf")
+
+    assert get_label_etag(config, queryset, "pdf") == etag
+    assert get_label_etag(config, queryset, "zpl") != etag
+    assert get_label_etag(config, queryset.exclude(pk=devices[0].pk), "pdf") != etag
+    config.font_size += 1
+    assert get_label_etag(config, queryset, "pdf") != etag
+    config.font_size -= 1
+
+    monkeypatch.setattr(label_artifacts, "LABEL_RENDER_VERSION", label_artifacts.LABEL_RENDER_VERSION + 1)
+    assert get_label_etag(config, queryset, "pdf") != etag
+    monkeypatch.undo()
+
+    devices[0].room.building.name = "D-11"
+    devices[0].room.building.save()
+    assert get_label_etag(config, queryset, "pdf") != etag
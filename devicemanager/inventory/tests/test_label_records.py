@@ -0,0 +1,65 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from devicemanager.inventory.factories import DeviceFactory
+from devicemanager.inventory.label_records import LabelRecord, iterate_label_records
+from devicemanager.inventory.models import Device
+
+
+@pytest.mark.django_db
+def test_records_hold_printed_values(devices):
+    device = devices[0]
+    device.owner.first_name = "Jan"
+    device.owner.last_name = ""
+    device.owner.save()
+
+    records = list(iterate_label_records(Device.objects.order_by("pk")))
+
+    assert records[0] == LabelRecord(
+        id=device.pk,
+        building="D-10",
+        room_number="127",
+        owner_name="Jan",
+        inventory_number="INV/0",
+        serial_number="SN0",
+        manufacturer="Dell",
+        model_name="Latitude",
+    )
+    assert records == [LabelRecord.from_device(device) for device in Device.objects.order_by("pk")]
+
+
+@pytest.mark.django_db
+def test_records_of_devices_without_room_or_owner(devices):
+    Device.objects.filter(pk=devices[0].pk).update(room=None, owner=None)
+
+    record = next(iterate_label_records(Device.objects.filter(pk=devices[0].pk)))
+
+    assert (record.building, record.room_number, record.owner_name) == (None, None, "")
+
+
+@pytest.mark.django_db
+def test_records_are_fetched_with_one_query(devices, django_assert_num_queries):
+    DeviceFactory.create_batch(20)
+
+    with django_assert_num_queries(1):
+        records = list(iterate_label_records(Device.objects.order_by("pk")))
+    assert len(records) == 23
+
+
+@pytest.mark.django_db
+def test_label_requests_run_a_constant_number_of_queries(api_client, devices):
+    def count_queries(device_ids) -> int:
+        params = {"ids": ",".join(map(str, device_ids)), "qr_renderer": "vector"}
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(reverse("inventory:qr-generate"), params)
+            assert response.status_code == 200
+        return len(queries)
+
+    # the first request also loads the active configuration
+    count_queries([devices[0].pk])
+    queries = count_queries(device.pk for device in devices)
+    # every device brings a room, owner and model of its own
+    more_devices = DeviceFactory.create_batch(10)
+    assert count_queries(device.pk for device in devices + more_devices) == queries
@@ -0,0 +1,75 @@
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+
+import pytest
+from pypdf import PdfReader
+
+from devicemanager.inventory.label_records import iterate_label_records
+from devicemanager.inventory.label_rendering import render_labels_in_parallel
+from devicemanager.inventory.models import Device, QRCodeGenerationConfig
+
+
+@pytest.mark.django_db
+def test_parallel_rendering_keeps_device_order(devices):
+    config = QRCodeGenerationConfig(qr_renderer="vector")
+    records = list(iterate_label_records(Device.objects.order_by("-pk")))
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pdf = render_labels_in_parallel(config, records, count=len(records), executor=executor, workers=2)
+
+    pages = PdfReader(pdf).pages
+    assert len(pages) == len(devices)
+    for page, record in zip(pages, records):
+        assert record.inventory_number in page.extract_text()
+
+
+@pytest.mark.django_db
+def test_parallel_rendering_fills_sheets(devices):
+    config = QRCodeGenerationConfig(qr_renderer="vector", layout="sheet", sheet_rows=1, sheet_columns=2)
+    records = iterate_label_records(Device.objects.order_by("pk"))
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pdf = render_labels_in_parallel(config, records, count=len(devices), executor=executor, workers=2)
+
+    pages = PdfReader(pdf).pages
+    assert len(pages) == 2
+    assert devices[1].inventory_number in pages[0].extract_text()
+
+
+class SynchronousExecutor(Executor):
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        self.submitted += 1
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+@pytest.mark.django_db
+def test_parallel_rendering_submits_chunks_lazily(devices, settings):
+    settings.LABEL_PARALLEL_CHUNK_SIZE = 1
+    for number in range(3, 6):
+        Device.objects.create(
+            device_model=devices[0].device_model,
+            room=devices[0].room,
+            owner=devices[0].owner,
+            inventory_number=f"INV/{number}",
+            serial_number=f"SN{number}",
+        )
+    config = QRCodeGenerationConfig(qr_renderer="vector")
+    executor = SynchronousExecutor()
+    submitted_at_progress = []
+
+    pdf = render_labels_in_parallel(
+        config,
+        iterate_label_records(Device.objects.order_by("pk")),
+        count=6,
+        executor=executor,
+        workers=1,
+        progress=lambda rendered: submitted_at_progress.append((rendered, executor.submitted)),
+    )
+
+    assert len(PdfReader(pdf).pages) == 6
+    # two chunks per worker are in flight, the next one is submitted once a chunk is merged
+    assert submitted_at_progress == [(1, 3), (2, 4), (3, 5), (4, 6), (5, 6), (6, 6)]
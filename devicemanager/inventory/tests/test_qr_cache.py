@@ -0,0 +1,59 @@
+from devicemanager.inventory.qr_cache import QRCodeImageCache
+
+
+class TestQRCodeImageCache:
+    def make_key(self, data=b"data", size=100, fill_color="#000000", background_color="#FFFFFF"):
+        return QRCodeImageCache.make_key(
+            data, size=size, fill_color=fill_color, background_color=background_color, error_correction=1
+        )
+
+    def test_key_depends_on_render_parameters(self):
+        key = self.make_key()
+        assert key == self.make_key()
+        assert key != self.make_key(data=b"other")
+        assert key != self.make_key(size=101)
+        assert key != self.make_key(fill_color="#FF0000")
+        assert key != self.make_key(background_color="#00FF00")
+
+    def test_key_ignores_color_case(self):
+        assert self.make_key(fill_color="#ff0000") == self.make_key(fill_color="#FF0000")
+
+    def test_get_or_render_renders_once(self):
+        cache = QRCodeImageCache(disk_cache_alias=None)
+        calls = []
+
+        def render():
+            calls.append(1)
+            return b"png"
+
+        assert cache.get_or_render("key", render) == b"png"
+        assert cache.get_or_render("key", render) == b"png"
+        assert len(calls) == 1
+        assert cache.stats.misses == 1
+        assert cache.stats.memory_hits == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = QRCodeImageCache(max_entries=2, disk_cache_alias=None)
+        cache.set("a", b"a")
+        cache.set("b", b"b")
+        cache.get("a")
+        cache.set("c", b"c")
+
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") == b"a"
+        assert cache.get("c") == b"c"
+
+    def test_falls_back_to_disk_tier(self, settings):
+        settings.CACHES = {
+            **settings.CACHES,
+            "qr_codes_test": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        }
+        writer = QRCodeImageCache(disk_cache_alias="qr_codes_test")
+        writer.set("key", b"png")
+
+        reader = QRCodeImageCache(disk_cache_alias="qr_codes_test")
+        assert reader.get("key") == b"png"
+        assert reader.stats.disk_hits == 1
+        assert reader.get("key") == b"png"
+        assert reader.stats.memory_hits == 1
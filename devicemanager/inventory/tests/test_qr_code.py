@@ -0,0 +1,115 @@
+import io
+import re
+from itertools import batched
+
+import pytest
+from PIL import Image
+from pypdf import PdfReader
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from devicemanager.inventory.factories import build_sample_records
+from devicemanager.inventory.models import QRCodeGenerationConfig
+from devicemanager.inventory.qr_code import (
+    FONT_FILES,
+    DeviceQRCodeGenerator,
+    get_font_metrics,
+    render_qr_code_png,
+)
+
+RECTANGLE = re.compile(rb"([\d.]+) ([\d.]+) ([\d.]+) ([\d.]+) re")
+
+
+@pytest.mark.parametrize("font_name", FONT_FILES)
+def test_font_metrics_match_reportlab(font_name):
+    metrics = get_font_metrics(font_name)
+
+    for text in ("inv: ", "WFiIS/000001/2024", "Łukasz Żółć", "\u2603"):
+        assert metrics.string_width(text, 33) == stringWidth(text, font_name, 33)
+    with pytest.raises(TypeError):
+        metrics.widths[ord("a")] = 0
+
+
+def test_qr_code_png_scales_modules_by_whole_pixels():
+    matrix = [[True, False, True], [False, True, False], [True, True, False]]
+    image = Image.open(io.BytesIO(render_qr_code_png(matrix, 11, "#000000", "#FFFFFF"))).convert("L")
+
+    # 3 modules of 3 pixels, centred with a 1 pixel margin
+    assert image.size == (11, 11)
+    for y in range(11):
+        for x in range(11):
+            row, column = (y - 1) // 3, (x - 1) // 3
+            inside = 1 <= x < 10 and 1 <= y < 10
+            assert image.getpixel((x, y)) == (0 if inside and matrix[row][column] else 255)
+
+
+def test_vector_qr_code_draws_matrix_runs():
+    record = build_sample_records(1)[0]
+    generator = DeviceQRCodeGenerator.from_config(QRCodeGenerationConfig(qr_renderer="vector"))
+    generator.add_device(record)
+    content = PdfReader(generator.build()).pages[0].get_contents().get_data()
+
+    expected = generator._make_qr_code(generator.get_qr_code_data(record)).get_matrix()
+    module_size = generator.qr_size / len(expected)
+    qr_x, qr_y = generator.template.qr_x, generator.template.qr_y
+    background, *runs = [tuple(map(float, match)) for match in RECTANGLE.findall(content)]
+
+    assert background == (qr_x, qr_y, generator.qr_size, generator.qr_size)
+    drawn = [[False] * len(expected) for _ in expected]
+    for x, y, width, height in runs:
+        assert round(height / module_size) == 1
+        row = len(expected) - 1 - round((y - qr_y) / module_size)
+        start = round((x - qr_x) / module_size)
+        for column in range(start, start + round(width / module_size)):
+            assert not drawn[row][column], "runs must not overlap"
+            drawn[row][column] = True
+    assert drawn == expected
+    # adjacent dark modules are merged, so no run is followed directly by another one
+    assert len(runs) == sum(
+        1 for row in expected for column, dark in enumerate(row) if dark and (column == 0 or not row[column - 1])
+    )
+
+
+def test_long_documents_are_drawn_in_batches(settings):
+    settings.LABEL_PDF_BATCH_PAGES = 2
+    records = build_sample_records(5)
+    generator = DeviceQRCodeGenerator.from_config(QRCodeGenerationConfig(qr_renderer="vector"))
+    for record in records:
+        generator.add_device(record)
+
+    pages = PdfReader(generator.build()).pages
+    assert len(pages) == len(records)
+    for page, record in zip(pages, records):
+        assert record.inventory_number in page.extract_text()
+
+
+def test_static_label_content_is_drawn_from_one_form():
+    records = build_sample_records(4)
+    config = QRCodeGenerationConfig(qr_renderer="vector", layout="sheet", sheet_rows=1, sheet_columns=2)
+    generator = DeviceQRCodeGenerator.from_config(config)
+    for record in records:
+        generator.add_device(record)
+    pdf = generator.build().read()
+    pages = PdfReader(io.BytesIO(pdf)).pages
+
+    assert pdf.count(b"/Subtype /Form") == 1
+    form_ids = {page["/Resources"]["/XObject"].raw_get("/FormXob.label").idnum for page in pages}
+    assert len(form_ids) == 1
+    template = generator.template
+    for page, page_records in zip(pages, batched(records, 2)):
+        assert page.get_contents().get_data().count(b"/FormXob.label Do") == len(page_records)
+
+        texts = []
+
+        def visit_text(text, cm, tm, *args):
+            # positions are written to the PDF with limited precision
+            texts.append((text.strip(), (round(cm[4], 2), round(cm[5], 2)), (round(tm[4], 2), round(tm[5], 2))))
+
+        page.extract_text(visitor_text=visit_text)
+        # text of the form is reported in its own coordinates, text of a label relative to its cell
+        assert ("inv:", (0, 0), (template.text_x, template.inventory_y)) in texts
+        assert ("sn:", (0, 0), (template.text_x, template.serial_y)) in texts
+        for record, cell in zip(page_records, generator.cell_origins):
+            inventory_position = (round(template.inventory_x, 2), template.inventory_y)
+            serial_position = (round(template.serial_x, 2), template.serial_y)
+            assert (record.inventory_number, cell, inventory_position) in texts
+            assert (record.serial_number, cell, serial_position) in texts
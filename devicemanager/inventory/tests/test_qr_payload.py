@@ -0,0 +1,40 @@
+import pytest
+import qrcode
+
+from devicemanager.inventory.qr_payload import (
+    InvalidPayloadError,
+    decode_compact_payload,
+    encode_compact_payload,
+)
+
+
+@pytest.mark.parametrize("device_id", [0, 1, 35, 36, 1234, 10**9])
+def test_round_trip(device_id):
+    assert decode_compact_payload(encode_compact_payload(device_id)) == device_id
+
+
+def test_payload_uses_alphanumeric_mode():
+    qr_data = qrcode.util.QRData(encode_compact_payload(98765).encode())
+    assert qr_data.mode == qrcode.util.MODE_ALPHA_NUM
+
+
+def test_decoding_is_case_insensitive():
+    assert decode_compact_payload(encode_compact_payload(1234).lower()) == 1234
+
+
+@pytest.mark.parametrize("payload", ["", "XX1-YA-0", "DM1--0", "DM1-Y?-0", "DM1-YA"])
+def test_rejects_malformed_payloads(payload):
+    with pytest.raises(InvalidPayloadError):
+        decode_compact_payload(payload)
+
+
+def test_detects_single_character_errors():
+    payload = encode_compact_payload(1234)
+    digits = payload.split("-")[1]
+    for position in range(len(digits)):
+        for char in "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ":
+            if char == digits[position]:
+                continue
+            corrupted = digits[:position] + char + digits[position + 1 :]
+            with pytest.raises(InvalidPayloadError):
+                decode_compact_payload(payload.replace(digits, corrupted))
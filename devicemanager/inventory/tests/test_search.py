@@ -0,0 +1,129 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from devicemanager.inventory import search as search_module
+from devicemanager.inventory.models import (
+    Device,
+    DeviceModel,
+    DeviceSearchDocument,
+    Manufacturer,
+)
+from devicemanager.inventory.search import search_devices, tokenize, tokenize_query
+from devicemanager.users.models import User
+
+# the documents are rebuilt once a transaction commits, and MariaDB only searches committed rows
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def test_tokenize():
+    assert tokenize("WFiIS/0123/2024 Łódź") == ["wfiis01232024", "wfiis", "0123", "2024", "łodz"]
+    assert tokenize_query(" D-10, d10 łÓd ") == ["d10", "łod"]
+
+
+class TestSearch:
+    @pytest.fixture
+    def search(self, api_client):
+        def search(query, **params):
+            response = api_client.get(reverse("inventory:device-search"), {"q": query, **params})
+            assert response.status_code == 200
+            return [device["id"] for device in response.data["results"]]
+
+        return search
+
+    def test_matches_beginnings_of_words(self, search, devices):
+        assert search("dell lat") == [device.pk for device in devices]
+        assert search("inv/1") == [devices[1].pk]
+        assert search("d-10 kowal 12") == [device.pk for device in devices]
+
+    def test_matches_every_word(self, search, devices):
+        assert search("dell nowak") == []
+
+    def test_ranks_identifiers_first(self, search, devices):
+        owner = User.objects.create(username="sn2-fan")
+        other = Device.objects.create(device_model=devices[0].device_model, owner=owner, inventory_number="INV/3")
+
+        assert search("sn2") == [devices[2].pk, other.pk]
+
+    def test_matches_short_terms_outside_fulltext_index(self, search, devices, monkeypatch):
+        # MariaDB leaves tokens shorter than 3 characters out of the FULLTEXT index, e.g. the 0 of INV/0
+        monkeypatch.setattr(search_module, "uses_fulltext", lambda connection: True)
+
+        assert search("0") == [devices[0].pk]
+        assert search("12 d") == [device.pk for device in devices]
+        sql = str(search_devices(Device.objects.all(), "dell 12").query)
+        assert "AGAINST (+dell* IN BOOLEAN MODE)" in sql
+        assert "+12" not in sql
+
+    def test_applies_filters(self, search, devices):
+        Device.objects.filter(pk=devices[0].pk).update(room=None)
+
+        assert search("dell", room=devices[1].room_id) == [devices[1].pk, devices[2].pk]
+
+    def test_paginates_with_offset(self, api_client, devices):
+        response = api_client.get(reverse("inventory:device-search"), {"q": "dell", "limit": 1, "offset": 1})
+
+        assert response.data["count"] == 3
+        assert [device["id"] for device in response.data["results"]] == [devices[1].pk]
+        assert response.data["results"][0]["search_rank"] > 0
+
+    def test_rejects_query_without_words(self, api_client, devices):
+        response = api_client.get(reverse("inventory:device-search"), {"q": " / "})
+
+        assert response.status_code == 400
+        assert response.data == {"q": ["Enter words to search for."]}
+
+    def test_admin_ranks_results(self, admin_client, devices):
+        response = admin_client.get(reverse("admin:inventory_device_changelist"), {"q": "inv/2"})
+
+        assert list(response.context["cl"].result_list) == [devices[2]]
+
+
+class TestDocumentUpdates:
+    def test_follows_related_objects(self, devices):
+        Manufacturer.objects.filter(pk=devices[0].device_model.manufacturer_id).update(name="Lenovo")
+        # update() sends no signals, saving the model does
+        devices[0].device_model.manufacturer.refresh_from_db()
+        devices[0].device_model.manufacturer.save()
+
+        assert all("lenovo" in document.text for document in DeviceSearchDocument.objects.all())
+        assert not any("dell" in document.text for document in DeviceSearchDocument.objects.all())
+
+    def test_follows_deleted_relations(self, devices):
+        devices[0].room.delete()
+
+        assert Device.objects.count() == 3
+        assert not any("127" in document.text for document in DeviceSearchDocument.objects.all())
+
+    def test_deletes_documents_with_devices(self, devices):
+        DeviceModel.objects.all().delete()
+
+        assert not DeviceSearchDocument.objects.exists()
+
+    def test_ignores_unsearched_fields(self, devices, django_assert_num_queries):
+        owner = devices[0].owner
+
+        with django_assert_num_queries(1):
+            owner.save(update_fields=["last_login"])
+
+    def test_follows_bulk_writes(self, api_client, devices):
+        data = [
+            {
+                "model": devices[0].device_model_id,
+                "room": devices[0].room_id,
+                "owner": devices[0].owner_id,
+                "inventory_number": "INV/99",
+            }
+        ]
+
+        response = api_client.post(reverse("inventory:device-bulk"), data, format="json")
+
+        assert response.status_code == 201
+        assert "inv99" in DeviceSearchDocument.objects.get(pk=response.data[0]["id"]).text
+
+    def test_rebuilds_all_documents(self, devices):
+        DeviceSearchDocument.objects.all().delete()
+
+        call_command("rebuild_device_search", stdout=None)
+
+        assert DeviceSearchDocument.objects.count() == 3
@@ -0,0 +1,28 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from devicemanager.inventory.factories import build_sample_records
+from devicemanager.inventory.models import QRCodeGenerationConfig
+from devicemanager.inventory.zpl import DeviceZPLGenerator, escape_field_data
+
+GOLDEN_DIR = Path(__file__).parent / "golden"
+
+
+@pytest.mark.parametrize("dpi", [203, 300])
+def test_labels_match_golden_file(dpi):
+    """Regenerate the golden files with ``UPDATE_GOLDEN=1`` after an intended layout change."""
+    generator = DeviceZPLGenerator.from_config(QRCodeGenerationConfig(dpi=dpi))
+    for record in build_sample_records(3):
+        generator.add_device(record)
+    output = generator.build().read().decode("utf-8")
+
+    golden_file = GOLDEN_DIR / f"device_labels_{dpi}dpi.zpl"
+    if os.environ.get("UPDATE_GOLDEN"):
+        golden_file.write_text(output, encoding="utf-8")
+    assert output == golden_file.read_text(encoding="utf-8")
+
+
+def test_escape_field_data():
+    assert escape_field_data("a^b~c_d") == "a_5Eb_7Ec_5Fd"
@@ -8,8 +8,10 @@ from devicemanager.inventory.api_views import (
     DeviceTypeViewSet,
     DeviceViewSet,
     FacultyViewSet,
+    LabelJobViewSet,
     ManufacturerViewSet,
     QRCodeGenerateView,
+    QRCodePreviewView,
     RoomViewSet,
 )
 
@@ -26,5 +28,10 @@ router.register(r"device-types", DeviceTypeViewSet)
 router.register(r"device-models", DeviceModelViewSet)
 router.register(r"device-rentals", DeviceRentalViewSet)
 router.register(r"devices", DeviceViewSet)
+router.register(r"label-jobs", LabelJobViewSet)
 
-urlpatterns = [path("qr-generate/", qr_code_generate_view, name="qr-generate"), *router.urls]
+urlpatterns = [
+    path("qr-generate/", qr_code_generate_view, name="qr-generate"),
+    path("qr-preview/<int:pk>.png", QRCodePreviewView.as_view(), name="qr-preview"),
+    *router.urls,
+]
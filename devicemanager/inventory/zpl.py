@@ -0,0 +1,87 @@
+import io
+from typing import IO
+
+import qrcode
+
+from devicemanager.inventory.label_records import LabelRecord
+from devicemanager.inventory.qr_code import LabelGenerator
+
+ZPL_ERROR_CORRECTION = {
+    qrcode.constants.ERROR_CORRECT_L: "L",
+    qrcode.constants.ERROR_CORRECT_M: "M",
+    qrcode.constants.ERROR_CORRECT_Q: "Q",
+    qrcode.constants.ERROR_CORRECT_H: "H",
+}
+
+# ^BQ accepts module sizes of 1 to 10 dots
+ZPL_QR_MAX_MAGNIFICATION = 10
+
+
+def escape_field_data(value: str) -> str:
+    """Escape characters with a meaning in ZPL, for use in a field preceded by ``^FH``."""
+    return value.replace("_", "_5F").replace("^", "_5E").replace("~", "_7E")
+
+
+class DeviceZPLGenerator(LabelGenerator):
+    """
+    Generate labels as ZPL II commands for Zebra thermal printers.
+
+    QR codes and text are drawn by the printer with its built-in ``^BQ`` barcode and scalable
+    font, so a label is a few hundred bytes of text. Positions follow the same layout as the PDF
+    labels, with the configured DPI taken as the printer resolution. Colors and sheet layouts do
+    not apply to thermal printers and are ignored.
+    """
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._buffer = io.BytesIO()
+
+    def _get_qr_code_magnification(self, data: bytes) -> int:
+        qr = qrcode.QRCode(error_correction=self.error_correction, border=0)
+        qr.add_data(data)
+        modules = qr.best_fit() * 4 + 17
+        return max(1, min(self.qr_size // modules, ZPL_QR_MAX_MAGNIFICATION))
+
+    def _field(self, x: float, y: float, text: str, font_size: int) -> str:
+        """Return a text field with its baseline at ``y`` measured from the bottom of the label."""
+        return (
+            f"^FT{round(x)},{round(self.pdf_height - y)}^A0N,{font_size},{font_size}^FH^FD{escape_field_data(text)}^FS"
+        )
+
+    def add_device(self, record: LabelRecord) -> None:
+        template = self.template
+        qrcode_data = self.get_qr_code_data(record)
+        magnification = self._get_qr_code_magnification(qrcode_data)
+        error_correction = ZPL_ERROR_CORRECTION[self.error_correction]
+
+        commands = [
+            "^XA",
+            "^CI28",
+            f"^PW{self.pdf_width}",
+            f"^LL{self.pdf_height}",
+            f"^FO{template.qr_x},{self.pdf_padding}^BQN,2,{magnification}"
+            f"^FH^FD{error_correction}A,{escape_field_data(qrcode_data.decode())}^FS",
+            self._field(
+                template.text_x,
+                template.title_y,
+                f"{record.building} - {record.room_number}",
+                self.font_size_large,
+            ),
+            self._field(template.text_x, template.owner_y, record.owner_name, self.font_size),
+            self._field(template.text_x, template.inventory_y, f"{self.inv_prefix} ", self.font_size_small),
+            self._field(template.inventory_x, template.inventory_y, record.inventory_number, self.font_size),
+            self._field(
+                template.text_x,
+                template.model_y,
+                f"{record.manufacturer} - {record.model_name}",
+                self.font_size,
+            ),
+            self._field(template.text_x, template.serial_y, f"{self.sn_prefix} ", self.font_size_small),
+            self._field(template.serial_x, template.serial_y, record.serial_number, self.font_size),
+            "^XZ",
+        ]
+        self._buffer.write("\n".join(commands).encode("utf-8") + b"\n")
+
+    def build(self) -> IO[bytes]:
+        self._buffer.seek(0)
+        return self._buffer
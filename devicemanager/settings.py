@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+from datetime import timedelta
 from pathlib import Path
 
 import environ
@@ -65,6 +66,7 @@ INSTALLED_APPS = [
     "django_extensions",
     "debug_toolbar",
     "rest_framework",
+    "django_filters",
     "allauth",
     "allauth.account",
     "allauth.socialaccount",
@@ -89,7 +91,15 @@ REST_FRAMEWORK = {
     "DEFAULT_PARSER_CLASSES": [
         "rest_framework.parsers.JSONParser",
     ],
+    "DEFAULT_PAGINATION_CLASS": "devicemanager.drf_pagination.DefaultPagination",
+    "PAGE_SIZE": 100,
 }
+# Largest page clients can request with ``page_size`` or ``limit``
+API_MAX_PAGE_SIZE = 1000
+# Most items created, updated or deleted in one request to a bulk endpoint
+API_MAX_BULK_SIZE = 1000
+# Rows read per query by the streaming export endpoints
+API_EXPORT_CHUNK_SIZE = 2000
 
 SPECTACULAR_SETTINGS = {
     "TITLE": "DeviceManager",
@@ -257,6 +267,7 @@ JAZZMIN_SETTINGS = {
         "inventory.manufacturer": "fas fa-industry",
         "inventory.qrcodegenerationconfig": "fas fa-qrcode",
         "inventory.devicerental": "fas fa-scroll",
+        "inventory.labeljob": "fas fa-print",
         "inventory.room": "fas fa-door-open",
         "socialaccount.socialaccount": "fas fa-user",
         "socialaccount.socialtoken": "fas fa-key",
@@ -276,6 +287,7 @@ JAZZMIN_SETTINGS = {
         "inventory.building",
         "inventory.room",
         "inventory.qrcodegenerationconfig",
+        "inventory.labeljob",
     ],
 }
 
@@ -327,3 +339,57 @@ EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = BASE_DIR / "emails"
 MEDIA_ROOT = BASE_DIR / "build/media"
 STATIC_ROOT = BASE_DIR / "build/static"
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "qr_codes": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "build/cache/qr_codes",
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": 20000},
+    },
+    "label_previews": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "build/cache/label_previews",
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+    # Holds version stamps of values cached in each worker process. The default file based cache is only
+    # shared by processes of one host, deployments running several app containers have to point
+    # SHARED_CACHE_URL at a common backend, e.g. redis://redis:6379/1
+    "shared": {
+        **env.cache_url("SHARED_CACHE_URL", default=f"filecache://{BASE_DIR / 'build/cache/shared'}"),
+        "TIMEOUT": None,
+    },
+}
+
+# Number of rendered QR code images kept in memory by each worker
+QR_CODE_MEMORY_CACHE_SIZE = 2048
+# Size in bytes above which generated label PDFs are spooled to a temporary file
+LABEL_PDF_SPOOL_MAX_SIZE = 1024 * 1024
+# Pages drawn on one canvas before it is saved and appended to the label PDF, bounds memory of long documents
+LABEL_PDF_BATCH_PAGES = 200
+# Label jobs with at least this many labels are rendered in a pool of LABEL_RENDER_WORKERS processes
+LABEL_PARALLEL_THRESHOLD = 500
+# Maximum number of labels rendered by a worker process at once, rounded up to full pages
+LABEL_PARALLEL_CHUNK_SIZE = 200
+# Defaults to the number of CPUs when not set
+LABEL_RENDER_WORKERS = None
+# Generated label jobs and their PDFs are deleted by the label worker after this period
+LABEL_JOB_RETENTION = timedelta(days=1)
+# Minimum number of seconds between progress updates of a running label job
+LABEL_JOB_PROGRESS_INTERVAL = 1.0
+# Running label jobs without progress for this period were abandoned by their worker and are queued again
+LABEL_JOB_CLAIM_TIMEOUT = timedelta(minutes=10)
+# Rendered label documents served again to requests with the same ETag, shared by the workers of one host
+LABEL_ARTIFACT_DIR = BASE_DIR / "build/cache/labels"
+# Size in bytes above which the least recently used label documents are deleted
+LABEL_ARTIFACT_STORE_MAX_SIZE = 512 * 1024 * 1024
+# Resolution of label previews shown in the admin
+LABEL_PREVIEW_DPI = 96
+# Number of devices fetched from the database at once while rendering labels
+LABEL_DEVICE_CHUNK_SIZE = 500
+# Device selections created from the admin are deleted by the label worker after this period
+DEVICE_SELECTION_RETENTION = timedelta(days=1)
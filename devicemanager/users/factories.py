@@ -3,9 +3,14 @@ import factory
 from devicemanager.users.models import User
 
 
-class UserFactory(factory.Factory):
+class UserFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = User
+        django_get_or_create = ("username",)
+
+    first_name = factory.Faker("first_name", locale="pl_PL")
+    last_name = factory.Faker("last_name", locale="pl_PL")
+    username = factory.Sequence(lambda n: f"user{n}")
 
     @factory.lazy_attribute
     def email(self):
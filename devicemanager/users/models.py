@@ -19,6 +19,7 @@ class User(AbstractUser):
         verbose_name=_("Degree"),
     )
     user_preferences = DictJSONField(_("User preferences"), default=dict)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated At"))
 
     def get_name_decoration(self) -> str:
         return getattr(self.name_decoration, "decorator", "")
@@ -0,0 +1,11 @@
+from rest_framework import serializers
+
+from devicemanager.users.models import User
+from devicemanager.utils.serializers import DynamicFieldsMixin
+
+
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ["id", "username", "first_name", "last_name", "email"]
+        read_only_fields = fields
@@ -0,0 +1,53 @@
+import threading
+import uuid
+from collections.abc import Callable
+
+from django.core.cache import caches
+
+
+class SharedVersionedValue[T]:
+    """
+    Value loaded once per process and reloaded when its version stamp in a shared cache changes.
+
+    Reading the value costs a single cache lookup of the stamp. Calling ``invalidate`` in any
+    process replaces the stamp, so every process reloads the value on its next read.
+    """
+
+    def __init__(self, key: str, load: Callable[[], T], cache_alias: str = "shared") -> None:
+        self.version_key = f"{key}:version"
+        self.load = load
+        self.cache_alias = cache_alias
+        self._lock = threading.Lock()
+        self._version: str | None = None
+        self._value: T | None = None
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def get_version(self) -> str:
+        version = self.cache.get(self.version_key)
+        if version is None:
+            # another process may add the stamp first, so read back whichever one was stored
+            self.cache.add(self.version_key, uuid.uuid4().hex, timeout=None)
+            version = self.cache.get(self.version_key)
+        return version
+
+    def get(self) -> T:
+        version = self.get_version()
+        with self._lock:
+            if self._version == version:
+                return self._value
+
+        # loaded without holding the lock, as loading may itself invalidate the value
+        value = self.load()
+        with self._lock:
+            self._version = version
+            self._value = value
+        return value
+
+    def invalidate(self) -> None:
+        self.cache.set(self.version_key, uuid.uuid4().hex, timeout=None)
+        with self._lock:
+            self._version = None
+            self._value = None
@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+from typing import Self
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Field, ForeignObjectRel, Model, QuerySet
+from django.utils.functional import cached_property
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+from devicemanager.utils.serializers import parse_field_paths
+
+
+def get_model_field(model: type[Model] | None, source: str) -> Field | ForeignObjectRel | None:
+    """Return the field of ``model`` a serializer field with ``source`` renders, if it renders a single model field."""
+    if model is None or source == "*" or "." in source:
+        return None
+    try:
+        return model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return None
+
+
+def get_joined_path(model: type[Model] | None, source: str) -> str | None:
+    """
+    Return the lookup of the relations a dotted ``source`` follows from ``model`` before reaching its attribute.
+
+    Only foreign keys and one-to-one relations can be joined, the path ends before any other attribute.
+    """
+    path = []
+    for name in source.split(".")[:-1]:
+        field = get_model_field(model, name)
+        if field is None or not (field.many_to_one or field.one_to_one):
+            break
+        path.append(field.name)
+        model = field.related_model
+    return "__".join(path) or None
+
+
+@dataclass(frozen=True, slots=True)
+class QueryPlan:
+    """Relations joined and prefetched for the rows a serializer renders, so a page costs a constant number of queries."""
+
+    select_related: tuple[str, ...] = ()
+    prefetch_related: tuple[str, ...] = ()
+    # columns loaded with only(), None loads all of them
+    only: tuple[str, ...] | None = None
+
+    @classmethod
+    def from_serializer(
+        cls,
+        serializer: serializers.BaseSerializer | type[serializers.BaseSerializer],
+        prefix: str = "",
+        project: bool = False,
+    ) -> Self:
+        """
+        Derive the plan from the readable fields of ``serializer``.
+
+        Single nested serializers, related fields rendering more than the primary key and the relations
+        of dotted sources are joined, many related fields and nested list serializers are prefetched.
+        Primary keys of foreign keys are read from the row itself and need neither.
+
+        With ``project`` only the columns of the rendered fields are loaded, unless a field renders
+        something other than a model field, e.g. a method or a property, which may need any column.
+        The plan must then not be used to save objects, deferred fields are not saved.
+        """
+        if isinstance(serializer, type):
+            serializer = serializer()
+        model = getattr(getattr(serializer, "Meta", None), "model", None)
+        select_related: list[str] = []
+        prefetch_related: list[str] = []
+        only: list[str] | None = [] if project else None
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            if only is not None:
+                model_field = get_model_field(model, field.source)
+                if model_field is None:
+                    only = None
+                elif model_field.concrete:
+                    only.append(prefix + field.source)
+            if field.source == "*":
+                continue
+            path = prefix + field.source.replace(".", "__")
+            if (joined_path := get_joined_path(model, field.source)) and prefix + joined_path not in select_related:
+                select_related.append(prefix + joined_path)
+            if isinstance(field, serializers.ListSerializer):
+                prefetch_related.append(path)
+                nested = cls.from_serializer(field.child, prefix=f"{path}__")
+                prefetch_related.extend((*nested.select_related, *nested.prefetch_related))
+            elif isinstance(field, serializers.BaseSerializer):
+                select_related.append(path)
+                nested = cls.from_serializer(field, prefix=f"{path}__", project=only is not None)
+                select_related.extend(nested.select_related)
+                prefetch_related.extend(nested.prefetch_related)
+                only = None if only is None or nested.only is None else [*only, *nested.only]
+            elif isinstance(field, serializers.ManyRelatedField):
+                prefetch_related.append(path)
+            elif isinstance(field, serializers.RelatedField) and not field.use_pk_only_optimization():
+                select_related.append(path)
+        return cls(tuple(select_related), tuple(prefetch_related), None if only is None else tuple(only))
+
+    def apply(self, queryset: QuerySet) -> QuerySet:
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.only is not None:
+            queryset = queryset.only(*self.only)
+        return queryset
+
+
+class QueryPlanMixin:
+    """Apply the ``query_plan`` of a view to its queryset."""
+
+    query_plan = QueryPlan()
+
+    def get_query_plan(self) -> QueryPlan:
+        return self.query_plan
+
+    def get_queryset(self):
+        return self.get_query_plan().apply(super().get_queryset())
+
+
+class DynamicFieldsViewMixin(QueryPlanMixin):
+    """
+    Select fields and inline related objects in read requests with the ``fields``, ``omit`` and ``expand`` parameters.
+
+    The serializer must use ``DynamicFieldsMixin``. The query plan is derived from the resulting serializer,
+    so inlined objects are fetched together with the page and sparse responses load only the columns they render.
+    """
+
+    field_tree_params = ("fields", "omit", "expand")
+
+    @cached_property
+    def field_trees(self) -> dict[str, dict]:
+        request = getattr(self, "request", None)
+        if request is None or request.method not in SAFE_METHODS:
+            return {}
+        trees = {param: parse_field_paths(request.query_params.get(param, "")) for param in self.field_tree_params}
+        return {param: tree for param, tree in trees.items() if tree}
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), "field_trees": self.field_trees}
+
+    def get_query_plan(self) -> QueryPlan:
+        if not self.field_trees:
+            return super().get_query_plan()
+        project = "fields" in self.field_trees or "omit" in self.field_trees
+        return QueryPlan.from_serializer(self.get_serializer(), project=project)
@@ -1,3 +1,6 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import timezone
+from django.utils.module_loading import import_string
 from django.utils.translation import gettext as _
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
@@ -25,3 +28,188 @@ class CharacterSeperatedField(serializers.ListField):
     def to_representation(self, obj):
         obj = super().to_representation(obj)
         return self.separator.join(str(el) for el in obj)
+
+
+def is_primary_key(value) -> bool:
+    """Tell whether a value of parsed JSON is an integer primary key, booleans are integers in Python."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def parse_field_paths(value: str) -> dict[str, dict]:
+    """Parse comma separated dotted paths, e.g. ``room.building,owner``, into a tree of nested field names."""
+    tree: dict[str, dict] = {}
+    for path in value.split(","):
+        node = tree
+        for name in filter(None, path.strip().split(".")):
+            node = node.setdefault(name, {})
+    return tree
+
+
+class DynamicFieldsMixin:
+    """
+    Select the fields of a serializer and inline related objects per request.
+
+    The options are trees of field names, as returned by ``parse_field_paths``:
+
+    - ``fields`` keeps only the named fields,
+    - ``omit`` drops the named fields,
+    - ``expand`` inlines the related objects of fields in ``Meta.expandable_fields`` instead of their
+      primary keys. The serializer of a related object may be given as an import path for serializers
+      declared later, it must use this mixin too.
+
+    The root serializer reads the options from the ``field_trees`` context, expanded serializers get the
+    subtrees under their field. Expanded fields are read only.
+    """
+
+    def __init__(self, *args, field_trees: dict[str, dict] | None = None, **kwargs):
+        self._field_trees = field_trees
+        super().__init__(*args, **kwargs)
+
+    @property
+    def field_trees(self) -> dict[str, dict]:
+        return self.context.get("field_trees", {}) if self._field_trees is None else self._field_trees
+
+    @classmethod
+    def get_expandable_fields(cls) -> dict[str, type[serializers.BaseSerializer]]:
+        expandable_fields = getattr(cls.Meta, "expandable_fields", {})
+        return {
+            name: import_string(serializer) if isinstance(serializer, str) else serializer
+            for name, serializer in expandable_fields.items()
+        }
+
+    def get_field_path(self, name: str) -> str:
+        names = [name]
+        field = self
+        while field.parent is not None:
+            if field.field_name:
+                names.append(field.field_name)
+            field = field.parent
+        return ".".join(reversed(names))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected, omitted, expanded = (self.field_trees.get(option, {}) for option in ("fields", "omit", "expand"))
+        for name in {**selected, **omitted, **expanded}:
+            if name not in fields:
+                raise serializers.ValidationError(
+                    {"fields": [_("Field %s does not exist.") % self.get_field_path(name)]}
+                )
+        expandable_fields = self.get_expandable_fields()
+        for name in expanded:
+            if name not in expandable_fields:
+                raise serializers.ValidationError(
+                    {"expand": [_("Field %s can not be expanded.") % self.get_field_path(name)]}
+                )
+
+        if selected:
+            fields = {name: field for name, field in fields.items() if name in selected}
+        # leaves of the omit tree drop their field, inner nodes only omit fields of the expanded object
+        fields = {name: field for name, field in fields.items() if omitted.get(name, True)}
+        for name, field in fields.items():
+            if name in expanded:
+                kwargs = {"source": field.source} if field.source else {}
+                field_trees = {
+                    "fields": selected.get(name, {}),
+                    "omit": omitted.get(name, {}),
+                    "expand": expanded[name],
+                }
+                many = isinstance(field, serializers.ManyRelatedField)
+                fields[name] = expandable_fields[name](many=many, read_only=True, field_trees=field_trees, **kwargs)
+            elif selected.get(name) or omitted.get(name):
+                raise serializers.ValidationError(
+                    {"fields": [_("Expand %s to select its fields.") % self.get_field_path(name)]}
+                )
+        return fields
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key field resolving keys from objects preloaded by ``BulkListSerializer`` instead of a query per item."""
+
+    preloaded: dict | None = None
+
+    def to_pk(self, data):
+        try:
+            return self.get_queryset().model._meta.pk.to_python(data)
+        except DjangoValidationError:
+            return None
+
+    def to_internal_value(self, data):
+        if self.preloaded is None or self.pk_field is not None:
+            return super().to_internal_value(data)
+        pk = None if isinstance(data, bool) else self.to_pk(data)
+        if pk is None:
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return self.preloaded[pk]
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    Validate and write lists of objects with a constant number of queries.
+
+    Keys of ``BulkPrimaryKeyRelatedField`` fields are resolved with one ``in_bulk`` lookup per field.
+    Items are created with ``bulk_create``. To update, pass the objects as ``instance``, each item is matched
+    to its object by ``id`` and the changes are written with ``bulk_update``. ``save()`` of the model and
+    its signals do not run, ``auto_now`` fields are set here.
+
+    Errors are reported per item, as a list in the order of the items.
+    """
+
+    def to_internal_value(self, data):
+        self.instance_map = {instance.pk: instance for instance in self.instance or ()}
+        self.child_instances = []
+        self.seen_ids = set()
+        if isinstance(data, list):
+            self.preload_related_objects(data)
+        validated_data = super().to_internal_value(data)
+        self.validate_items(validated_data)
+        return validated_data
+
+    def preload_related_objects(self, data: list) -> None:
+        for name, field in self.child.fields.items():
+            if isinstance(field, BulkPrimaryKeyRelatedField) and not field.read_only:
+                values = (item[name] for item in data if isinstance(item, dict) and name in item)
+                pks = {field.to_pk(value) for value in values if not isinstance(value, bool)}
+                field.preloaded = field.get_queryset().in_bulk(pks - {None})
+
+    def run_child_validation(self, data):
+        if self.instance is not None:
+            pk = data.get("id") if isinstance(data, dict) else None
+            instance = self.instance_map.get(pk) if is_primary_key(pk) else None
+            if instance is None:
+                raise serializers.ValidationError({"id": [_("Object with this id does not exist.")]})
+            if pk in self.seen_ids:
+                raise serializers.ValidationError({"id": [_("Object is updated more than once.")]})
+            self.seen_ids.add(pk)
+            self.child.instance = instance
+            self.child.initial_data = data
+            self.child_instances.append(instance)
+        return super().run_child_validation(data)
+
+    def validate_items(self, validated_data: list[dict]) -> None:
+        """
+        Validate rules spanning the items, e.g. uniqueness, raising a list of per item errors.
+
+        When updating, ``child_instances`` holds the object of each item.
+        """
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        return model.objects.bulk_create([model(**attrs) for attrs in validated_data])
+
+    def update(self, instance, validated_data):
+        model = self.child.Meta.model
+        now = timezone.now()
+        auto_now_fields = {field.name for field in model._meta.concrete_fields if getattr(field, "auto_now", False)}
+        update_fields = set(auto_now_fields)
+        for child_instance, attrs in zip(self.child_instances, validated_data):
+            for name, value in attrs.items():
+                setattr(child_instance, name, value)
+            for name in auto_now_fields:
+                setattr(child_instance, name, now)
+            update_fields.update(attrs)
+        if update_fields:
+            model.objects.bulk_update(self.child_instances, update_fields)
+        return self.child_instances
@@ -0,0 +1,65 @@
+from rest_framework import serializers
+
+from devicemanager.inventory.models import Building, Device, Room
+from devicemanager.utils.query_plans import QueryPlan
+
+
+class BuildingSerializer(serializers.ModelSerializer):
+    faculty = serializers.StringRelatedField()
+
+    class Meta:
+        model = Building
+        fields = ["id", "name", "faculty"]
+
+
+class RoomSerializer(serializers.ModelSerializer):
+    building = BuildingSerializer()
+    occupants = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = Room
+        fields = ["id", "room_number", "building", "occupants"]
+
+
+class DeviceSerializer(serializers.ModelSerializer):
+    room = RoomSerializer()
+    owner = serializers.PrimaryKeyRelatedField(read_only=True)
+    model = serializers.PrimaryKeyRelatedField(read_only=True, source="device_model")
+    manufacturer = serializers.CharField(source="device_model.manufacturer.name")
+    rentals = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = Device
+        fields = ["id", "room", "owner", "model", "manufacturer", "rentals"]
+
+
+def test_plan_is_derived_from_serializer_fields():
+    plan = QueryPlan.from_serializer(DeviceSerializer)
+
+    # primary keys of foreign keys are read from the device row, the relations of dotted sources are joined
+    assert plan == QueryPlan(
+        select_related=("room", "room__building", "room__building__faculty", "device_model__manufacturer"),
+        prefetch_related=("room__occupants", "rentals"),
+    )
+
+
+def test_empty_plan_keeps_queryset():
+    queryset = Device.objects.all()
+
+    assert QueryPlan().apply(queryset) is queryset
+
+
+def test_projection_loads_rendered_columns():
+    serializer = RoomSerializer(read_only=True)
+
+    plan = QueryPlan.from_serializer(serializer.fields["building"], prefix="building__", project=True)
+
+    assert plan == QueryPlan(
+        select_related=("building__faculty",),
+        only=("building__id", "building__name", "building__faculty"),
+    )
+
+
+def test_projection_needs_model_fields():
+    # the manufacturer name is not a column of the device
+    assert QueryPlan.from_serializer(DeviceSerializer, project=True).only is None
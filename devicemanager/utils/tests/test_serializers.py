@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from devicemanager.utils.serializers import CharacterSeperatedField
+from devicemanager.utils.serializers import CharacterSeperatedField, parse_field_paths
 
 
 class TestCharacterSeperatedField:
@@ -15,3 +15,10 @@ class TestCharacterSeperatedField:
     def test_to_representation(self):
         serializer = self.TestSerializer(instance={"field": [1, 2, 3]})
         assert serializer.data["field"] == "1,2,3"
+
+
+def test_parse_field_paths():
+    assert parse_field_paths("room.building.faculty, room.occupants,owner,") == {
+        "room": {"building": {"faculty": {}}, "occupants": {}},
+        "owner": {},
+    }
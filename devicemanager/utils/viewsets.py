@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.utils import extend_schema
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from devicemanager.utils.serializers import is_primary_key
+
+
+class BulkIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    def validate_ids(self, value: list[int]) -> list[int]:
+        if len(value) > settings.API_MAX_BULK_SIZE:
+            raise serializers.ValidationError(
+                _("Ensure this field has no more than %d elements.") % settings.API_MAX_BULK_SIZE
+            )
+        return value
+
+
+def bulk_schemas(serializer_class: type[serializers.Serializer]) -> dict:
+    """OpenAPI schemas of the bulk actions of ``BulkModelMixin`` for views serializing with ``serializer_class``."""
+    items = serializer_class(many=True)
+    return {
+        "bulk": [
+            extend_schema(methods=["POST"], request=items, responses={201: items}),
+            extend_schema(methods=["PATCH"], request=items, responses={200: items}),
+            extend_schema(methods=["DELETE"], request=BulkIdsSerializer, responses={204: None}),
+        ]
+    }
+
+
+class BulkModelMixin:
+    """
+    Create, update and delete lists of objects in one request at ``<list url>/bulk/``.
+
+    The serializer must use ``BulkListSerializer``. Every item is validated before anything is written and
+    errors are reported per item, in the order of the request. Validation and writes run in one transaction.
+    """
+
+    def get_bulk_serializer(self, *args, **kwargs):
+        return self.get_serializer(*args, many=True, max_length=settings.API_MAX_BULK_SIZE, **kwargs)
+
+    def get_bulk_response_data(self, instances) -> list:
+        """Serialize written objects in their order, fetched again through the query plan of the view."""
+        pks = [instance.pk for instance in instances]
+        objects = self.get_queryset().in_bulk(pks)
+        return self.get_serializer([objects[pk] for pk in pks], many=True).data
+
+    @action(detail=False, methods=["post", "patch", "delete"], pagination_class=None)
+    def bulk(self, request, *args, **kwargs):
+        handlers = {"POST": self.bulk_create, "PATCH": self.bulk_update, "DELETE": self.bulk_destroy}
+        return handlers[request.method](request, *args, **kwargs)
+
+    def bulk_create(self, request, *args, **kwargs):
+        with transaction.atomic():
+            serializer = self.get_bulk_serializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+        return Response(self.get_bulk_response_data(serializer.instance), status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, request, *args, **kwargs):
+        data = request.data
+        ids = [item.get("id") for item in data if isinstance(item, dict)] if isinstance(data, list) else []
+        with transaction.atomic():
+            instances = self.get_queryset().filter(pk__in=[pk for pk in ids if is_primary_key(pk)])
+            serializer = self.get_bulk_serializer(list(instances), data=data, partial=True)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+        return Response(self.get_bulk_response_data(serializer.instance))
+
+    def bulk_destroy(self, request, *args, **kwargs):
+        serializer = BulkIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+        with transaction.atomic():
+            instances = self.get_queryset().filter(pk__in=ids)
+            found = set(instances.values_list("pk", flat=True))
+            missing = [pk for pk in ids if pk not in found]
+            if missing:
+                raise ValidationError({"ids": [_("Objects with ids %s do not exist.") % ", ".join(map(str, missing))]})
+            instances.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)